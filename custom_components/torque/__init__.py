@@ -10,7 +10,9 @@ from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN
+from .const import DATA_METRICS_OWNER, DATA_VIEWS, DOMAIN
+from .services import async_setup_services
+from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,6 +31,8 @@ async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
     Returns:
         True if setup is successful
     """
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
     _LOGGER.debug("Torque integration initialized")
     return True
 
@@ -52,6 +56,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Forward setup to sensor platform
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    # Options are read when the receiver is set up, so reload when they change
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     _LOGGER.info("Torque integration setup complete for entry: %s", entry.entry_id)
     return True
 
@@ -74,6 +81,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         # Clean up stored data
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        hass.data.get(DATA_VIEWS, {}).pop(entry.entry_id, None)
+        if hass.data.get(DATA_METRICS_OWNER) == entry.entry_id:
+            hass.data.pop(DATA_METRICS_OWNER)
+            # The next loaded vehicle takes over the integration-wide metrics
+            if views := hass.data.get(DATA_VIEWS):
+                entry_id, view = next(iter(views.items()))
+                hass.data[DATA_METRICS_OWNER] = entry_id
+                view.async_add_fleet_metric_sensors()
         _LOGGER.info(
             "Torque integration unloaded successfully for entry: %s", entry.entry_id
         )
@@ -83,3 +98,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
 
     return unload_ok
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a Torque config entry after its options changed.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry instance
+    """
+    await hass.config_entries.async_reload(entry.entry_id)
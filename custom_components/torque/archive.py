@@ -0,0 +1,558 @@
+"""Compact per-session archive of every sample received from Torque.
+
+Each session is stored in its own file, made of blocks that each hold
+a few minutes of samples. Within a block the samples are stored
+column-wise per PID. Timestamps are compressed as delta-of-deltas and
+values as XORs with the previous value, following the Gorilla paper
+(Pelkonen et al., VLDB 2015). A slowly changing 1 Hz PID takes a few
+bits per sample.
+
+Every block is also recorded in an index file next to the archive, so a
+time range can be read without decoding the whole session.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import slugify
+
+from .const import ARCHIVE_BLOCK_SAMPLES, ARCHIVE_BLOCK_SECONDS, ARCHIVE_DIRECTORY
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_SUFFIX = ".tqa"
+BLOCK_MAGIC = b"TQB1"
+# magic, first and last sample time (ms), body length, number of columns
+BLOCK_HEADER = struct.Struct(">4sqqIH")
+# pid, number of samples, encoded length
+COLUMN_HEADER = struct.Struct(">III")
+MAX_PID = 0xFFFFFFFF  # largest PID a column header holds
+# first and last sample time (ms), block offset, block length with header
+INDEX_RECORD = struct.Struct(">qqQI")
+
+_MASK64 = (1 << 64) - 1
+
+# Delta-of-delta ranges: control bits, their length and the payload width
+_DOD_CLASSES = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+class _BitWriter:
+    """Append-only bit string backed by an integer."""
+
+    __slots__ = ("_acc", "_bits")
+
+    def __init__(self) -> None:
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value: int, width: int) -> None:
+        self._acc = (self._acc << width) | value
+        self._bits += width
+
+    def to_bytes(self) -> bytes:
+        pad = -self._bits % 8
+        return (self._acc << pad).to_bytes((self._bits + pad) // 8, "big")
+
+
+class _BitReader:
+    """Sequential reader of a bit string written by _BitWriter."""
+
+    __slots__ = ("_int", "_left")
+
+    def __init__(self, data: bytes) -> None:
+        self._int = int.from_bytes(data, "big")
+        self._left = len(data) * 8
+
+    def read(self, width: int) -> int:
+        self._left -= width
+        return (self._int >> self._left) & ((1 << width) - 1)
+
+    def read_bit(self) -> int:
+        self._left -= 1
+        return (self._int >> self._left) & 1
+
+
+def _to_signed(value: int) -> int:
+    """Interpret a 64-bit unsigned integer as two's complement."""
+    return value - (1 << 64) if value >> 63 else value
+
+
+def _write_dod(writer: _BitWriter, dod: int) -> None:
+    """Write a timestamp delta-of-delta."""
+    if dod == 0:
+        writer.write(0, 1)
+        return
+    for control, control_width, width in _DOD_CLASSES:
+        bias = (1 << (width - 1)) - 1
+        if -bias <= dod <= bias + 1:
+            writer.write(control, control_width)
+            writer.write(dod + bias, width)
+            return
+    writer.write(0b1111, 4)
+    writer.write(dod & _MASK64, 64)
+
+
+def _read_dod(reader: _BitReader) -> int:
+    """Read a timestamp delta-of-delta."""
+    if not reader.read_bit():
+        return 0
+    for _, _, width in _DOD_CLASSES:
+        if not reader.read_bit():
+            return reader.read(width) - ((1 << (width - 1)) - 1)
+    return _to_signed(reader.read(64))
+
+
+def encode_column(times_ms: list[int], values: array[float]) -> bytes:
+    """Compress the samples of one PID.
+
+    Args:
+        times_ms: Sample times in milliseconds
+        values: Sample values, one per time
+
+    Returns:
+        Encoded column
+    """
+    bits = array("Q")
+    bits.frombytes(values.tobytes())
+    writer = _BitWriter()
+
+    writer.write(times_ms[0] & _MASK64, 64)
+    writer.write(bits[0], 64)
+    previous_time = times_ms[0]
+    previous_delta = 0
+    previous_bits = bits[0]
+    leading = trailing = -1
+
+    for index in range(1, len(times_ms)):
+        delta = times_ms[index] - previous_time
+        _write_dod(writer, delta - previous_delta)
+        previous_time = times_ms[index]
+        previous_delta = delta
+
+        value_bits = bits[index]
+        xor = value_bits ^ previous_bits
+        previous_bits = value_bits
+        if not xor:
+            writer.write(0, 1)
+            continue
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if leading >= 0 and new_leading >= leading and new_trailing >= trailing:
+            # Meaningful bits fit in the previous window
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = new_leading, new_trailing
+            length = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(length - 1, 6)
+            writer.write(xor >> trailing, length)
+    return writer.to_bytes()
+
+
+def decode_column(data: bytes, count: int) -> tuple[list[int], array[float]]:
+    """Decompress a column written by encode_column.
+
+    Args:
+        data: Encoded column
+        count: Number of samples in the column
+
+    Returns:
+        Sample times in milliseconds and sample values
+    """
+    reader = _BitReader(data)
+    bits = array("Q", bytes(8 * count))
+    time_ms = _to_signed(reader.read(64))
+    times_ms = [time_ms]
+    bits[0] = value_bits = reader.read(64)
+    delta = 0
+    leading = trailing = 0
+
+    for index in range(1, count):
+        delta += _read_dod(reader)
+        time_ms += delta
+        times_ms.append(time_ms)
+
+        if reader.read_bit():
+            if reader.read_bit():
+                leading = reader.read(5)
+                length = reader.read(6) + 1
+                trailing = 64 - leading - length
+            value_bits ^= reader.read(64 - leading - trailing) << trailing
+        bits[index] = value_bits
+
+    values = array("d")
+    values.frombytes(bits.tobytes())
+    return times_ms, values
+
+
+def append_block(
+    path: str, columns: dict[int, tuple[array[float], array[float]]]
+) -> int:
+    """Encode a block and append it to an archive and its index.
+
+    Runs in the executor.
+
+    Args:
+        path: Archive file
+        columns: Sample times (epoch seconds) and values by PID
+
+    Returns:
+        Size of the block in bytes
+    """
+    body = bytearray()
+    start = end = None
+    for pid, (times, values) in columns.items():
+        times_ms = [round(sample_time * 1000) for sample_time in times]
+        encoded = encode_column(times_ms, values)
+        body += COLUMN_HEADER.pack(pid, len(times_ms), len(encoded))
+        body += encoded
+        first, last = min(times_ms), max(times_ms)
+        start = first if start is None else min(start, first)
+        end = last if end is None else max(end, last)
+    if start is None or end is None:
+        return 0
+
+    block = BLOCK_HEADER.pack(BLOCK_MAGIC, start, end, len(body), len(columns))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as archive:
+        offset = archive.tell()
+        archive.write(block + body)
+    with open(f"{path}.idx", "ab") as index:
+        index.write(INDEX_RECORD.pack(start, end, offset, len(block) + len(body)))
+    return len(block) + len(body)
+
+
+def read_index(path: str) -> list[tuple[int, int, int, int]]:
+    """Return the block index of an archive, rebuilding it if missing.
+
+    Args:
+        path: Archive file
+
+    Returns:
+        (start ms, end ms, offset, length) of every block
+    """
+    try:
+        with open(f"{path}.idx", "rb") as index:
+            return list(INDEX_RECORD.iter_unpack(index.read()))
+    except FileNotFoundError:
+        pass
+
+    # Block headers carry the same information, so walk them instead
+    records = []
+    with open(path, "rb") as archive:
+        offset = 0
+        while header := archive.read(BLOCK_HEADER.size):
+            if len(header) < BLOCK_HEADER.size:
+                break
+            magic, start, end, length, _ = BLOCK_HEADER.unpack(header)
+            if magic != BLOCK_MAGIC:
+                break
+            records.append((start, end, offset, BLOCK_HEADER.size + length))
+            offset += BLOCK_HEADER.size + length
+            archive.seek(offset)
+    return records
+
+
+@contextmanager
+def map_archive(path: str) -> Iterator[mmap.mmap | bytes]:
+    """Memory-map an archive for reading.
+
+    Args:
+        path: Archive file
+
+    Yields:
+        Read-only map of the file, or empty bytes for an empty file
+    """
+    with open(path, "rb") as archive:
+        if not os.fstat(archive.fileno()).st_size:
+            yield b""
+            return
+        with mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def iter_block(
+    buffer: mmap.mmap | bytes, offset: int = 0, pids: set[int] | None = None
+) -> Iterator[tuple[int, list[int], array[float]]]:
+    """Decode the columns of a block.
+
+    Only the columns of the requested PIDs are copied out of the buffer.
+
+    Args:
+        buffer: Archive contents, usually memory-mapped
+        offset: Offset of the block header in the buffer
+        pids: PIDs to decode, None for all
+
+    Yields:
+        PID, sample times in milliseconds and sample values of each column
+    """
+    magic, _, _, _, columns = BLOCK_HEADER.unpack_from(buffer, offset)
+    if magic != BLOCK_MAGIC:
+        raise ValueError("Not a Torque archive block")
+    offset += BLOCK_HEADER.size
+    for _ in range(columns):
+        pid, count, length = COLUMN_HEADER.unpack_from(buffer, offset)
+        offset += COLUMN_HEADER.size
+        if pids is None or pid in pids:
+            data = buffer[offset : offset + length]
+            yield pid, *decode_column(data, count)
+        offset += length
+
+
+def read_range(
+    path: str,
+    start: float,
+    end: float,
+    pids: set[int] | None = None,
+) -> dict[int, list[tuple[float, float]]]:
+    """Read the samples of a time range, decoding only overlapping blocks.
+
+    The archive is memory-mapped and the index used to jump to the blocks,
+    so the cost depends on the range rather than on the archive size. Runs
+    in the executor.
+
+    Args:
+        path: Archive file
+        start: First epoch timestamp to include
+        end: Last epoch timestamp to include
+        pids: PIDs to return, None for all
+
+    Returns:
+        (time, value) samples by PID in time order
+    """
+    start_ms, end_ms = start * 1000, end * 1000
+    result: dict[int, list[tuple[float, float]]] = {}
+    # Blocks are indexed once fully written, so reading the index before
+    # mapping the file keeps blocks appended meanwhile out of the map
+    index = read_index(path)
+    with map_archive(path) as archive:
+        for first, last, offset, _ in index:
+            if last < start_ms or first > end_ms:
+                continue
+            for pid, times_ms, values in iter_block(archive, offset, pids):
+                samples = result.setdefault(pid, [])
+                samples.extend(
+                    (time_ms / 1000, value)
+                    for time_ms, value in zip(times_ms, values, strict=True)
+                    if start_ms <= time_ms <= end_ms
+                )
+    for samples in result.values():
+        samples.sort()
+    return result
+
+
+def session_name(session: str | None, sample_time: float) -> str:
+    """Return the file name of a Torque session, without suffix.
+
+    Args:
+        session: Session id of the upload
+        sample_time: Epoch timestamp the upload was sampled at, used when
+            the upload carries no session id
+
+    Returns:
+        File system safe session name
+    """
+    return slugify(session) if session else str(int(sample_time))
+
+
+def archive_directory(hass: HomeAssistant, vehicle: str) -> str:
+    """Return the directory holding the archives of a vehicle.
+
+    Args:
+        hass: Home Assistant instance
+        vehicle: Vehicle name
+
+    Returns:
+        Directory path in the configuration directory
+    """
+    return hass.config.path(ARCHIVE_DIRECTORY, slugify(vehicle))
+
+
+class _Block:
+    """Samples of one archive file waiting to be written as a block."""
+
+    __slots__ = ("columns", "samples", "start")
+
+    def __init__(self) -> None:
+        self.columns: dict[int, tuple[array[float], array[float]]] = {}
+        self.samples = 0
+        self.start: float | None = None
+
+    def is_full(self, sample_time: float) -> bool:
+        """Return whether the block should be written.
+
+        Args:
+            sample_time: Epoch timestamp of the latest upload
+
+        Returns:
+            True once the block spans or holds enough samples
+        """
+        return self.start is not None and (
+            self.samples >= ARCHIVE_BLOCK_SAMPLES
+            or sample_time - self.start >= ARCHIVE_BLOCK_SECONDS
+        )
+
+
+class SessionArchive:
+    """Buffer a vehicle's samples and append them to its archive in blocks.
+
+    Samples are collected per PID in memory. Once a block spans
+    ARCHIVE_BLOCK_SECONDS or holds ARCHIVE_BLOCK_SAMPLES samples, it is
+    encoded and written in the executor. Writes are chained, so blocks
+    stay in order without blocking the ingest path.
+
+    Late uploads, buffered offline by Torque, are collected in blocks of
+    their own session's file, so they neither change the current session
+    nor cut its block short.
+    """
+
+    def __init__(self, hass: HomeAssistant, vehicle: str) -> None:
+        """Initialize the archive of a vehicle.
+
+        Args:
+            hass: Home Assistant instance
+            vehicle: Vehicle name, used for the archive directory
+        """
+        self.hass = hass
+        self.directory = archive_directory(hass, vehicle)
+        self.path: str | None = None
+        self.blocks_written = 0
+        self.bytes_written = 0
+        self._session: str | None = None
+        # Buffered block of every archive file and the one of the upload
+        self._blocks: dict[str, _Block] = {}
+        self._target: str | None = None
+        self._write: asyncio.Future[Any] | None = None
+
+    @callback
+    def async_set_session(
+        self, session: str | None, sample_time: float, late: bool = False
+    ) -> None:
+        """Pick the archive file of an upload's samples.
+
+        A live upload of another Torque session starts a new archive file.
+        A late upload goes to the file of its session, leaving the current
+        one as it is.
+
+        Args:
+            session: Session id of the upload
+            sample_time: Epoch timestamp the upload was sampled at
+            late: Whether the upload was buffered offline and uploaded late
+        """
+        if self.path is not None and session == self._session:
+            self._target = self.path
+            return
+        name = session_name(session, sample_time)
+        path = os.path.join(self.directory, f"{name}{ARCHIVE_SUFFIX}")
+        self._target = path
+        if late:
+            return
+        self.async_flush(self.path)
+        self._session = session
+        self.path = path
+
+    @callback
+    def add(self, pid: int, sample_time: float, value: str) -> None:
+        """Buffer a sample in the block of the upload's archive file.
+
+        Args:
+            pid: PID of the sample
+            sample_time: Epoch timestamp the sample was taken at
+            value: Raw value string from Torque, ignored unless numeric
+
+        Samples of PIDs too large for a column header are not archived.
+        """
+        if self._target is None or not 0 <= pid <= MAX_PID:
+            return
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return
+        if (block := self._blocks.get(self._target)) is None:
+            block = self._blocks[self._target] = _Block()
+        if (column := block.columns.get(pid)) is None:
+            column = block.columns[pid] = (array("d"), array("d"))
+        column[0].append(sample_time)
+        column[1].append(number)
+        block.samples += 1
+        if block.start is None:
+            block.start = sample_time
+
+    @callback
+    def async_end_payload(self, sample_time: float) -> None:
+        """Write the upload's buffered block once it is full.
+
+        Args:
+            sample_time: Epoch timestamp the upload was sampled at
+        """
+        target = self._target
+        if (
+            target is not None
+            and (block := self._blocks.get(target)) is not None
+            and block.is_full(sample_time)
+        ):
+            self.async_flush(target)
+
+    @callback
+    def async_flush(self, path: str | None = None) -> None:
+        """Hand buffered samples to the background writer.
+
+        Args:
+            path: Archive file whose block to write, None for all
+        """
+        for file in list(self._blocks) if path is None else [path]:
+            if (block := self._blocks.pop(file, None)) is None:
+                continue
+            self._write = self.hass.async_create_background_task(
+                self._async_write(self._write, file, block.columns),
+                "torque archive write",
+            )
+
+    @callback
+    def async_flush_late(self) -> None:
+        """Write the buffered samples of late uploads of past sessions."""
+        for path in [path for path in self._blocks if path != self.path]:
+            self.async_flush(path)
+
+    async def _async_write(
+        self,
+        previous: asyncio.Future[Any] | None,
+        path: str,
+        columns: dict[int, tuple[array[float], array[float]]],
+    ) -> None:
+        """Append a block once the previous one is written.
+
+        Args:
+            previous: Write of the previous block
+            path: Archive file
+            columns: Sample times and values by PID
+        """
+        if previous is not None:
+            # A failed write is logged by its own task and must not stop
+            # the blocks after it
+            await asyncio.wait((previous,))
+        try:
+            size = await self.hass.async_add_executor_job(append_block, path, columns)
+        except (OSError, struct.error) as exc:
+            _LOGGER.error("Failed to write Torque archive %s: %s", path, exc)
+            return
+        self.blocks_written += 1
+        self.bytes_written += size
+
+    async def async_close(self, *_: Any) -> None:
+        """Write the buffered samples and wait for pending writes."""
+        self.async_flush()
+        if self._write is not None:
+            await self._write
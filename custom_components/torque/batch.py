@@ -0,0 +1,134 @@
+"""Endpoint taking many Torque uploads in one request."""
+
+from __future__ import annotations
+
+import logging
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+from homeassistant.util.json import json_loads
+
+from .const import (
+    ATTR_ENTRY_ID,
+    BATCH_API_PATH,
+    DATA_VIEWS,
+    MAX_BATCH_PAYLOADS,
+    SENSOR_EMAIL_FIELD,
+)
+
+if TYPE_CHECKING:
+    from .sensor import TorqueReceiveDataView
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_batch(body: str) -> list[dict[str, str] | None]:
+    """Parse uploads sent as a JSON array or as one JSON object per line.
+
+    Args:
+        body: Request body
+
+    Returns:
+        Uploads with string values as Torque sends them, None for items
+        that are not JSON objects
+
+    Raises:
+        ValueError: If the body is not valid JSON or NDJSON
+    """
+    text = body.strip()
+    if text.startswith("["):
+        items = json_loads(text)
+    else:
+        items = [json_loads(line) for line in text.splitlines() if line.strip()]
+    return [
+        (
+            {str(key): str(value) for key, value in item.items() if value is not None}
+            if isinstance(item, dict)
+            else None
+        )
+        for item in items
+    ]
+
+
+class TorqueBatchView(HomeAssistantView):
+    """Accept queued Torque uploads of one or more vehicles in bulk."""
+
+    url = BATCH_API_PATH
+    name = "api:torque:batch"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the batch view.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self.hass = hass
+
+    async def post(self, request: web.Request) -> web.Response:
+        """Apply a batch of uploads, oldest first.
+
+        Uploads go to the vehicle named by the ``entry_id`` query parameter
+        or else to the one configured with their email address. The uploads
+        of each vehicle are applied together, in the order they were sent.
+
+        Args:
+            request: HTTP request with a JSON array or NDJSON body
+
+        Returns:
+            Counts and the HTTP status of every upload
+        """
+        body = await request.read()
+        try:
+            payloads = parse_batch(body.decode())
+        except ValueError as exc:
+            return self.json_message(f"Invalid batch: {exc}", HTTPStatus.BAD_REQUEST)
+        if len(payloads) > MAX_BATCH_PAYLOADS:
+            return self.json_message(
+                f"At most {MAX_BATCH_PAYLOADS} uploads per batch",
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        views: dict[str, TorqueReceiveDataView] = self.hass.data.get(DATA_VIEWS, {})
+        by_email: dict[str, list[TorqueReceiveDataView]] = {}
+        for view in views.values():
+            by_email.setdefault(view.email, []).append(view)
+        entry_id = request.query.get(ATTR_ENTRY_ID)
+
+        statuses = [int(HTTPStatus.BAD_REQUEST)] * len(payloads)
+        routed: dict[TorqueReceiveDataView, list[int]] = {}
+        for index, data in enumerate(payloads):
+            if data is None:
+                continue
+            if entry_id is not None:
+                targets = [views[entry_id]] if entry_id in views else []
+            else:
+                targets = by_email.get(data.get(SENSOR_EMAIL_FIELD, ""), [])
+            if len(targets) != 1:
+                # Vehicles sharing an email address need the entry_id
+                statuses[index] = int(
+                    HTTPStatus.CONFLICT if targets else HTTPStatus.NOT_FOUND
+                )
+                continue
+            routed.setdefault(targets[0], []).append(index)
+
+        for view, indexes in routed.items():
+            # The body is shared by the vehicles in proportion to their uploads
+            view.metrics.bytes_received += len(body) * len(indexes) // len(payloads)
+            results = await view.async_handle_batch(
+                [payloads[index] for index in indexes]
+            )
+            for index, status in zip(indexes, results, strict=True):
+                statuses[index] = status
+
+        accepted = statuses.count(HTTPStatus.OK)
+        _LOGGER.debug("Batch of %d uploads, %d accepted", len(statuses), accepted)
+        result: dict[str, Any] = {
+            "accepted": accepted,
+            "rejected": len(statuses) - accepted,
+            "results": statuses,
+        }
+        return self.json(result)
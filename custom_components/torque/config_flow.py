@@ -11,7 +11,38 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import config_validation as cv
 
-from .const import CONF_EMAIL, CONF_NAME, DEFAULT_NAME, DOMAIN
+from .const import (
+    CONF_ADAPTIVE_DEADBAND,
+    CONF_ARCHIVE,
+    CONF_BULK_PIDS,
+    CONF_CRITICAL_PIDS,
+    CONF_EMAIL,
+    CONF_EVENT_INTERVAL,
+    CONF_EVENT_PIDS,
+    CONF_GPX_TRACK,
+    CONF_HISTORY_SIZE,
+    CONF_IDLE_EVICTION,
+    CONF_NAME,
+    CONF_PERCENTILE_PIDS,
+    CONF_PRECISION_MAP,
+    CONF_STALE_TIMEOUT,
+    CONF_TRACK_TOLERANCE,
+    CONF_WRITE_BUDGET,
+    DEFAULT_ADAPTIVE_DEADBAND,
+    DEFAULT_ARCHIVE,
+    DEFAULT_EVENT_INTERVAL,
+    DEFAULT_GPX_TRACK,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_IDLE_EVICTION,
+    DEFAULT_NAME,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_TRACK_TOLERANCE,
+    DEFAULT_WRITE_BUDGET,
+    DOMAIN,
+    MAX_HISTORY_SIZE,
+    MAX_IDLE_EVICTION,
+    MAX_TRACK_TOLERANCE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -139,6 +170,110 @@ class TorqueOptionsFlow(config_entries.OptionsFlow):
                 vol.Optional(
                     "unit_system", default=current_options.get("unit_system", "metric")
                 ): vol.In(["metric", "imperial"]),
+                vol.Optional(
+                    CONF_STALE_TIMEOUT,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT
+                        )
+                    },
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_WRITE_BUDGET,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_WRITE_BUDGET, DEFAULT_WRITE_BUDGET
+                        )
+                    },
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_CRITICAL_PIDS,
+                    description={
+                        "suggested_value": current_options.get(CONF_CRITICAL_PIDS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_BULK_PIDS,
+                    description={
+                        "suggested_value": current_options.get(CONF_BULK_PIDS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_ADAPTIVE_DEADBAND,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_ADAPTIVE_DEADBAND, DEFAULT_ADAPTIVE_DEADBAND
+                        )
+                    },
+                ): bool,
+                vol.Optional(
+                    CONF_PRECISION_MAP,
+                    description={
+                        "suggested_value": current_options.get(CONF_PRECISION_MAP, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_PERCENTILE_PIDS,
+                    description={
+                        "suggested_value": current_options.get(CONF_PERCENTILE_PIDS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_EVENT_PIDS,
+                    description={
+                        "suggested_value": current_options.get(CONF_EVENT_PIDS, "")
+                    },
+                ): str,
+                vol.Optional(
+                    CONF_EVENT_INTERVAL,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_EVENT_INTERVAL, DEFAULT_EVENT_INTERVAL
+                        )
+                    },
+                ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                vol.Optional(
+                    CONF_HISTORY_SIZE,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_HISTORY_SIZE, DEFAULT_HISTORY_SIZE
+                        )
+                    },
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_HISTORY_SIZE)),
+                vol.Optional(
+                    CONF_ARCHIVE,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_ARCHIVE, DEFAULT_ARCHIVE
+                        )
+                    },
+                ): bool,
+                vol.Optional(
+                    CONF_GPX_TRACK,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_GPX_TRACK, DEFAULT_GPX_TRACK
+                        )
+                    },
+                ): bool,
+                vol.Optional(
+                    CONF_TRACK_TOLERANCE,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_TRACK_TOLERANCE, DEFAULT_TRACK_TOLERANCE
+                        )
+                    },
+                ): vol.All(
+                    vol.Coerce(float), vol.Range(min=0, max=MAX_TRACK_TOLERANCE)
+                ),
+                vol.Optional(
+                    CONF_IDLE_EVICTION,
+                    description={
+                        "suggested_value": current_options.get(
+                            CONF_IDLE_EVICTION, DEFAULT_IDLE_EVICTION
+                        )
+                    },
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_IDLE_EVICTION)),
             }
         )
 
@@ -7,20 +7,90 @@ from typing import Final
 # Integration domain and API
 DOMAIN: Final[str] = "torque"
 API_PATH: Final[str] = "/api/torque"
+METRICS_API_PATH: Final[str] = "/api/torque/metrics"
+BATCH_API_PATH: Final[str] = "/api/torque/batch"
+MAX_BATCH_PAYLOADS: Final[int] = 10_000  # uploads per batch request
+
+# Keys in hass.data
+DATA_VIEWS: Final[str] = f"{DOMAIN}_views"
+DATA_METRICS_OWNER: Final[str] = f"{DOMAIN}_metrics_owner"
+DATA_METRICS_VIEW: Final[str] = f"{DOMAIN}_metrics_view"
+DATA_BATCH_VIEW: Final[str] = f"{DOMAIN}_batch_view"
+DATA_PROFILER: Final[str] = f"{DOMAIN}_profiler"
+DATA_SCHEDULER: Final[str] = f"{DOMAIN}_scheduler"
+DATA_LIVE: Final[str] = f"{DOMAIN}_live"
+DATA_QUERY_CACHE: Final[str] = f"{DOMAIN}_query_cache"
+DATA_SHARDS: Final[str] = f"{DOMAIN}_shards"
+
+# Event fired once per upload with the values of the opted-in PIDs
+EVENT_PAYLOAD: Final[str] = f"{DOMAIN}_payload"
+
+# Services
+SERVICE_IMPORT_LOG: Final[str] = "import_log"
+ATTR_ENTRY_ID: Final[str] = "entry_id"
+ATTR_PATH: Final[str] = "path"
+SERVICE_PROFILE: Final[str] = "profile"
+ATTR_DURATION: Final[str] = "duration"
+ATTR_REQUESTS: Final[str] = "requests"
+SERVICE_QUERY: Final[str] = "query"
+ATTR_SESSION: Final[str] = "session"
+ATTR_PID: Final[str] = "pid"
+ATTR_START: Final[str] = "start"
+ATTR_END: Final[str] = "end"
+ATTR_POINTS: Final[str] = "points"
+SERVICE_EXPORT_GPX: Final[str] = "export_gpx"
 
 # Configuration keys
 CONF_EMAIL: Final[str] = "email"
 CONF_NAME: Final[str] = "name"
+CONF_STALE_TIMEOUT: Final[str] = "stale_timeout"
+CONF_WRITE_BUDGET: Final[str] = "write_budget"
+CONF_CRITICAL_PIDS: Final[str] = "critical_pids"
+CONF_BULK_PIDS: Final[str] = "bulk_pids"
+CONF_ADAPTIVE_DEADBAND: Final[str] = "adaptive_deadband"
+CONF_PRECISION_MAP: Final[str] = "precision_map"
+CONF_EVENT_PIDS: Final[str] = "event_pids"
+CONF_EVENT_INTERVAL: Final[str] = "event_interval"
+CONF_HISTORY_SIZE: Final[str] = "history_size"
+CONF_ARCHIVE: Final[str] = "archive"
+CONF_GPX_TRACK: Final[str] = "gpx_track"
+CONF_TRACK_TOLERANCE: Final[str] = "track_tolerance"
+CONF_PERCENTILE_PIDS: Final[str] = "percentile_pids"
+CONF_IDLE_EVICTION: Final[str] = "idle_eviction"
 
 # Default values
 DEFAULT_NAME: Final[str] = "vehicle"
+DEFAULT_STALE_TIMEOUT: Final[int] = 300  # seconds, 0 disables
+DEFAULT_WRITE_BUDGET: Final[float] = 0  # writes per second, 0 for unlimited
+DEFAULT_ADAPTIVE_DEADBAND: Final[bool] = False
+DEFAULT_EVENT_INTERVAL: Final[float] = 5  # seconds between payload events
+DEFAULT_HISTORY_SIZE: Final[int] = 600  # samples kept in memory per PID
+DEFAULT_ARCHIVE: Final[bool] = False
+DEFAULT_GPX_TRACK: Final[bool] = False
+DEFAULT_TRACK_TOLERANCE: Final[float] = 5.0  # metres a simplified track may deviate
+DEFAULT_IDLE_EVICTION: Final[int] = 0  # seconds, 0 keeps vehicles resident
 
 # Sensor field keys from Torque app
 SENSOR_EMAIL_FIELD: Final[str] = "eml"
+SENSOR_ID_FIELD: Final[str] = "id"  # hash of the device id
+SENSOR_SESSION_FIELD: Final[str] = "session"
+SENSOR_TIME_FIELD: Final[str] = "time"  # sample time, ms since epoch
 SENSOR_NAME_KEY: Final[str] = r"userFullName(\w+)"
 SENSOR_UNIT_KEY: Final[str] = r"userUnit(\w+)"
 SENSOR_VALUE_KEY: Final[str] = r"k(\w+)"
 
+# Key prefixes of the name/unit metadata blocks Torque resends with every upload
+SENSOR_METADATA_PREFIXES: Final[tuple[str, ...]] = (
+    "userFullName",
+    "userShortName",
+    "userUnit",
+    "defaultUnit",
+)
+
+# Trip log import
+LOG_TIME_COLUMN: Final[str] = "Device Time"
+LOG_CHUNK_ROWS: Final[int] = 5000  # rows read per executor job
+
 # Entity naming
 ENTITY_NAME_FORMAT: Final[str] = "{0} {1}"
 
@@ -28,6 +98,104 @@ ENTITY_NAME_FORMAT: Final[str] = "{0} {1}"
 MIN_UPDATE_INTERVAL: Final[int] = 15  # seconds
 SIGNIFICANT_CHANGE: Final[float] = 0.1  # Default for most sensors
 
+# Payloads whose sample time lags behind by more than this were buffered
+# offline by Torque and are backfilled into statistics
+LATE_PAYLOAD_THRESHOLD: Final[int] = 60  # seconds
+LATE_FLUSH_DELAY: Final[int] = 5  # seconds without late payloads before flushing
+LATE_RESYNC_RATE: Final[float] = 1.5  # sample seconds per second of a live stream
+
+# Smallest step of the per-vehicle staleness timer
+STALE_CHECK_RESOLUTION: Final[int] = 5  # seconds
+
+# Outcome of a sensor update, used as index into the update counters
+UPDATE_WRITTEN: Final[int] = 0
+UPDATE_THROTTLED: Final[int] = 1
+UPDATE_REJECTED: Final[int] = 2
+
+# Priority classes: critical PIDs skip MIN_UPDATE_INTERVAL on a large change
+# and go first under the write budget, bulk PIDs are written on a heartbeat
+# or on a large change
+PRIORITY_CRITICAL: Final[str] = "critical"
+PRIORITY_NORMAL: Final[str] = "normal"
+PRIORITY_BULK: Final[str] = "bulk"
+CRITICAL_CHANGE_FACTOR: Final[float] = 5.0  # multiples of the significant change
+BULK_HEARTBEAT: Final[int] = 300  # seconds
+BULK_CHANGE_FACTOR: Final[float] = 10.0  # multiples of the significant change
+
+# Adaptive deadband: a multiple of the EWMA of absolute sample-to-sample
+# changes, clamped to a range around the PID's static threshold
+ADAPTIVE_NOISE_ALPHA: Final[float] = 0.05  # weight of the newest delta
+ADAPTIVE_NOISE_FACTOR: Final[float] = 3.0
+ADAPTIVE_WARMUP_SAMPLES: Final[int] = 20  # deltas before the estimate is used
+ADAPTIVE_MIN_SCALE: Final[float] = 0.1  # multiples of the static threshold
+ADAPTIVE_MAX_SCALE: Final[float] = 10.0
+
+# Motion states derived from each upload, selecting the throttle policy
+MOTION_DRIVING: Final[str] = "driving"
+MOTION_IDLING: Final[str] = "idling"
+MOTION_PARKED: Final[str] = "parked"
+MOTION_SPEED_KEYS: Final[tuple[str, ...]] = ("kd", "kff1001")  # OBD and GPS speed
+MOTION_RPM_KEY: Final[str] = "kc"
+MOTION_MOVING_SPEED: Final[float] = 3.0  # km/h
+MOTION_IDLE_RPM: Final[float] = 300.0
+MOTION_SETTLE_TIME: Final[int] = 60  # seconds before switching to a calmer state
+
+# Integration-wide write budget
+WRITE_SCHEDULER_TICK: Final[int] = 1  # seconds
+
+# Performance counters
+METRICS_PUBLISH_INTERVAL: Final[int] = 60  # seconds
+LATENCY_BUCKETS: Final[int] = 24  # power-of-two microsecond buckets, up to ~8 s
+
+# On-demand profiler
+DEFAULT_PROFILE_DURATION: Final[int] = 60  # seconds
+PROFILE_TOP_FUNCTIONS: Final[int] = 10  # functions listed in the logbook summary
+
+# Recent uploads kept per vehicle for the diagnostics download
+DIAGNOSTICS_PAYLOADS: Final[int] = 20
+DIAGNOSTICS_PAYLOAD_BYTES: Final[int] = 8192  # bytes kept per upload
+
+# Websocket live stream of every received sample
+WS_TYPE_SUBSCRIBE_LIVE: Final[str] = f"{DOMAIN}/subscribe_live"
+LIVE_BUFFER_SIZE: Final[int] = 50  # payload batches queued per subscriber
+LIVE_SEND_INTERVAL: Final[float] = 0.2  # seconds between messages to a subscriber
+WS_TYPE_HISTORY: Final[str] = f"{DOMAIN}/history"
+MAX_HISTORY_SIZE: Final[int] = 86400  # samples per PID, 1.4 MB
+
+# Session and daily percentiles of opted-in PIDs, from every raw sample
+PERCENTILE_SKETCH_SIZE: Final[int] = 200  # KLL k, about 1% rank error
+
+# Session archive, one file per vehicle and session in the config directory
+ARCHIVE_DIRECTORY: Final[str] = "torque_archive"
+ARCHIVE_BLOCK_SECONDS: Final[int] = 300  # span of samples per block
+ARCHIVE_BLOCK_SAMPLES: Final[int] = 100_000  # samples per block at most
+WS_TYPE_QUERY: Final[str] = f"{DOMAIN}/query"
+QUERY_CACHE_SIZE: Final[int] = 32  # query results kept
+QUERY_DEFAULT_POINTS: Final[int] = 500  # min/max buckets of a PID query
+MAX_QUERY_POINTS: Final[int] = 10_000
+
+# GPS track of each session, simplified and written as GPX in the config directory
+TRACK_DIRECTORY: Final[str] = "torque_tracks"
+TRACK_LATITUDE_KEY: Final[str] = "kff1006"
+TRACK_LONGITUDE_KEY: Final[str] = "kff1005"
+TRACK_ALTITUDE_KEY: Final[str] = "kff1010"  # metres
+TRACK_SPEED_KEY: Final[str] = "kff1001"  # km/h
+TRACK_WINDOW: Final[int] = 256  # raw fixes simplified together
+MAX_TRACK_TOLERANCE: Final[float] = 1000.0
+
+# Fleet mode: hot state of idle vehicles is dropped, a compact state is stored
+SHARD_STORAGE_KEY: Final[str] = f"{DOMAIN}.shards"
+SHARD_STORAGE_VERSION: Final[int] = 1
+SHARD_SAVE_DELAY: Final[int] = 30  # seconds
+MAX_IDLE_EVICTION: Final[int] = 604800  # one week
+
+# Uploads forwarded in batches by the ingest sidecar (sidecar.py)
+WS_TYPE_INGEST: Final[str] = f"{DOMAIN}/ingest"
+
+# Values for PIDs whose name has not arrived yet
+PENDING_BUFFER_SIZE: Final[int] = 64  # PIDs held per vehicle
+PENDING_VALUE_TTL: Final[int] = 120  # seconds
+
 # Sensor-specific significant change thresholds
 SENSOR_SIGNIFICANT_CHANGES: Final[dict[str, float]] = {
     "speed": 1.0,  # 1 km/h change for speed sensors
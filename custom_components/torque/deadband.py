@@ -0,0 +1,84 @@
+"""Adaptive deadband learned from each PID's sample-to-sample noise."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    ADAPTIVE_MAX_SCALE,
+    ADAPTIVE_MIN_SCALE,
+    ADAPTIVE_NOISE_ALPHA,
+    ADAPTIVE_NOISE_FACTOR,
+    ADAPTIVE_WARMUP_SAMPLES,
+)
+
+
+class AdaptiveDeadband:
+    """Rolling estimate of a PID's noise floor.
+
+    Keeps an exponentially weighted moving average of the absolute change
+    between consecutive samples, so memory stays constant whatever the
+    upload rate. The deadband is a multiple of that average, clamped to a
+    range around the PID's static threshold so a frozen or erratic PID
+    cannot silence the sensor or flood the recorder.
+    """
+
+    __slots__ = ("_static", "noise", "samples", "_last")
+
+    def __init__(self, static: float) -> None:
+        """Initialize the estimate.
+
+        Args:
+            static: Static threshold of the PID, used until the noise is learned
+        """
+        self._static = static
+        self.noise = 0.0
+        self.samples = 0
+        self._last: float | None = None
+
+    def add(self, value: float) -> None:
+        """Feed a received sample into the estimate.
+
+        Args:
+            value: Sample value, in sample time order
+        """
+        last, self._last = self._last, value
+        if last is None:
+            return
+        delta = abs(value - last)
+        if self.samples:
+            self.noise += ADAPTIVE_NOISE_ALPHA * (delta - self.noise)
+        else:
+            self.noise = delta
+        self.samples += 1
+
+    @property
+    def threshold(self) -> float:
+        """Return the deadband to apply to the next value."""
+        if self.samples < ADAPTIVE_WARMUP_SAMPLES:
+            return self._static
+        return min(
+            max(self.noise * ADAPTIVE_NOISE_FACTOR, self._static * ADAPTIVE_MIN_SCALE),
+            self._static * ADAPTIVE_MAX_SCALE,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the learned estimate for storage."""
+        return {"noise": self.noise, "samples": self.samples}
+
+    def restore(self, data: dict[str, Any] | None) -> None:
+        """Restore an estimate stored by as_dict.
+
+        Args:
+            data: Stored estimate, ignored when missing or malformed
+        """
+        if not data:
+            return
+        try:
+            noise = float(data["noise"])
+            samples = int(data["samples"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if noise >= 0 and samples >= 0:
+            self.noise = noise
+            self.samples = samples
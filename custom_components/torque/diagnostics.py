@@ -0,0 +1,192 @@
+"""Diagnostics support for the Torque integration."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Any
+from urllib.parse import parse_qsl, urlencode
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_EMAIL,
+    DATA_SCHEDULER,
+    DATA_VIEWS,
+    DIAGNOSTICS_PAYLOAD_BYTES,
+    SENSOR_EMAIL_FIELD,
+    SENSOR_ID_FIELD,
+    TRACK_ALTITUDE_KEY,
+    TRACK_LATITUDE_KEY,
+    TRACK_LONGITUDE_KEY,
+    UPDATE_REJECTED,
+    UPDATE_THROTTLED,
+    UPDATE_WRITTEN,
+)
+from .metrics import LatencyHistogram
+
+REDACTED = "**REDACTED**"
+TO_REDACT = {CONF_EMAIL}
+# Upload keys identifying the user or revealing the vehicle's location
+PAYLOAD_TO_REDACT = frozenset(
+    {
+        SENSOR_EMAIL_FIELD,
+        SENSOR_ID_FIELD,
+        TRACK_LATITUDE_KEY,
+        TRACK_LONGITUDE_KEY,
+        TRACK_ALTITUDE_KEY,
+    }
+)
+
+
+class PayloadRing:
+    """Keep the last uploads of a vehicle for diagnostics.
+
+    Uploads are stored url-encoded, as Torque sent them, with the keys
+    identifying the user or the vehicle's location redacted and each one
+    capped in size, so the memory held is bounded by
+    ``size * DIAGNOSTICS_PAYLOAD_BYTES``.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize the ring.
+
+        Args:
+            size: Number of uploads to keep
+        """
+        self._payloads: deque[tuple[float, bytes, bool]] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of stored uploads."""
+        return len(self._payloads)
+
+    def append(self, data: dict[str, Any], now: float | None = None) -> None:
+        """Store an upload, dropping the oldest one when full.
+
+        Args:
+            data: Request data dictionary
+            now: Epoch timestamp of arrival, defaults to the current time
+        """
+        encoded = urlencode(
+            {
+                key: REDACTED if key in PAYLOAD_TO_REDACT else value
+                for key, value in data.items()
+            }
+        ).encode()
+        self._payloads.append(
+            (
+                time.time() if now is None else now,
+                encoded[:DIAGNOSTICS_PAYLOAD_BYTES],
+                len(encoded) > DIAGNOSTICS_PAYLOAD_BYTES,
+            )
+        )
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Decode the stored uploads, oldest first.
+
+        Returns:
+            Arrival time, truncation flag and data of every stored upload
+        """
+        return [
+            {
+                "received": received,
+                "truncated": truncated,
+                "data": dict(parse_qsl(encoded.decode(errors="replace"))),
+            }
+            for received, encoded, truncated in self._payloads
+        ]
+
+
+def _timings(histogram: LatencyHistogram) -> dict[str, Any]:
+    """Summarize a latency histogram.
+
+    Args:
+        histogram: Histogram to summarize
+
+    Returns:
+        Count and percentiles in milliseconds
+    """
+    return {
+        "count": histogram.count,
+        "p50_ms": histogram.percentile(0.5),
+        "p95_ms": histogram.percentile(0.95),
+        "p99_ms": histogram.percentile(0.99),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry to describe
+
+    Returns:
+        Diagnostics data
+    """
+    diagnostics: dict[str, Any] = {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+    }
+
+    view = hass.data.get(DATA_VIEWS, {}).get(entry.entry_id)
+    if view is None:
+        return diagnostics
+
+    metrics = view.metrics
+    now = time.time()
+    diagnostics.update(
+        {
+            "options": view.compiled_options(),
+            "counters": {
+                "requests": metrics.requests,
+                "keys": metrics.keys,
+                "bytes_received": metrics.bytes_received,
+                "metadata_skipped": metrics.metadata_skipped,
+                "values_written": metrics.updates[UPDATE_WRITTEN],
+                "values_throttled": metrics.updates[UPDATE_THROTTLED],
+                "values_rejected": metrics.updates[UPDATE_REJECTED],
+                "entities_created": metrics.entities_created,
+                "queue_depth": metrics.queue_depth,
+            },
+            "timings": {
+                "parse": _timings(
+                    metrics.parse_latency_total.merged(metrics.parse_latency)
+                ),
+                "flush": _timings(
+                    metrics.flush_latency_total.merged(metrics.flush_latency)
+                ),
+            },
+            "sensors": [
+                sensor.diagnostics(now) for _pid, sensor in sorted(view.sensors.items())
+            ],
+            "motion": view.motion.state,
+            # Idle vehicles in fleet mode hold no ingest state until they upload
+            "resident": view.shard is not None,
+            "recent_payloads": (
+                view.shard.recent_payloads.as_list() if view.shard is not None else []
+            ),
+        }
+    )
+    if (archive := view.archive) is not None:
+        diagnostics["archive"] = {
+            "path": archive.path,
+            "blocks_written": archive.blocks_written,
+            "bytes_written": archive.bytes_written,
+        }
+    if (track := view.track) is not None:
+        # Fix counts only, the track itself would reveal where the car went
+        diagnostics["track"] = {
+            "path": track.path,
+            "fixes": track.simplifier.fixes,
+            "files_written": track.files_written,
+        }
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is not None:
+        diagnostics["scheduler"] = scheduler.async_diagnostics()
+    return diagnostics
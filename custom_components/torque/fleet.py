@@ -0,0 +1,137 @@
+"""Per-vehicle ingest state that is only held while a vehicle is active.
+
+With many configured vehicles most of them are idle at any moment. Their
+receivers keep the entities and options, but the state built up from
+uploads lives in a shard that is created on the first upload after
+startup and dropped once the vehicle has been idle for a while. Only a
+compact summary of an evicted shard is stored, so resident memory
+follows the active vehicles rather than the configured ones.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DIAGNOSTICS_PAYLOADS,
+    PENDING_BUFFER_SIZE,
+    PENDING_VALUE_TTL,
+    SHARD_SAVE_DELAY,
+    SHARD_STORAGE_KEY,
+    SHARD_STORAGE_VERSION,
+)
+from .diagnostics import PayloadRing
+from .pending import PendingValueBuffer
+
+
+class VehicleShard:
+    """Hot ingest state of an active vehicle.
+
+    Everything held here is rebuilt from the uploads themselves, so a
+    shard can be dropped at any time the vehicle is idle.
+    """
+
+    __slots__ = (
+        "session",
+        "fingerprint",
+        "metadata",
+        "units",
+        "pending",
+        "recent_payloads",
+        "last_active",
+    )
+
+    def __init__(self, compact: dict[str, Any] | None = None) -> None:
+        """Initialize the shard, optionally from the compact state of an evicted one.
+
+        Args:
+            compact: State stored by as_compact, None to start empty
+        """
+        # Metadata fingerprint state, reset whenever the Torque session changes
+        self.session: str | None = None
+        self.fingerprint: int | None = None
+        self.metadata: dict[str, str] = {}
+        self.units: dict[int, str] = {}
+
+        # Latest values of PIDs that arrived before their sensor name
+        self.pending = PendingValueBuffer(PENDING_BUFFER_SIZE, PENDING_VALUE_TTL)
+
+        # Last uploads for the diagnostics download
+        self.recent_payloads = PayloadRing(DIAGNOSTICS_PAYLOADS)
+
+        self.last_active = time.monotonic()
+        if compact:
+            self.session = compact.get("session")
+            try:
+                self.units = {
+                    int(pid): str(unit)
+                    for pid, unit in (compact.get("units") or {}).items()
+                }
+            except (AttributeError, TypeError, ValueError):
+                self.units = {}
+
+    def as_compact(self) -> dict[str, Any]:
+        """Return the state worth keeping once the shard is evicted."""
+        return {
+            "session": self.session,
+            "units": {str(pid): unit for pid, unit in self.units.items()},
+        }
+
+
+class ShardStore:
+    """Compact state of evicted vehicles, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without stored state.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, SHARD_STORAGE_VERSION, SHARD_STORAGE_KEY
+        )
+        self._states: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of stored vehicles."""
+        return len(self._states)
+
+    async def async_load(self) -> None:
+        """Load the compact state stored before the last restart."""
+        stored = await self._store.async_load() or {}
+        self._states = {**stored, **self._states}
+
+    @callback
+    def async_pop(self, entry_id: str) -> dict[str, Any] | None:
+        """Take the compact state of a vehicle that becomes active.
+
+        Args:
+            entry_id: Config entry of the vehicle
+
+        Returns:
+            Stored state, None if there is none
+        """
+        state = self._states.pop(entry_id, None)
+        if state is not None:
+            self._async_schedule_save()
+        return state
+
+    @callback
+    def async_put(self, entry_id: str, state: dict[str, Any]) -> None:
+        """Store the compact state of an evicted vehicle.
+
+        Args:
+            entry_id: Config entry of the vehicle
+            state: State returned by VehicleShard.as_compact
+        """
+        self._states[entry_id] = state
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Write the stored state once changes settle."""
+        self._store.async_delay_save(lambda: self._states, SHARD_SAVE_DELAY)
@@ -0,0 +1,163 @@
+"""In-memory history of recent raw samples per PID."""
+
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+
+def downsample(
+    samples: Sequence[tuple[float, float]], buckets: int
+) -> list[tuple[float, float, float]]:
+    """Reduce samples to the minimum and maximum of equal time buckets.
+
+    Args:
+        samples: (time, value) pairs in time order
+        buckets: Number of buckets spanning the samples
+
+    Returns:
+        (bucket start, min, max) of every bucket holding samples
+    """
+    if not samples:
+        return []
+    first = samples[0][0]
+    width = (samples[-1][0] - first) / buckets or 1.0
+
+    result: list[tuple[float, float, float]] = []
+    current = -1
+    low = high = 0.0
+    for sample_time, value in samples:
+        bucket = min(int((sample_time - first) / width), buckets - 1)
+        if bucket != current:
+            if current >= 0:
+                result.append((first + current * width, low, high))
+            current = bucket
+            low = high = value
+        elif value < low:
+            low = value
+        elif value > high:
+            high = value
+    result.append((first + current * width, low, high))
+    return result
+
+
+class SampleRing:
+    """Fixed-capacity ring of (time, value) samples in typed arrays.
+
+    Samples take 16 bytes each and the arrays are allocated up front, so
+    memory is bounded by the capacity whatever the upload rate.
+    """
+
+    __slots__ = ("capacity", "_times", "_values", "_next", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize an empty ring.
+
+        Args:
+            capacity: Number of samples kept
+        """
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    def append(self, sample_time: float, value: float) -> None:
+        """Add a sample, overwriting the oldest one when full.
+
+        Args:
+            sample_time: Epoch timestamp, not older than the last sample
+            value: Sample value
+        """
+        index = self._next
+        self._times[index] = sample_time
+        self._values[index] = value
+        self._next = (index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _ordered(self) -> tuple[array[float], array[float]]:
+        """Return the times and values from oldest to newest."""
+        if self._count < self.capacity:
+            return self._times[: self._count], self._values[: self._count]
+        split = self._next
+        return (
+            self._times[split:] + self._times[:split],
+            self._values[split:] + self._values[:split],
+        )
+
+    def samples(self, since: float = -math.inf) -> list[tuple[float, float]]:
+        """Return the samples taken at or after a time.
+
+        Args:
+            since: Epoch timestamp of the oldest sample to return
+
+        Returns:
+            (time, value) pairs from oldest to newest
+        """
+        times, values = self._ordered()
+        start = bisect_left(times, since)
+        return list(zip(times[start:], values[start:], strict=True))
+
+    def downsample(
+        self, buckets: int, since: float = -math.inf
+    ) -> list[tuple[float, float, float]]:
+        """Reduce the samples to the minimum and maximum of equal time buckets.
+
+        Args:
+            buckets: Number of buckets spanning the returned samples
+            since: Epoch timestamp of the oldest sample to include
+
+        Returns:
+            (bucket start, min, max) of every bucket holding samples
+        """
+        return downsample(self.samples(since), buckets)
+
+
+class VehicleHistory:
+    """Sample rings of all PIDs of a vehicle."""
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize without rings.
+
+        Args:
+            capacity: Samples kept per PID, 0 to keep no history
+        """
+        self.capacity = capacity
+        self.rings: dict[int, SampleRing] = {}
+
+    def ring(self, pid: int) -> SampleRing | None:
+        """Return the ring of a PID, creating it on first use.
+
+        Args:
+            pid: PID identifier
+
+        Returns:
+            Ring of the PID, or None if history is disabled
+        """
+        if not self.capacity:
+            return None
+        if (ring := self.rings.get(pid)) is None:
+            ring = self.rings[pid] = SampleRing(self.capacity)
+        return ring
+
+    def append(self, pid: int, sample_time: float, value: float) -> None:
+        """Record a sample of a PID.
+
+        Args:
+            pid: PID identifier
+            sample_time: Epoch timestamp, not older than the last sample of the PID
+            value: Sample value
+        """
+        if (ring := self.ring(pid)) is not None:
+            ring.append(sample_time, value)
+
+    def clear(self) -> None:
+        """Release the rings of all PIDs."""
+        self.rings = {}
@@ -0,0 +1,351 @@
+"""Bulk import of Torque trip logs into long-term statistics."""
+
+from __future__ import annotations
+
+import csv
+import logging
+import re
+from collections.abc import Iterator
+from datetime import datetime, tzinfo
+from re import Pattern
+from typing import TYPE_CHECKING, TextIO
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import LOG_CHUNK_ROWS, LOG_TIME_COLUMN
+
+if TYPE_CHECKING:
+    from .sensor import TorqueSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+# "Engine RPM(rpm)" -> ("Engine RPM", "rpm")
+LOG_HEADER: Pattern[str] = re.compile(r"^(.*)\(([^()]*)\)$")
+LOG_TIME_FORMAT = "%d-%b-%Y %H:%M:%S.%f"
+
+# (hour start timestamp, mean, min, max)
+HourlyStat = tuple[float, float, float, float]
+
+
+def parse_log_header(column: str) -> tuple[str, str | None]:
+    """Split a trip log column header into sensor name and unit.
+
+    Args:
+        column: Column header from the CSV file
+
+    Returns:
+        Tuple of sensor name and unit (None if the header has no unit)
+    """
+    column = column.strip()
+    if match := LOG_HEADER.match(column):
+        return match.group(1).strip(), match.group(2).strip()
+    return column, None
+
+
+def parse_log_time(value: str, time_zone: tzinfo) -> float | None:
+    """Parse a trip log timestamp into a UTC epoch timestamp.
+
+    Torque writes the phone's local time, e.g. ``18-Oct-2025 14:22:11.123``.
+    Millisecond epoch values are accepted as well.
+
+    Args:
+        value: Time cell from the CSV file
+        time_zone: Time zone the phone logged in
+
+    Returns:
+        Epoch timestamp in seconds, or None if the value cannot be parsed
+    """
+    value = value.strip()
+    if value.isdigit():
+        return int(value) / 1000
+    try:
+        local = datetime.strptime(value, LOG_TIME_FORMAT)
+    except ValueError:
+        return None
+    return local.replace(tzinfo=time_zone).timestamp()
+
+
+class HourlyAggregator:
+    """Aggregate timestamped samples into hourly mean/min/max per key."""
+
+    def __init__(self) -> None:
+        """Initialize the aggregator."""
+        # hour start -> key -> [count, total, min, max]
+        self._buckets: dict[float, dict[int, list[float]]] = {}
+
+    def __len__(self) -> int:
+        """Return the number of open hours."""
+        return len(self._buckets)
+
+    def add(self, key: int, timestamp: float, value: float) -> None:
+        """Add a sample to its hourly bucket.
+
+        Args:
+            key: Key the sample belongs to (PID)
+            timestamp: Epoch timestamp of the sample
+            value: Sample value
+        """
+        hour = timestamp - timestamp % 3600
+        bucket = self._buckets.setdefault(hour, {})
+        if (stat := bucket.get(key)) is None:
+            bucket[key] = [1, value, value, value]
+            return
+        stat[0] += 1
+        stat[1] += value
+        if value < stat[2]:
+            stat[2] = value
+        elif value > stat[3]:
+            stat[3] = value
+
+    def pop_before(self, timestamp: float | None = None) -> dict[int, list[HourlyStat]]:
+        """Remove and return hours that ended before a timestamp.
+
+        Args:
+            timestamp: Cut-off epoch timestamp, or None to pop every hour
+
+        Returns:
+            Hourly statistics by key, ordered by hour
+        """
+        hours = sorted(
+            hour
+            for hour in self._buckets
+            if timestamp is None or hour + 3600 <= timestamp
+        )
+        result: dict[int, list[HourlyStat]] = {}
+        for hour in hours:
+            for key, (count, total, low, high) in self._buckets.pop(hour).items():
+                result.setdefault(key, []).append((hour, total / count, low, high))
+        return result
+
+
+class TripLogReader:
+    """Stream a Torque trip log CSV file in chunks of rows.
+
+    All methods do blocking file I/O and must run in the executor. The file
+    opened by open() is read over several executor jobs, so it is not held
+    by a with block; callers must call close() when done, even on error.
+    """
+
+    def __init__(self, path: str, time_zone: tzinfo) -> None:
+        """Initialize the reader.
+
+        Args:
+            path: Path of the CSV file on local disk
+            time_zone: Time zone the phone logged in
+        """
+        self._path = path
+        self._time_zone = time_zone
+        self._file: TextIO | None = None
+        self._rows: Iterator[list[str]] | None = None
+        self._time_index: int | None = None
+        self._columns: dict[int, int] = {}
+        self._aggregator = HourlyAggregator()
+        self.rows_read = 0
+
+    def open(self) -> list[tuple[str, str | None]]:
+        """Open the file and parse its header.
+
+        Returns:
+            Parsed (name, unit) of every column in file order
+
+        Raises:
+            ValueError: If the file has no header or no time column
+        """
+        # The file stays open across executor jobs until close() is called,
+        # or is closed here if its header cannot be used
+        self._file = open(self._path, encoding="utf-8", newline="")  # noqa: SIM115
+        try:
+            self._rows = csv.reader(self._file)
+            header = next(self._rows, None)
+            if not header:
+                raise ValueError("Trip log is empty")
+
+            columns = [parse_log_header(column) for column in header]
+            for index, (name, _unit) in enumerate(columns):
+                if name == LOG_TIME_COLUMN:
+                    self._time_index = index
+                    break
+            else:
+                raise ValueError(f"Trip log has no '{LOG_TIME_COLUMN}' column")
+        except (OSError, ValueError):
+            self.close()
+            raise
+        return columns
+
+    def select(self, columns: dict[int, int]) -> None:
+        """Select the columns to import.
+
+        Args:
+            columns: PID to import for each column index
+        """
+        self._columns = columns
+
+    def read_chunk(
+        self, max_rows: int = LOG_CHUNK_ROWS
+    ) -> tuple[dict[int, list[HourlyStat]], bool]:
+        """Read up to ``max_rows`` rows and return the hours they completed.
+
+        Args:
+            max_rows: Maximum number of rows to read
+
+        Returns:
+            Tuple of completed hourly statistics by PID and whether the end
+            of the file was reached
+        """
+        assert self._rows is not None and self._time_index is not None
+        time_index = self._time_index
+        columns = self._columns.items()
+        aggregator = self._aggregator
+        latest: float | None = None
+
+        for _ in range(max_rows):
+            row = next(self._rows, None)
+            if row is None:
+                return aggregator.pop_before(), True
+            self.rows_read += 1
+            if len(row) <= time_index:
+                continue
+            if (timestamp := parse_log_time(row[time_index], self._time_zone)) is None:
+                continue
+            latest = timestamp if latest is None else max(latest, timestamp)
+
+            for index, pid in columns:
+                try:
+                    aggregator.add(pid, timestamp, float(row[index]))
+                except (IndexError, ValueError):
+                    # Torque writes "-" for PIDs without a reading
+                    continue
+
+        # Only hours before the newest row are complete
+        if latest is None:
+            return {}, False
+        return aggregator.pop_before(latest - latest % 3600), False
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def match_log_columns(
+    columns: list[tuple[str, str | None]], sensors: dict[int, TorqueSensor]
+) -> dict[int, int]:
+    """Map trip log columns to the PIDs of existing sensors by name.
+
+    Args:
+        columns: Parsed (name, unit) of every column
+        sensors: Sensors of the vehicle by PID
+
+    Returns:
+        PID for each matched column index
+    """
+    by_name = {
+        str(sensor.name).casefold(): pid
+        for pid, sensor in sensors.items()
+        if sensor.name
+    }
+    matched: dict[int, int] = {}
+    for index, (name, unit) in enumerate(columns):
+        if (pid := by_name.get(name.casefold())) is None:
+            continue
+        sensor_unit = sensors[pid].native_unit_of_measurement
+        if unit and sensor_unit and unit != sensor_unit:
+            _LOGGER.warning(
+                "Skipping trip log column '%s': unit %s does not match sensor unit %s",
+                name,
+                unit,
+                sensor_unit,
+            )
+            continue
+        matched[index] = pid
+    return matched
+
+
+def async_import_hourly(
+    hass: HomeAssistant,
+    sensors: dict[int, TorqueSensor],
+    hourly: dict[int, list[HourlyStat]],
+) -> int:
+    """Import hourly statistics for sensors into the recorder.
+
+    Args:
+        hass: Home Assistant instance
+        sensors: Sensors of the vehicle by PID
+        hourly: Hourly statistics by PID
+
+    Returns:
+        Number of hourly rows handed to the recorder
+    """
+    imported = 0
+    for pid, rows in hourly.items():
+        sensor = sensors.get(pid)
+        if sensor is None or sensor.entity_id is None:
+            continue
+
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=None,
+            source="recorder",
+            statistic_id=sensor.entity_id,
+            unit_of_measurement=sensor.native_unit_of_measurement,
+        )
+        async_import_statistics(
+            hass,
+            metadata,
+            [
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(start),
+                    mean=mean,
+                    min=low,
+                    max=high,
+                )
+                for start, mean, low, high in rows
+            ],
+        )
+        imported += len(rows)
+    return imported
+
+
+async def async_import_log(
+    hass: HomeAssistant, sensors: dict[int, TorqueSensor], path: str
+) -> int:
+    """Stream a trip log from disk into hourly long-term statistics.
+
+    Args:
+        hass: Home Assistant instance
+        sensors: Sensors of the vehicle by PID
+        path: Path of the CSV file on local disk
+
+    Returns:
+        Number of hourly rows imported
+    """
+    reader = TripLogReader(path, dt_util.get_default_time_zone())
+    imported = 0
+    try:
+        columns = await hass.async_add_executor_job(reader.open)
+        matched = match_log_columns(columns, sensors)
+        if not matched:
+            _LOGGER.warning("No columns in %s match a Torque sensor", path)
+            return 0
+        reader.select(matched)
+
+        done = False
+        while not done:
+            hourly, done = await hass.async_add_executor_job(reader.read_chunk)
+            imported += async_import_hourly(hass, sensors, hourly)
+    finally:
+        await hass.async_add_executor_job(reader.close)
+
+    _LOGGER.info(
+        "Imported %d hourly statistics for %d columns from %s (%d rows)",
+        imported,
+        len(matched),
+        path,
+        reader.rows_read,
+    )
+    return imported
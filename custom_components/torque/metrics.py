@@ -0,0 +1,318 @@
+"""Runtime performance counters for the Torque receiver."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_VIEWS,
+    LATENCY_BUCKETS,
+    METRICS_API_PATH,
+    UPDATE_REJECTED,
+    UPDATE_THROTTLED,
+    UPDATE_WRITTEN,
+)
+
+# (name, type, help) of the counters served by the scrape endpoint
+EXPOSED_METRICS: tuple[tuple[str, str, str], ...] = (
+    ("torque_requests_total", "counter", "Torque uploads received."),
+    ("torque_keys_total", "counter", "Keys received in Torque uploads."),
+    ("torque_received_bytes_total", "counter", "Bytes received in Torque uploads."),
+    (
+        "torque_metadata_skipped_total",
+        "counter",
+        "Unchanged name/unit keys skipped by the metadata fingerprint.",
+    ),
+    ("torque_values_written_total", "counter", "Values written to entity state."),
+    ("torque_values_throttled_total", "counter", "Values dropped by throttling."),
+    ("torque_values_rejected_total", "counter", "Values rejected as non-numeric."),
+    ("torque_entities_created_total", "counter", "Sensors created since startup."),
+    ("torque_entities", "gauge", "Sensors of the vehicle."),
+    ("torque_queue_depth", "gauge", "Values waiting for a sensor or a flush."),
+)
+
+
+class LatencyHistogram:
+    """Fixed-size histogram of durations in power-of-two microsecond buckets."""
+
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts = [0] * LATENCY_BUCKETS
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a duration.
+
+        Args:
+            seconds: Duration in seconds
+        """
+        index = int(seconds * 1_000_000).bit_length()
+        if index >= LATENCY_BUCKETS:
+            index = LATENCY_BUCKETS - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merged(self, other: LatencyHistogram) -> LatencyHistogram:
+        """Return a new histogram combining this one and another.
+
+        Args:
+            other: Histogram to combine with
+
+        Returns:
+            Combined histogram
+        """
+        combined = LatencyHistogram()
+        combined.merge(self)
+        combined.merge(other)
+        return combined
+
+    def merge(self, other: LatencyHistogram) -> None:
+        """Add the counts of another histogram to this one.
+
+        Args:
+            other: Histogram to merge
+        """
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return the upper bound of the bucket holding a quantile.
+
+        Args:
+            quantile: Quantile between 0 and 1
+
+        Returns:
+            Duration in milliseconds, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return (1 << index) / 1000
+        return (1 << (LATENCY_BUCKETS - 1)) / 1000
+
+
+class TorqueMetrics:
+    """Counters updated on the receiver's hot path.
+
+    Updating a counter is a plain integer increment. Rates and percentiles
+    are only computed when a window is rolled over for publishing.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.keys = 0
+        self.bytes_received = 0
+        self.metadata_skipped = 0
+        # Indexed by UPDATE_WRITTEN / UPDATE_THROTTLED / UPDATE_REJECTED
+        self.updates = [0, 0, 0]
+        self.entities_created = 0
+        self.queue_depth = 0
+        self.parse_latency = LatencyHistogram()
+        self.flush_latency = LatencyHistogram()
+
+        # Windows already rolled over, kept for the cumulative scrape endpoint
+        self.parse_latency_total = LatencyHistogram()
+        self.flush_latency_total = LatencyHistogram()
+
+        # State of the last published window
+        self.window_latency = LatencyHistogram()
+        self.window_requests = 0
+        self.window_keys = 0
+        self.window_seconds = 0.0
+        self._rolled_at = time.monotonic()
+        self._rolled_requests = 0
+        self._rolled_keys = 0
+
+    def roll(self, now: float | None = None) -> None:
+        """Close the current window so it can be published.
+
+        Args:
+            now: Monotonic timestamp, defaults to the current time
+        """
+        if now is None:
+            now = time.monotonic()
+        self.window_seconds = now - self._rolled_at
+        self.window_requests = self.requests - self._rolled_requests
+        self.window_keys = self.keys - self._rolled_keys
+        self.window_latency, self.parse_latency = (
+            self.parse_latency,
+            LatencyHistogram(),
+        )
+        self.parse_latency_total.merge(self.window_latency)
+        self.flush_latency_total.merge(self.flush_latency)
+        self.flush_latency = LatencyHistogram()
+        self._rolled_at = now
+        self._rolled_requests = self.requests
+        self._rolled_keys = self.keys
+
+
+def metrics_snapshot(metrics: Iterable[TorqueMetrics]) -> dict[str, Any]:
+    """Combine the last published windows of one or more vehicles.
+
+    Args:
+        metrics: Metrics of the vehicles to combine
+
+    Returns:
+        Dictionary of published values by key
+    """
+    latency = LatencyHistogram()
+    request_rate = 0.0
+    requests = keys = entities = queue_depth = 0
+    updates = [0, 0, 0]
+
+    for item in metrics:
+        latency.merge(item.window_latency)
+        if item.window_seconds > 0:
+            request_rate += item.window_requests / item.window_seconds
+        requests += item.window_requests
+        keys += item.window_keys
+        entities += item.entities_created
+        queue_depth += item.queue_depth
+        for index, count in enumerate(item.updates):
+            updates[index] += count
+
+    return {
+        "request_rate": round(request_rate, 2),
+        "parse_latency_p50": latency.percentile(0.5),
+        "parse_latency_p95": latency.percentile(0.95),
+        "parse_latency_p99": latency.percentile(0.99),
+        "keys_per_payload": round(keys / requests, 1) if requests else None,
+        "values_accepted": updates[UPDATE_WRITTEN],
+        "values_throttled": updates[UPDATE_THROTTLED],
+        "values_rejected": updates[UPDATE_REJECTED],
+        "entities_created": entities,
+        "queue_depth": queue_depth,
+    }
+
+
+def _label(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(
+    lines: list[str], name: str, label: str, histogram: LatencyHistogram
+) -> None:
+    """Append a histogram in the text exposition format.
+
+    Args:
+        lines: Output lines
+        name: Metric name without suffix
+        label: Rendered label set without braces
+        histogram: Histogram to render
+    """
+    cumulative = 0
+    for index, count in enumerate(histogram.counts[:-1]):
+        cumulative += count
+        bound = (1 << index) / 1_000_000
+        lines.append(f'{name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{label}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{label}}} {histogram.count}")
+
+
+def render_metrics(vehicles: Iterable[tuple[str, TorqueMetrics, int]]) -> str:
+    """Render vehicle counters in the Prometheus text exposition format.
+
+    Only the preallocated counters are read, no entities are walked.
+
+    Args:
+        vehicles: Tuples of vehicle name, metrics and sensor count
+
+    Returns:
+        Exposition text
+    """
+    samples: dict[str, list[str]] = {name: [] for name, _, _ in EXPOSED_METRICS}
+    histograms: list[str] = []
+
+    for vehicle, metrics, entity_count in vehicles:
+        label = f'vehicle="{_label(vehicle)}"'
+        values = {
+            "torque_requests_total": metrics.requests,
+            "torque_keys_total": metrics.keys,
+            "torque_received_bytes_total": metrics.bytes_received,
+            "torque_metadata_skipped_total": metrics.metadata_skipped,
+            "torque_values_written_total": metrics.updates[UPDATE_WRITTEN],
+            "torque_values_throttled_total": metrics.updates[UPDATE_THROTTLED],
+            "torque_values_rejected_total": metrics.updates[UPDATE_REJECTED],
+            "torque_entities_created_total": metrics.entities_created,
+            "torque_entities": entity_count,
+            "torque_queue_depth": metrics.queue_depth,
+        }
+        for name, value in values.items():
+            samples[name].append(f"{name}{{{label}}} {value}")
+
+        _render_histogram(
+            histograms,
+            "torque_parse_duration_seconds",
+            label,
+            metrics.parse_latency_total.merged(metrics.parse_latency),
+        )
+        _render_histogram(
+            histograms,
+            "torque_flush_duration_seconds",
+            label,
+            metrics.flush_latency_total.merged(metrics.flush_latency),
+        )
+
+    lines: list[str] = []
+    for name, kind, description in EXPOSED_METRICS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples[name])
+    for name, description in (
+        ("torque_parse_duration_seconds", "Time spent handling an upload."),
+        ("torque_flush_duration_seconds", "Time spent creating and flushing entities."),
+    ):
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} histogram")
+        lines.extend(line for line in histograms if line.startswith(f"{name}_"))
+    return "\n".join(lines) + "\n"
+
+
+class TorqueMetricsView(HomeAssistantView):
+    """Serve the receiver counters for scraping."""
+
+    url = METRICS_API_PATH
+    name = "api:torque:metrics"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the metrics view.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Render the counters of every loaded vehicle.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            HTTP response in the text exposition format
+        """
+        views = self.hass.data.get(DATA_VIEWS, {}).values()
+        body = render_metrics(
+            (view.vehicle, view.metrics, len(view.sensors)) for view in views
+        )
+        return web.Response(text=body, content_type="text/plain")
@@ -0,0 +1,126 @@
+"""Per-vehicle motion state and the throttle policy that goes with it."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    BULK_HEARTBEAT,
+    MIN_UPDATE_INTERVAL,
+    MOTION_DRIVING,
+    MOTION_IDLE_RPM,
+    MOTION_IDLING,
+    MOTION_MOVING_SPEED,
+    MOTION_PARKED,
+    MOTION_RPM_KEY,
+    MOTION_SETTLE_TIME,
+    MOTION_SPEED_KEYS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class ThrottlePolicy:
+    """Throttle settings applied to the normal and bulk PIDs of a vehicle."""
+
+    min_interval: float  # seconds between writes of a normal PID
+    deadband_scale: float  # multiplier of each PID's significant change
+    bulk_heartbeat: float  # seconds between writes of a bulk PID
+
+
+# Driving keeps the regular throttle; the other states trade latency for
+# fewer writes since values barely change while the car stands still
+MOTION_POLICIES: dict[str, ThrottlePolicy] = {
+    MOTION_DRIVING: ThrottlePolicy(MIN_UPDATE_INTERVAL, 1.0, BULK_HEARTBEAT),
+    MOTION_IDLING: ThrottlePolicy(60, 2.0, 900),
+    MOTION_PARKED: ThrottlePolicy(300, 4.0, 3600),
+}
+DEFAULT_POLICY = MOTION_POLICIES[MOTION_DRIVING]
+
+# Order of activity, used to switch up at once and down only after settling
+_ACTIVITY = {MOTION_PARKED: 0, MOTION_IDLING: 1, MOTION_DRIVING: 2}
+
+
+def _to_float(value: Any) -> float | None:
+    """Convert a raw payload value, returning None when it is not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_motion(data: dict[str, Any]) -> str | None:
+    """Derive the motion state from the speed and RPM values of an upload.
+
+    Args:
+        data: Request data dictionary
+
+    Returns:
+        Motion state, or None if the upload has no speed or RPM value
+    """
+    speeds = [
+        speed
+        for key in MOTION_SPEED_KEYS
+        if (speed := _to_float(data.get(key))) is not None
+    ]
+    rpm = _to_float(data.get(MOTION_RPM_KEY))
+    if not speeds and rpm is None:
+        return None
+    if speeds and max(speeds) >= MOTION_MOVING_SPEED:
+        return MOTION_DRIVING
+    if rpm is not None and rpm >= MOTION_IDLE_RPM:
+        return MOTION_IDLING
+    return MOTION_PARKED
+
+
+class VehicleMotion:
+    """Motion state of a vehicle, shared by all of its sensors.
+
+    Sensors read ``policy`` on every update, so switching state replaces the
+    whole policy table of the vehicle in a single assignment.
+    """
+
+    def __init__(self) -> None:
+        """Initialize in the driving state, which keeps the regular throttle."""
+        self.state = MOTION_DRIVING
+        self.policy = DEFAULT_POLICY
+        self._candidate: str | None = None
+        self._candidate_since = 0.0
+
+    def update(self, data: dict[str, Any], now: float) -> bool:
+        """Update the state from an upload.
+
+        More active states apply at once so a departing car is tracked
+        closely right away. Less active ones apply once they have been seen
+        for MOTION_SETTLE_TIME, so a stop at a traffic light changes nothing.
+
+        Args:
+            data: Request data dictionary
+            now: Epoch timestamp the upload was sampled at
+
+        Returns:
+            True if the state changed
+        """
+        state = classify_motion(data)
+        if state is None:
+            return False
+        if state == self.state:
+            self._candidate = None
+            return False
+
+        if _ACTIVITY[state] < _ACTIVITY[self.state]:
+            if state != self._candidate:
+                self._candidate = state
+                self._candidate_since = now
+                return False
+            if now - self._candidate_since < MOTION_SETTLE_TIME:
+                return False
+
+        _LOGGER.debug("Vehicle motion changed from %s to %s", self.state, state)
+        self._candidate = None
+        self.state = state
+        self.policy = MOTION_POLICIES[state]
+        return True
@@ -0,0 +1,79 @@
+"""Bounded buffer for values of PIDs that have no sensor yet."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+
+class PendingValueBuffer:
+    """Keep the latest value per unknown PID until its sensor is created.
+
+    Torque sends ``k<pid>`` values and ``userFullName<pid>`` names in
+    different uploads. Values that arrive first are held here, bounded in
+    size and age so random PIDs from a misbehaving client cannot grow it.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_size: Maximum number of PIDs held at once
+            ttl: Seconds after which a buffered value is discarded
+        """
+        self._max_size = max_size
+        self._ttl = ttl
+        # pid -> (raw value, sample time, monotonic arrival time)
+        self._values: OrderedDict[int, tuple[str, float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of buffered PIDs."""
+        return len(self._values)
+
+    def put(
+        self, pid: int, value: str, sample_time: float, now: float | None = None
+    ) -> None:
+        """Buffer the latest value for a PID, evicting expired or oldest entries.
+
+        Args:
+            pid: PID the value belongs to
+            value: Raw value string from Torque
+            sample_time: Epoch timestamp the value was sampled at
+            now: Monotonic timestamp, defaults to the current time
+        """
+        if now is None:
+            now = time.monotonic()
+
+        values = self._values
+        values[pid] = (value, sample_time, now)
+        values.move_to_end(pid)
+
+        # Entries are kept in arrival order, so expired ones sit at the front
+        expiry = now - self._ttl
+        while values:
+            oldest_pid, (_, _, received) = next(iter(values.items()))
+            if received >= expiry and len(values) <= self._max_size:
+                break
+            del values[oldest_pid]
+
+    def pop(self, pid: int, now: float | None = None) -> tuple[str, float] | None:
+        """Remove and return the buffered value for a PID if it is still fresh.
+
+        Args:
+            pid: PID to look up
+            now: Monotonic timestamp, defaults to the current time
+
+        Returns:
+            The buffered raw value and its sample time, or None if missing
+            or expired
+        """
+        entry = self._values.pop(pid, None)
+        if entry is None:
+            return None
+
+        if now is None:
+            now = time.monotonic()
+        value, sample_time, received = entry
+        if now - received > self._ttl:
+            return None
+        return value, sample_time
@@ -0,0 +1,254 @@
+"""Catalog of well-known OBD-II and Torque PIDs."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from re import Pattern
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .const import (
+    PRIORITY_BULK,
+    PRIORITY_CRITICAL,
+    PRIORITY_NORMAL,
+    SENSOR_SIGNIFICANT_CHANGES,
+    SIGNIFICANT_CHANGE,
+)
+
+DEFAULT_PRECISION = 2
+
+
+@dataclass(frozen=True, slots=True)
+class PidInfo:
+    """Sensor metadata of a PID."""
+
+    unit: str | None
+    device_class: SensorDeviceClass | None
+    icon: str | None
+    significant_change: float
+    precision: int
+    priority: str = PRIORITY_NORMAL
+
+
+# Keyed by PID as decoded by convert_pid: mode-01 PIDs (k5, kc, ...) and
+# Torque's own extended PIDs (kff1001, ...). Entries only apply when Torque
+# reports the canonical unit, since users can switch Torque to imperial.
+PID_CATALOG: dict[int, PidInfo] = {
+    # Mode 01
+    0x04: PidInfo("%", None, "mdi:engine", 1.0, 0),  # Calculated engine load
+    # Engine coolant temperature
+    0x05: PidInfo(
+        "°C",
+        SensorDeviceClass.TEMPERATURE,
+        "mdi:coolant-temperature",
+        0.5,
+        0,
+        PRIORITY_CRITICAL,
+    ),
+    0x06: PidInfo("%", None, "mdi:gas-station", 1.0, 1),  # Short term fuel trim bank 1
+    0x07: PidInfo("%", None, "mdi:gas-station", 1.0, 1),  # Long term fuel trim bank 1
+    0x08: PidInfo("%", None, "mdi:gas-station", 1.0, 1),  # Short term fuel trim bank 2
+    0x09: PidInfo("%", None, "mdi:gas-station", 1.0, 1),  # Long term fuel trim bank 2
+    # Fuel pressure
+    0x0A: PidInfo("kPa", SensorDeviceClass.PRESSURE, "mdi:gauge", 1.0, 0),
+    # Intake manifold pressure
+    0x0B: PidInfo("kPa", SensorDeviceClass.PRESSURE, "mdi:gauge", 1.0, 0),
+    0x0C: PidInfo("rpm", None, "mdi:engine", 50.0, 0),  # Engine RPM
+    0x0D: PidInfo("km/h", SensorDeviceClass.SPEED, "mdi:speedometer", 1.0, 0),  # Speed
+    0x0E: PidInfo("°", None, "mdi:engine", 1.0, 1),  # Timing advance
+    # Intake air temperature
+    0x0F: PidInfo("°C", SensorDeviceClass.TEMPERATURE, "mdi:thermometer", 0.5, 0),
+    0x10: PidInfo("g/s", None, "mdi:air-filter", 0.5, 2),  # Mass air flow
+    0x11: PidInfo("%", None, "mdi:gauge", 1.0, 0),  # Throttle position
+    # Run time since engine start
+    0x1F: PidInfo("s", SensorDeviceClass.DURATION, "mdi:timer-outline", 1.0, 0),
+    # Distance travelled with MIL lit
+    0x21: PidInfo(
+        "km",
+        SensorDeviceClass.DISTANCE,
+        "mdi:map-marker-distance",
+        1.0,
+        0,
+        PRIORITY_BULK,
+    ),
+    # Fuel rail pressure
+    0x22: PidInfo("kPa", SensorDeviceClass.PRESSURE, "mdi:gauge", 1.0, 0),
+    0x2F: PidInfo("%", None, "mdi:gas-station", 1.0, 0),  # Fuel level
+    # Distance travelled since codes cleared
+    0x31: PidInfo(
+        "km",
+        SensorDeviceClass.DISTANCE,
+        "mdi:map-marker-distance",
+        1.0,
+        0,
+        PRIORITY_BULK,
+    ),
+    # Barometric pressure
+    0x33: PidInfo(
+        "kPa",
+        SensorDeviceClass.ATMOSPHERIC_PRESSURE,
+        "mdi:gauge",
+        1.0,
+        0,
+        PRIORITY_BULK,
+    ),
+    # Catalyst temperature bank 1 sensor 1
+    0x3C: PidInfo("°C", SensorDeviceClass.TEMPERATURE, "mdi:thermometer", 1.0, 0),
+    # Control module voltage
+    0x42: PidInfo(
+        "V", SensorDeviceClass.VOLTAGE, "mdi:car-battery", 0.1, 2, PRIORITY_CRITICAL
+    ),
+    0x43: PidInfo("%", None, "mdi:engine", 1.0, 0),  # Absolute load
+    0x45: PidInfo("%", None, "mdi:gauge", 1.0, 0),  # Relative throttle position
+    # Ambient air temperature
+    0x46: PidInfo(
+        "°C", SensorDeviceClass.TEMPERATURE, "mdi:thermometer", 0.5, 0, PRIORITY_BULK
+    ),
+    # Engine oil temperature
+    0x5C: PidInfo(
+        "°C",
+        SensorDeviceClass.TEMPERATURE,
+        "mdi:oil-temperature",
+        0.5,
+        0,
+        PRIORITY_CRITICAL,
+    ),
+    0x5E: PidInfo("L/h", None, "mdi:gas-station", 0.1, 2),  # Engine fuel rate
+    # Odometer
+    0xA6: PidInfo(
+        "km",
+        SensorDeviceClass.DISTANCE,
+        "mdi:counter",
+        1.0,
+        0,
+        PRIORITY_BULK,
+    ),
+    # Torque extended PIDs
+    # GPS speed
+    0xFF1001: PidInfo("km/h", SensorDeviceClass.SPEED, "mdi:speedometer", 1.0, 0),
+    0xFF1005: PidInfo("°", None, "mdi:longitude", 0.00001, 6),  # GPS longitude
+    0xFF1006: PidInfo("°", None, "mdi:latitude", 0.00001, 6),  # GPS latitude
+    # GPS altitude
+    0xFF1010: PidInfo("m", SensorDeviceClass.DISTANCE, "mdi:altimeter", 1.0, 0),
+    0xFF1201: PidInfo("mpg", None, "mdi:gas-station", 0.1, 1),  # MPG (instant)
+    # Turbo boost and vacuum
+    0xFF1202: PidInfo("psi", SensorDeviceClass.PRESSURE, "mdi:turbine", 0.5, 1),
+    # Trip distance
+    0xFF1204: PidInfo(
+        "km", SensorDeviceClass.DISTANCE, "mdi:map-marker-distance", 0.1, 1
+    ),
+    0xFF1205: PidInfo("mpg", None, "mdi:gas-station", 0.1, 1),  # Trip MPG
+    0xFF1207: PidInfo("L/100km", None, "mdi:gas-station", 0.1, 1),  # L/100km (instant)
+    0xFF1208: PidInfo("L/100km", None, "mdi:gas-station", 0.1, 1),  # Trip L/100km
+    0xFF1220: PidInfo("g", None, "mdi:axis-x-arrow", 0.05, 2),  # Acceleration X
+    0xFF1221: PidInfo("g", None, "mdi:axis-y-arrow", 0.05, 2),  # Acceleration Y
+    0xFF1222: PidInfo("g", None, "mdi:axis-z-arrow", 0.05, 2),  # Acceleration Z
+    0xFF1223: PidInfo("g", None, "mdi:axis-arrow", 0.05, 2),  # Acceleration total
+    # GPS accuracy
+    0xFF1239: PidInfo("m", SensorDeviceClass.DISTANCE, "mdi:crosshairs-gps", 1.0, 0),
+    0xFF123B: PidInfo("°", None, "mdi:compass", 5.0, 0),  # GPS bearing
+    0xFF125A: PidInfo("cc/min", None, "mdi:gas-station", 1.0, 0),  # Fuel flow
+    # Trip time since journey start
+    0xFF1266: PidInfo("s", SensorDeviceClass.DURATION, "mdi:timer-outline", 1.0, 0),
+    # Distance to empty
+    0xFF126A: PidInfo(
+        "km", SensorDeviceClass.DISTANCE, "mdi:gas-station", 1.0, 0, PRIORITY_BULK
+    ),
+    0xFF126B: PidInfo("%", None, "mdi:gas-station", 1.0, 0),  # Fuel remaining
+    # Trip fuel used
+    0xFF1271: PidInfo("L", SensorDeviceClass.VOLUME, "mdi:gas-station", 0.1, 2),
+    # MPG (long term)
+    0xFF5201: PidInfo("mpg", None, "mdi:gas-station", 0.1, 1, PRIORITY_BULK),
+}
+
+# Name keywords for PIDs outside the catalog, longest first so "temperature"
+# wins over "temp" and "voltage" over "volt"
+NAME_KEYWORDS: Pattern[str] = re.compile(
+    "|".join(
+        sorted(
+            {
+                "battery",
+                "coolant",
+                "engine",
+                "fuel",
+                "pressure",
+                "rpm",
+                "speed",
+                "temp",
+                "temperature",
+                "volt",
+                "voltage",
+            },
+            key=len,
+            reverse=True,
+        )
+    )
+)
+
+
+def _icon_from_keywords(found: set[str]) -> str | None:
+    """Pick an icon from the keywords found in a sensor name.
+
+    Args:
+        found: Keywords found in the name
+
+    Returns:
+        Icon string or None for default
+    """
+    if "temp" in found or "temperature" in found:
+        return "mdi:coolant-temperature" if "coolant" in found else "mdi:thermometer"
+    if "speed" in found:
+        return "mdi:speedometer"
+    if "rpm" in found or "engine" in found:
+        return "mdi:engine"
+    if "fuel" in found:
+        return "mdi:gas-station"
+    if "volt" in found or "voltage" in found or "battery" in found:
+        return "mdi:car-battery"
+    return None
+
+
+def guess_pid_info(name: str | None, unit: str | None) -> PidInfo:
+    """Guess sensor metadata from the sensor name.
+
+    Names depend on the app language and vehicle profile, so this is only
+    used for PIDs outside the catalog.
+
+    Args:
+        name: Sensor name from Torque
+        unit: Unit of measurement from Torque
+
+    Returns:
+        Guessed metadata, never with a device class
+    """
+    found = set(NAME_KEYWORDS.findall(name.lower())) if name else set()
+    significant_change = next(
+        (
+            threshold
+            for keyword, threshold in SENSOR_SIGNIFICANT_CHANGES.items()
+            if keyword in found
+        ),
+        SIGNIFICANT_CHANGE,
+    )
+    return PidInfo(
+        unit, None, _icon_from_keywords(found), significant_change, DEFAULT_PRECISION
+    )
+
+
+def lookup_pid(pid: int, name: str | None, unit: str | None) -> PidInfo:
+    """Resolve sensor metadata of a PID.
+
+    Args:
+        pid: PID identifier
+        name: Sensor name from Torque
+        unit: Unit of measurement from Torque
+
+    Returns:
+        Catalog metadata if the PID is known and reported in its canonical
+        unit, otherwise metadata guessed from the name
+    """
+    info = PID_CATALOG.get(pid)
+    if info is not None and info.unit == unit:
+        return info
+    return guess_pid_info(name, unit)
@@ -0,0 +1,170 @@
+"""On-demand profiling of the Torque ingest path."""
+
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import pstats
+import time
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.logbook import async_log_entry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import slugify
+
+from .const import DATA_PROFILER, DOMAIN, PROFILE_TOP_FUNCTIONS
+
+if TYPE_CHECKING:
+    from .sensor import TorqueReceiveDataView
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def summarize_stats(stats: pstats.Stats, top: int = PROFILE_TOP_FUNCTIONS) -> list[str]:
+    """List the functions with the highest own time.
+
+    Args:
+        stats: Collected profiler statistics
+        top: Number of functions to list
+
+    Returns:
+        One line per function, slowest first
+    """
+    rows = sorted(
+        stats.stats.items(),  # type: ignore[attr-defined]
+        key=lambda item: item[1][2],
+        reverse=True,
+    )[:top]
+    return [
+        f"{function} ({os.path.basename(filename)}:{line}) "
+        f"{own_time * 1000:.1f} ms in {calls} calls"
+        for (filename, line, function), (_, calls, own_time, _, _) in rows
+    ]
+
+
+class IngestProfiler:
+    """Deterministic profile of one vehicle's upload handling.
+
+    Only the time spent inside the receiver is recorded: the profiler is
+    enabled around each accepted upload, which covers parsing and every
+    ``TorqueSensor.async_on_update`` call. It switches itself off after a
+    duration or a number of uploads, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        view: TorqueReceiveDataView,
+        duration: float,
+        max_requests: int | None = None,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            hass: Home Assistant instance
+            view: Receiver view of the vehicle to profile
+            duration: Seconds after which profiling stops
+            max_requests: Uploads after which profiling stops, None for no limit
+        """
+        self.hass = hass
+        self.view = view
+        self.duration = duration
+        self.max_requests = max_requests
+        self.requests = 0
+        self._profile = cProfile.Profile()
+        self._active = False
+        self._finished = False
+        self._cancel_timer: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Attach the profiler to its view and arm the duration timer."""
+        self.hass.data[DATA_PROFILER] = self
+        self.view.profiler = self
+        self._cancel_timer = async_call_later(
+            self.hass, self.duration, self._async_timeout
+        )
+        _LOGGER.info(
+            "Profiling Torque uploads of %s for %s seconds",
+            self.view.vehicle,
+            self.duration,
+        )
+
+    def enable(self) -> None:
+        """Start recording before accepted uploads are handled."""
+        try:
+            self._profile.enable()
+        except ValueError as exc:
+            # Another profiler is already active on this thread
+            _LOGGER.warning("Could not profile Torque upload: %s", exc)
+            return
+        self._active = True
+
+    def disable(self, uploads: int = 1) -> bool:
+        """Stop recording after uploads were handled.
+
+        Args:
+            uploads: Number of uploads handled while recording
+
+        Returns:
+            True if the request limit was reached and profiling should end
+        """
+        if self._active:
+            self._profile.disable()
+            self._active = False
+        self.requests += uploads
+        return self.max_requests is not None and self.requests >= self.max_requests
+
+    @callback
+    def _async_timeout(self, _now: Any) -> None:
+        """Finish profiling once the duration has passed."""
+        self._cancel_timer = None
+        self.hass.async_create_task(self.async_finish())
+
+    async def async_finish(self) -> None:
+        """Detach the profiler, write the stats file and log a summary."""
+        if self._finished:
+            return
+        self._finished = True
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+        if self.view.profiler is self:
+            self.view.profiler = None
+        if self.hass.data.get(DATA_PROFILER) is self:
+            del self.hass.data[DATA_PROFILER]
+
+        if not self.requests:
+            message = "no uploads received while profiling"
+            path = None
+        else:
+            path = self.hass.config.path(
+                f"{DOMAIN}_profile_{slugify(self.view.vehicle)}_{int(time.time())}.prof"
+            )
+            summary = await self.hass.async_add_executor_job(self._write, path)
+            message = (
+                f"profiled {self.requests} uploads, stats written to {path}. "
+                f"Top functions: {'; '.join(summary)}"
+            )
+
+        _LOGGER.info("Torque profiler for %s: %s", self.view.vehicle, message)
+        async_log_entry(
+            self.hass, f"Torque profiler ({self.view.vehicle})", message, DOMAIN
+        )
+
+    def _write(self, path: str) -> list[str]:
+        """Dump the stats to disk and summarize them.
+
+        Runs in the executor.
+
+        Args:
+            path: Path of the stats file
+
+        Returns:
+            Summary lines of the slowest functions
+        """
+        stats = pstats.Stats(self._profile)
+        stats.dump_stats(path)
+        return summarize_stats(stats)
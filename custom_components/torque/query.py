@@ -0,0 +1,256 @@
+"""Queries over archived Torque sessions."""
+
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .archive import (
+    ARCHIVE_SUFFIX,
+    archive_directory,
+    iter_block,
+    map_archive,
+    read_index,
+)
+from .const import DATA_QUERY_CACHE, QUERY_CACHE_SIZE, QUERY_DEFAULT_POINTS
+
+
+class QueryCache:
+    """Least recently used cache of query results.
+
+    Keys include the size and modification time of the archive, so results
+    for a session that is still being written are never served stale.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            maxsize: Number of results kept
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        """Return a cached result and mark it as recently used.
+
+        Args:
+            key: Query key
+
+        Returns:
+            Cached result or None
+        """
+        if (result := self._results.get(key)) is None:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: Hashable, result: dict[str, Any]) -> None:
+        """Store a result, evicting the least recently used one when full.
+
+        Args:
+            key: Query key
+            result: Query result
+        """
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+
+def list_sessions(directory: str, suffix: str = ARCHIVE_SUFFIX) -> list[str]:
+    """Return the stored sessions of a vehicle, most recent last.
+
+    Args:
+        directory: Archive or track directory of the vehicle
+        suffix: File suffix of the session files
+
+    Returns:
+        Session names ordered by modification time
+    """
+    try:
+        entries = [
+            entry
+            for entry in os.scandir(directory)
+            if entry.name.endswith(suffix) and entry.is_file()
+        ]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    return [entry.name.removesuffix(suffix) for entry in entries]
+
+
+def query_pid(
+    path: str, pid: int, start: float, end: float, points: int
+) -> dict[str, Any]:
+    """Return the samples of a PID in a time range, downsampled.
+
+    Blocks are decoded one at a time and their samples folded into the
+    min/max buckets right away, so a long range never exists as Python
+    objects. The buckets span the overlapping blocks clipped to the range.
+
+    Args:
+        path: Archive file
+        pid: PID to read
+        start: First epoch timestamp to include
+        end: Last epoch timestamp to include
+        points: Number of min/max buckets at most
+
+    Returns:
+        Number of samples and (bucket start, min, max) points
+    """
+    start_ms, end_ms = start * 1000, end * 1000
+    # Blocks are indexed only once written, so the map below holds them all
+    blocks = [
+        (first, last, offset)
+        for first, last, offset, _ in read_index(path)
+        if last >= start_ms and first <= end_ms
+    ]
+    if not blocks:
+        return {"pid": pid, "samples": 0, "points": []}
+    first_ms = max(start_ms, min(block[0] for block in blocks))
+    width = (min(end_ms, max(block[1] for block in blocks)) - first_ms) / points
+    width = width or 1.0
+
+    lows = array("d", [math.inf]) * points
+    highs = array("d", [-math.inf]) * points
+    count = 0
+    last_bucket = points - 1
+    with map_archive(path) as archive:
+        for _, _, offset in blocks:
+            for _, times_ms, values in iter_block(archive, offset, {pid}):
+                for time_ms, value in zip(times_ms, values, strict=True):
+                    if not start_ms <= time_ms <= end_ms:
+                        continue
+                    bucket = min(int((time_ms - first_ms) / width), last_bucket)
+                    if value < lows[bucket]:
+                        lows[bucket] = value
+                    if value > highs[bucket]:
+                        highs[bucket] = value
+                    count += 1
+
+    return {
+        "pid": pid,
+        "samples": count,
+        "points": [
+            ((first_ms + bucket * width) / 1000, lows[bucket], highs[bucket])
+            for bucket in range(points)
+            if lows[bucket] <= highs[bucket]
+        ],
+    }
+
+
+def trip_summary(path: str) -> dict[str, Any]:
+    """Summarize a session, one block at a time.
+
+    Args:
+        path: Archive file
+
+    Returns:
+        Time span and per-PID sample count, min, max and mean
+    """
+    index = read_index(path)
+    stats: dict[int, list[float]] = {}  # pid -> [count, min, max, sum]
+    with map_archive(path) as archive:
+        for _, _, offset, _ in index:
+            for pid, _, values in iter_block(archive, offset):
+                if (pid_stats := stats.get(pid)) is None:
+                    pid_stats = stats[pid] = [0, math.inf, -math.inf, 0.0]
+                pid_stats[0] += len(values)
+                pid_stats[1] = min(pid_stats[1], min(values))
+                pid_stats[2] = max(pid_stats[2], max(values))
+                pid_stats[3] += math.fsum(values)
+
+    start = min((record[0] for record in index), default=0) / 1000
+    end = max((record[1] for record in index), default=0) / 1000
+    return {
+        "start": start,
+        "end": end,
+        "duration": end - start,
+        "blocks": len(index),
+        "samples": int(sum(pid_stats[0] for pid_stats in stats.values())),
+        "pids": [
+            {
+                "pid": pid,
+                "samples": int(count),
+                "min": low,
+                "max": high,
+                "mean": total / count,
+            }
+            for pid, (count, low, high, total) in sorted(stats.items())
+        ],
+    }
+
+
+async def async_query(
+    hass: HomeAssistant,
+    vehicle: str,
+    session: str | None = None,
+    pid: int | None = None,
+    start: float | None = None,
+    end: float | None = None,
+    points: int | None = None,
+) -> dict[str, Any]:
+    """Answer a PID range or trip summary query over a vehicle's archive.
+
+    Args:
+        hass: Home Assistant instance
+        vehicle: Vehicle name
+        session: Archived session, the most recent one if None
+        pid: PID to read, None for a trip summary
+        start: First epoch timestamp to include, None for the session start
+        end: Last epoch timestamp to include, None for the session end
+        points: Number of min/max buckets for a PID query
+
+    Returns:
+        Query result, including the session it was answered from
+
+    Raises:
+        HomeAssistantError: If the session is not archived
+    """
+    directory = archive_directory(hass, vehicle)
+    if session is None:
+        sessions = await hass.async_add_executor_job(list_sessions, directory)
+        if not sessions:
+            raise HomeAssistantError(f"No archived sessions for {vehicle}")
+        session = sessions[-1]
+    path = os.path.join(directory, f"{session}{ARCHIVE_SUFFIX}")
+    if os.path.dirname(os.path.normpath(path)) != os.path.normpath(directory):
+        raise HomeAssistantError(f"Invalid session {session}")
+
+    try:
+        stat = await hass.async_add_executor_job(os.stat, path)
+    except FileNotFoundError as exc:
+        raise HomeAssistantError(f"No archived session {session}") from exc
+
+    job: Callable[..., dict[str, Any]] = trip_summary
+    args: tuple[Any, ...] = (path,)
+    if pid is not None:
+        job = query_pid
+        args = (
+            path,
+            pid,
+            -math.inf if start is None else start,
+            math.inf if end is None else end,
+            points or QUERY_DEFAULT_POINTS,
+        )
+
+    cache: QueryCache = hass.data.setdefault(
+        DATA_QUERY_CACHE, QueryCache(QUERY_CACHE_SIZE)
+    )
+    key = (job.__name__, *args, stat.st_size, stat.st_mtime_ns)
+    if (result := cache.get(key)) is None:
+        result = await hass.async_add_executor_job(job, *args)
+        cache.put(key, result)
+    return {"session": session, **result}
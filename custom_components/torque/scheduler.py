@@ -0,0 +1,216 @@
+"""Integration-wide budget for sensor state writes."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import MIN_UPDATE_INTERVAL, WRITE_SCHEDULER_TICK
+
+if TYPE_CHECKING:
+    from .sensor import TorqueSensor
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WriteScheduler:
+    """Cap the rate of state writes across all vehicles.
+
+    Sensors still apply their own deadband and interval. Values that pass
+    are queued here instead of being written, one entry per sensor so newer
+    values replace older ones. Every tick the budget is spent on the queued
+    values with the highest priority: the change relative to the PID's
+    deadband plus the time since the sensor was last written. Values of
+    critical PIDs are written at once while the budget has writes left and
+    are queued first otherwise.
+
+    Each config entry sets a budget; the lowest non-zero one applies so the
+    ceiling holds whatever the number of vehicles. With no budget set,
+    sensors write immediately and nothing is queued.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            hass: Home Assistant instance
+        """
+        self.hass = hass
+        self.budget = 0.0  # writes per second, 0 for unlimited
+        self.written = 0
+        self.coalesced = 0
+        self._budgets: dict[str, float] = {}
+        # sensor -> (value, sample time, significance, last written time)
+        self._pending: dict[TorqueSensor, tuple[float, float, float, float]] = {}
+        self._tokens = 0.0
+        self._cancel_tick: CALLBACK_TYPE | None = None
+
+    def __len__(self) -> int:
+        """Return the number of queued values."""
+        return len(self._pending)
+
+    @callback
+    def async_set_budget(self, entry_id: str, budget: float) -> None:
+        """Set the budget requested by a config entry.
+
+        Args:
+            entry_id: Config entry requesting the budget
+            budget: Writes per second, 0 for unlimited
+        """
+        self._budgets[entry_id] = budget
+        self._async_apply_budget()
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Drop the budget of an unloaded config entry.
+
+        Args:
+            entry_id: Config entry being unloaded
+        """
+        self._budgets.pop(entry_id, None)
+        self._async_apply_budget()
+
+    @callback
+    def _async_apply_budget(self) -> None:
+        """Recompute the effective budget and start or stop the tick."""
+        budgets = [budget for budget in self._budgets.values() if budget > 0]
+        self.budget = min(budgets) if budgets else 0.0
+
+        if self.budget and self._cancel_tick is None:
+            self._cancel_tick = async_track_time_interval(
+                self.hass, self._async_tick, timedelta(seconds=WRITE_SCHEDULER_TICK)
+            )
+        elif not self.budget and self._cancel_tick is not None:
+            self._cancel_tick()
+            self._cancel_tick = None
+            self._tokens = 0.0
+            # Nothing limits writes anymore, so release what is queued
+            self._async_write(list(self._pending))
+        _LOGGER.debug("Torque write budget set to %s writes/s", self.budget or None)
+
+    def submit(
+        self,
+        sensor: TorqueSensor,
+        value: float,
+        sample_time: float,
+        significance: float,
+        last_update: float,
+    ) -> None:
+        """Queue a value, replacing one already queued for the sensor.
+
+        Args:
+            sensor: Sensor the value belongs to
+            value: New sensor value
+            sample_time: Epoch timestamp the value was sampled at
+            significance: Change relative to the PID's deadband
+            last_update: Epoch timestamp the sensor was last written
+        """
+        if (queued := self._pending.get(sensor)) is not None:
+            self.coalesced += 1
+            significance = max(significance, queued[2])
+        self._pending[sensor] = (value, sample_time, significance, last_update)
+
+    @callback
+    def async_write_now(
+        self,
+        sensor: TorqueSensor,
+        value: float,
+        sample_time: float,
+        last_update: float,
+    ) -> bool:
+        """Write a value that should not wait, within the budget.
+
+        The write is taken from the budget left in the current tick. When
+        none is left, the value is queued ahead of every other value.
+
+        Args:
+            sensor: Sensor the value belongs to
+            value: New sensor value
+            sample_time: Epoch timestamp the value was sampled at
+            last_update: Epoch timestamp the sensor was last written
+
+        Returns:
+            True if the state was written now
+        """
+        if self._tokens < 1:
+            self.submit(sensor, value, sample_time, math.inf, last_update)
+            return False
+
+        self._tokens -= 1
+        self._pending.pop(sensor, None)
+        if not sensor.async_write_value(value, sample_time):
+            return False
+        self.written += 1
+        return True
+
+    def _priority(self, sensor: TorqueSensor, now: float) -> float:
+        """Return the priority of a queued value.
+
+        Args:
+            sensor: Sensor the value belongs to
+            now: Current epoch timestamp
+
+        Returns:
+            Significance plus staleness in units of MIN_UPDATE_INTERVAL
+        """
+        _, _, significance, last_update = self._pending[sensor]
+        return significance + (now - last_update) / MIN_UPDATE_INTERVAL
+
+    @callback
+    def _async_tick(self, _now: Any = None) -> None:
+        """Spend the budget of one tick on the most important values."""
+        per_tick = self.budget * WRITE_SCHEDULER_TICK
+        # Unused budget carries over for at most one tick, so fractional
+        # budgets still write but idle time does not build up bursts
+        self._tokens = min(self._tokens + per_tick, max(per_tick, 1.0))
+        count = int(self._tokens)
+        if not count or not self._pending:
+            return
+
+        if count >= len(self._pending):
+            chosen = list(self._pending)
+        else:
+            now = time.time()
+            chosen = heapq.nlargest(
+                count,
+                self._pending,
+                key=lambda sensor: self._priority(sensor, now),
+            )
+        self._tokens -= len(chosen)
+        self._async_write(chosen)
+
+    @callback
+    def _async_write(self, sensors: list[TorqueSensor]) -> None:
+        """Write the queued values of sensors.
+
+        Args:
+            sensors: Sensors whose queued value is written
+        """
+        for sensor in sensors:
+            value, sample_time, _, _ = self._pending.pop(sensor)
+            # Sensors of an unloaded entry are dropped
+            if sensor.hass is None:
+                continue
+            if sensor.async_write_value(value, sample_time):
+                self.written += 1
+
+    @callback
+    def async_diagnostics(self) -> dict[str, Any]:
+        """Describe the scheduler for diagnostics.
+
+        Returns:
+            Budget, queue length and counters
+        """
+        return {
+            "budget": self.budget,
+            "queued": len(self._pending),
+            "written": self.written,
+            "coalesced": self.coalesced,
+        }
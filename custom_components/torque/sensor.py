@@ -3,39 +3,106 @@
 from __future__ import annotations
 
 import logging
+import math
 import re
 import time
+from collections.abc import Collection
+from dataclasses import dataclass
+from datetime import timedelta
 from re import Pattern
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from aiohttp import web
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.sensor import (
     RestoreSensor,
     SensorEntity,
+    SensorEntityDescription,
+    SensorExtraStoredData,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, EntityCategory
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity_registry import (
     async_get as async_get_entity_registry,
 )
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 
+from .archive import SessionArchive
+from .batch import TorqueBatchView
 from .const import (
     API_PATH,
+    BULK_CHANGE_FACTOR,
+    CONF_ADAPTIVE_DEADBAND,
+    CONF_ARCHIVE,
+    CONF_BULK_PIDS,
+    CONF_CRITICAL_PIDS,
     CONF_EMAIL,
+    CONF_EVENT_INTERVAL,
+    CONF_EVENT_PIDS,
+    CONF_GPX_TRACK,
+    CONF_HISTORY_SIZE,
+    CONF_IDLE_EVICTION,
     CONF_NAME,
+    CONF_PERCENTILE_PIDS,
+    CONF_PRECISION_MAP,
+    CONF_STALE_TIMEOUT,
+    CONF_TRACK_TOLERANCE,
+    CONF_WRITE_BUDGET,
+    CRITICAL_CHANGE_FACTOR,
+    DATA_BATCH_VIEW,
+    DATA_LIVE,
+    DATA_METRICS_OWNER,
+    DATA_METRICS_VIEW,
+    DATA_SCHEDULER,
+    DATA_SHARDS,
+    DATA_VIEWS,
+    DEFAULT_ADAPTIVE_DEADBAND,
+    DEFAULT_ARCHIVE,
+    DEFAULT_EVENT_INTERVAL,
+    DEFAULT_GPX_TRACK,
+    DEFAULT_HISTORY_SIZE,
+    DEFAULT_IDLE_EVICTION,
     DEFAULT_NAME,
+    DEFAULT_STALE_TIMEOUT,
+    DEFAULT_TRACK_TOLERANCE,
+    DEFAULT_WRITE_BUDGET,
     DOMAIN,
-    MIN_UPDATE_INTERVAL,
+    EVENT_PAYLOAD,
+    LATE_FLUSH_DELAY,
+    LATE_PAYLOAD_THRESHOLD,
+    LATE_RESYNC_RATE,
+    METRICS_PUBLISH_INTERVAL,
+    PRIORITY_BULK,
+    PRIORITY_CRITICAL,
     SENSOR_EMAIL_FIELD,
+    SENSOR_METADATA_PREFIXES,
     SENSOR_NAME_KEY,
-    SENSOR_SIGNIFICANT_CHANGES,
+    SENSOR_SESSION_FIELD,
+    SENSOR_TIME_FIELD,
     SENSOR_UNIT_KEY,
     SENSOR_VALUE_KEY,
-    SIGNIFICANT_CHANGE,
+    STALE_CHECK_RESOLUTION,
+    UPDATE_REJECTED,
+    UPDATE_THROTTLED,
+    UPDATE_WRITTEN,
 )
+from .deadband import AdaptiveDeadband
+from .fleet import ShardStore, VehicleShard
+from .history import VehicleHistory
+from .importer import HourlyAggregator, async_import_hourly
+from .metrics import TorqueMetrics, TorqueMetricsView, metrics_snapshot
+from .motion import DEFAULT_POLICY, ThrottlePolicy, VehicleMotion
+from .pids import lookup_pid
+from .scheduler import WriteScheduler
+from .sketch import PERCENTILE_ATTRIBUTES, PercentileTracker
+from .track import VehicleTrack
+from .websocket_api import LiveStream
+
+if TYPE_CHECKING:
+    from .profiler import IngestProfiler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -44,6 +111,72 @@ NAME_KEY: Pattern[str] = re.compile(SENSOR_NAME_KEY)
 UNIT_KEY: Pattern[str] = re.compile(SENSOR_UNIT_KEY)
 VALUE_KEY: Pattern[str] = re.compile(SENSOR_VALUE_KEY)
 
+# Diagnostic sensors publishing the receiver's performance counters
+METRIC_SENSORS: tuple[SensorEntityDescription, ...] = (
+    SensorEntityDescription(
+        key="request_rate",
+        name="Requests per second",
+        native_unit_of_measurement="req/s",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+    ),
+    SensorEntityDescription(
+        key="parse_latency_p50",
+        name="Parse latency p50",
+        native_unit_of_measurement="ms",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="parse_latency_p95",
+        name="Parse latency p95",
+        native_unit_of_measurement="ms",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="parse_latency_p99",
+        name="Parse latency p99",
+        native_unit_of_measurement="ms",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="keys_per_payload",
+        name="Keys per payload",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+    SensorEntityDescription(
+        key="values_accepted",
+        name="Values accepted",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="values_throttled",
+        name="Values throttled",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="values_rejected",
+        name="Values rejected as non-numeric",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="entities_created",
+        name="Entities created",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    SensorEntityDescription(
+        key="queue_depth",
+        name="Queue depth",
+        state_class=SensorStateClass.MEASUREMENT,
+    ),
+)
+
+FLEET_DEVICE_INFO: dict[str, Any] = {
+    "identifiers": {(DOMAIN, "fleet_metrics")},
+    "name": "Torque integration",
+    "manufacturer": "Torque Pro",
+    "model": "Integration metrics",
+}
+
 
 def convert_pid(value: str) -> int | None:
     """Convert PID from hex string to integer.
@@ -62,6 +195,61 @@ def convert_pid(value: str) -> int | None:
         return None
 
 
+def parse_pid_list(option: str | None) -> frozenset[int]:
+    """Parse an option holding a comma-separated list of PIDs.
+
+    Args:
+        option: Comma-separated PIDs
+
+    Returns:
+        Parsed PIDs, ignoring invalid items
+    """
+    if not option:
+        return frozenset()
+    return frozenset(
+        int(item.strip()) for item in option.split(",") if item.strip().isdigit()
+    )
+
+
+def parse_precision_map(option: str | None) -> dict[int, int]:
+    """Parse an option holding comma-separated ``pid:digits`` pairs.
+
+    Args:
+        option: Comma-separated pairs
+
+    Returns:
+        Decimal places by PID, ignoring invalid pairs
+    """
+    precision_map: dict[int, int] = {}
+    if not option:
+        return precision_map
+
+    for pair in option.split(","):
+        key_str, _, value_str = pair.partition(":")
+        if key_str.strip().isdigit() and value_str.strip().isdigit():
+            precision_map[int(key_str)] = int(value_str)
+        else:
+            _LOGGER.warning("Ignoring invalid precision_map entry: %s", pair)
+    return precision_map
+
+
+def vehicle_device_info(vehicle: str) -> dict[str, Any]:
+    """Return device information for a vehicle.
+
+    Args:
+        vehicle: Vehicle name
+
+    Returns:
+        Device information dictionary
+    """
+    return {
+        "identifiers": {(DOMAIN, vehicle)},
+        "name": f"Torque {vehicle}",
+        "manufacturer": "Torque Pro",
+        "model": "OBD Vehicle Data",
+    }
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -78,6 +266,46 @@ async def async_setup_entry(
     vehicle = config_entry.data.get(CONF_NAME, DEFAULT_NAME)
     sensors: dict[int, TorqueSensor] = {}
 
+    # One write budget shared by every vehicle
+    scheduler: WriteScheduler = hass.data.setdefault(
+        DATA_SCHEDULER, WriteScheduler(hass)
+    )
+    scheduler.async_set_budget(
+        config_entry.entry_id,
+        config_entry.options.get(CONF_WRITE_BUDGET, DEFAULT_WRITE_BUDGET),
+    )
+    config_entry.async_on_unload(
+        lambda: scheduler.async_remove_entry(config_entry.entry_id)
+    )
+    motion = VehicleMotion()
+    history = VehicleHistory(
+        config_entry.options.get(CONF_HISTORY_SIZE, DEFAULT_HISTORY_SIZE)
+    )
+    archive: SessionArchive | None = None
+    if config_entry.options.get(CONF_ARCHIVE, DEFAULT_ARCHIVE):
+        archive = SessionArchive(hass, vehicle)
+        config_entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, archive.async_close)
+        )
+    track: VehicleTrack | None = None
+    if config_entry.options.get(CONF_GPX_TRACK, DEFAULT_GPX_TRACK):
+        track = VehicleTrack(
+            hass,
+            vehicle,
+            config_entry.options.get(CONF_TRACK_TOLERANCE, DEFAULT_TRACK_TOLERANCE),
+        )
+        config_entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, track.async_close)
+        )
+
+    # Fleet mode: compact state of evicted vehicles, shared by all entries
+    shards: ShardStore | None = None
+    if config_entry.options.get(CONF_IDLE_EVICTION, DEFAULT_IDLE_EVICTION):
+        shards = hass.data.get(DATA_SHARDS)
+        if shards is None:
+            shards = hass.data[DATA_SHARDS] = ShardStore(hass)
+            await shards.async_load()
+
     _LOGGER.info(
         "Setting up Torque entry: email=%s, vehicle=%s, entry_id=%s",
         email,
@@ -97,7 +325,7 @@ async def async_setup_entry(
     for entity in known_entities:
         # Extract PID from unique_id (assume format: torque_<vehicle>_<pid>)
         parts = entity.unique_id.split("_")
-        if len(parts) >= 3 and parts[0] == DOMAIN:
+        if len(parts) >= 3 and parts[0] == DOMAIN and parts[-1].isdigit():
             try:
                 pid = int(parts[-1])
                 name = entity.original_name or f"PID {pid}"
@@ -109,6 +337,9 @@ async def async_setup_entry(
                     pid=pid,
                     vehicle=vehicle,
                     options=config_entry.options,
+                    scheduler=scheduler,
+                    motion=motion,
+                    history=history,
                 )
                 sensors[pid] = sensor
                 new_entities.append(sensor)
@@ -127,13 +358,49 @@ async def async_setup_entry(
         )
 
     # Register the HTTP view for receiving Torque data
-    hass.http.register_view(
-        TorqueReceiveDataView(
-            email=email,
-            vehicle=vehicle,
-            sensors=sensors,
-            async_add_entities=async_add_entities,
-            config_entry=config_entry,
+    view = TorqueReceiveDataView(
+        email=email,
+        vehicle=vehicle,
+        sensors=sensors,
+        async_add_entities=async_add_entities,
+        config_entry=config_entry,
+        hass=hass,
+        scheduler=scheduler,
+        motion=motion,
+        live=hass.data.setdefault(DATA_LIVE, LiveStream()),
+        history=history,
+        archive=archive,
+        track=track,
+        shards=shards,
+    )
+    hass.http.register_view(view)
+    config_entry.async_on_unload(view.async_shutdown)
+    view.async_start_stale_check()
+    hass.data.setdefault(DATA_VIEWS, {})[config_entry.entry_id] = view
+
+    # HTTP views cannot be unregistered, so the scrape endpoint is added once
+    if not hass.data.get(DATA_METRICS_VIEW):
+        hass.http.register_view(TorqueMetricsView(hass))
+        hass.data[DATA_METRICS_VIEW] = True
+    if not hass.data.get(DATA_BATCH_VIEW):
+        hass.http.register_view(TorqueBatchView(hass))
+        hass.data[DATA_BATCH_VIEW] = True
+
+    # Diagnostic sensors for the performance counters; the integration-wide
+    # ones are owned by whichever entry is set up first
+    view.metric_sensors = [
+        TorqueMetricSensor(description, vehicle, vehicle_device_info(vehicle))
+        for description in METRIC_SENSORS
+    ]
+    async_add_entities(view.metric_sensors)
+    owner = hass.data.setdefault(DATA_METRICS_OWNER, config_entry.entry_id)
+    if owner == config_entry.entry_id:
+        view.async_add_fleet_metric_sensors()
+    config_entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            view.async_publish_metrics,
+            timedelta(seconds=METRICS_PUBLISH_INTERVAL),
         )
     )
     _LOGGER.debug("TorqueReceiveDataView registered for API path %s", API_PATH)
@@ -153,6 +420,14 @@ class TorqueReceiveDataView(HomeAssistantView):
         sensors: dict[int, TorqueSensor],
         async_add_entities: AddEntitiesCallback,
         config_entry: ConfigEntry | None = None,
+        hass: HomeAssistant | None = None,
+        scheduler: WriteScheduler | None = None,
+        motion: VehicleMotion | None = None,
+        live: LiveStream | None = None,
+        history: VehicleHistory | None = None,
+        archive: SessionArchive | None = None,
+        track: VehicleTrack | None = None,
+        shards: ShardStore | None = None,
     ) -> None:
         """Initialize a Torque data receiver view.
 
@@ -162,12 +437,80 @@ class TorqueReceiveDataView(HomeAssistantView):
             sensors: Dictionary of existing sensors by PID
             async_add_entities: Callback to add new entities
             config_entry: Configuration entry for options access
+            hass: Home Assistant instance for scheduling and statistics
+            scheduler: Integration-wide write budget handed to new sensors
+            motion: Motion state shared with the vehicle's sensors
+            live: Websocket live stream subscribers
+            history: Recent samples per PID, shared with the vehicle's sensors
+            archive: Session archive of every sample, None to keep none
+            track: GPS track of the current session, None to keep none
+            shards: Compact state of evicted vehicles, None outside fleet mode
         """
         self.email = email
         self.vehicle = vehicle
         self.sensors = sensors
         self.async_add_entities = async_add_entities
         self.config_entry = config_entry
+        self.hass = hass
+        self.scheduler = scheduler
+        self.motion = motion or VehicleMotion()
+        self.live = live or LiveStream()
+        self.history = history or VehicleHistory(DEFAULT_HISTORY_SIZE)
+        self.archive = archive
+        self.track = track
+
+        # State built from the uploads, created on the first one after startup
+        # and, in fleet mode, evicted again once the vehicle has been idle
+        self.shard: VehicleShard | None = None
+        self.shards = shards
+        self._cancel_eviction: CALLBACK_TYPE | None = None
+        # Session of the latest live upload, for the sensors' percentiles
+        self._session: str | None = None
+
+        # Samples Torque buffered offline and uploaded late: hourly statistics
+        # to backfill and the newest late value per PID for entity state
+        self._backfill = HourlyAggregator()
+        self._late_values: dict[int, tuple[str, float]] = {}
+        self._cancel_late_flush: CALLBACK_TYPE | None = None
+        # The vehicle's clock: its newest sample time and when that arrived
+        # (monotonic), starting from our own clock until the first upload
+        self._newest_sample = time.time()
+        self._newest_arrival = time.monotonic()
+        self._late_streak: tuple[float, float] | None = None
+
+        # Options are compiled once, changing them reloads the entry
+        options = config_entry.options if config_entry else {}
+        self._hidden_pids = parse_pid_list(options.get("hide_pids"))
+        self._rename_map = self._compile_rename_map(options.get("rename_map"))
+
+        # Payload event: upload keys of the opted-in PIDs and its rate limit
+        self._event_keys = {
+            f"k{pid:x}": pid for pid in parse_pid_list(options.get(CONF_EVENT_PIDS))
+        }
+        self._event_interval: float = options.get(
+            CONF_EVENT_INTERVAL, DEFAULT_EVENT_INTERVAL
+        )
+        self._last_event: float | None = None
+        self._idle_eviction: int = options.get(
+            CONF_IDLE_EVICTION, DEFAULT_IDLE_EVICTION
+        )
+
+        # Arrival times per PID for the staleness timer (monotonic seconds)
+        self._stale_timeout: int = options.get(
+            CONF_STALE_TIMEOUT, DEFAULT_STALE_TIMEOUT
+        )
+        self._received = 0.0
+        self._first_received: float | None = None
+        self._seen: dict[int, float] = {}
+        self._cancel_stale_check: CALLBACK_TYPE | None = None
+
+        # Performance counters and the diagnostic sensors publishing them
+        self.metrics = TorqueMetrics()
+        self.metric_sensors: list[TorqueMetricSensor] = []
+        self.fleet_metric_sensors: list[TorqueMetricSensor] = []
+
+        # Set by the torque.profile service while a profile is recorded
+        self.profiler: IngestProfiler | None = None
 
         _LOGGER.debug(
             "TorqueReceiveDataView initialized: email=%s, vehicle=%s", email, vehicle
@@ -182,7 +525,7 @@ class TorqueReceiveDataView(HomeAssistantView):
         Returns:
             HTTP response
         """
-        _LOGGER.debug("Received GET request: %s", dict(request.query))
+        self.metrics.bytes_received += len(request.query_string)
         return await self._handle_data(dict(request.query))
 
     async def post(self, request: web.Request) -> web.Response:
@@ -195,13 +538,49 @@ class TorqueReceiveDataView(HomeAssistantView):
             HTTP response
         """
         try:
+            # The body is cached, so parsing it below does not read it again
+            self.metrics.bytes_received += len(await request.read())
             data = await request.post()
-            _LOGGER.debug("Received POST request: %s", dict(data))
             return await self._handle_data(dict(data))
         except Exception as exc:
             _LOGGER.error("Error processing POST request: %s", exc)
             return web.Response(status=400, text="Invalid request data")
 
+    async def async_handle_batch(self, payloads: list[dict[str, Any]]) -> list[int]:
+        """Apply uploads received in bulk, in the order they were sampled.
+
+        Args:
+            payloads: Request data dictionaries
+
+        Returns:
+            HTTP status each upload would have been answered with
+        """
+        statuses: list[int] = []
+        accepted: list[dict[str, Any]] = []
+        for data in payloads:
+            if (error := self._check_payload(data)) is not None:
+                statuses.append(error.status)
+            else:
+                statuses.append(200)
+                accepted.append(data)
+        if not accepted:
+            return statuses
+
+        # Only accepted uploads are profiled
+        if (profiler := self.profiler) is None:
+            applied = await self._async_handle_batch(accepted)
+        else:
+            profiler.enable()
+            try:
+                applied = await self._async_handle_batch(accepted)
+            finally:
+                if profiler.disable(len(accepted)):
+                    self.hass.async_create_task(profiler.async_finish())
+
+        if not applied:
+            return [500 if status == 200 else status for status in statuses]
+        return statuses
+
     async def _handle_data(self, data: dict[str, Any]) -> web.Response:
         """Common handler for Torque GET/POST requests.
 
@@ -211,33 +590,45 @@ class TorqueReceiveDataView(HomeAssistantView):
         Returns:
             HTTP response
         """
+        if (error := self._check_payload(data)) is not None:
+            return error
+
+        # Only accepted uploads are profiled
+        if (profiler := self.profiler) is None:
+            return await self._async_handle_payload(data)
+
+        profiler.enable()
         try:
-            _LOGGER.debug("Processing Torque data: %s", data)
-
-            # Validate email field presence
-            if SENSOR_EMAIL_FIELD not in data:
-                _LOGGER.warning("Missing email field in request")
-                return web.Response(status=400, text="Missing email field")
-
-            # Validate email matches configured email
-            received_email = data[SENSOR_EMAIL_FIELD]
-            if self.email and received_email != self.email:
-                _LOGGER.warning(
-                    "Ignoring data from unmatched email: %s (expected: %s)",
-                    received_email,
-                    self.email,
-                )
-                return web.Response(status=403, text="Unauthorized email")
+            return await self._async_handle_payload(data)
+        finally:
+            if profiler.disable():
+                self.hass.async_create_task(profiler.async_finish())
 
-            # Parse sensor names, units, and values from the data
-            names: dict[int, str] = {}
-            units: dict[int, str] = {}
+    async def _async_handle_payload(self, data: dict[str, Any]) -> web.Response:
+        """Apply the values of an accepted upload.
 
-            for key, value in data.items():
-                self._parse_sensor_data(key, value, names, units)
+        Args:
+            data: Request data dictionary
 
-            # Update existing sensors and create new ones
-            await self._process_sensor_updates(data, names, units)
+        Returns:
+            HTTP response
+        """
+        try:
+            _LOGGER.debug("Processing Torque upload with %d keys", len(data))
+            started = time.perf_counter()
+            metadata: dict[str, str] = {}
+            late = self._apply_values(data, metadata)
+
+            # Only parse metadata keys that changed since the last upload
+            flush_started = time.perf_counter()
+            await self._apply_metadata(data.get(SENSOR_SESSION_FIELD), metadata)
+            self.metrics.flush_latency.record(time.perf_counter() - flush_started)
+
+            if late:
+                self._schedule_late_flush()
+            if self._cancel_stale_check is None:
+                self._schedule_stale_check(self._stale_timeout)
+            self.metrics.parse_latency.record(time.perf_counter() - started)
 
             return web.Response(text="OK")
 
@@ -245,8 +636,233 @@ class TorqueReceiveDataView(HomeAssistantView):
             _LOGGER.error("Unexpected error handling Torque data: %s", exc)
             return web.Response(status=500, text="Internal server error")
 
+    async def _async_handle_batch(self, accepted: list[dict[str, Any]]) -> bool:
+        """Apply accepted uploads received together as one.
+
+        Values are applied upload by upload, so history, archive and
+        statistics see every sample, but only the newest sample of each key
+        may write sensor state. Names and units of all uploads are parsed
+        in one metadata pass at the end, and timers are armed once.
+
+        Args:
+            accepted: Request data dictionaries, oldest first
+
+        Returns:
+            False if applying the uploads failed
+        """
+        try:
+            started = time.perf_counter()
+            # Keys whose newest sample in the batch is held by each upload
+            newest: list[set[str]] = []
+            seen: set[str] = set()
+            for data in reversed(accepted):
+                newest.append(data.keys() - seen)
+                seen.update(data)
+            newest.reverse()
+
+            metadata: dict[str, str] = {}
+            late = False
+            for data, writes in zip(accepted, newest, strict=True):
+                late |= self._apply_values(data, metadata, writes)
+
+            flush_started = time.perf_counter()
+            await self._apply_metadata(accepted[-1].get(SENSOR_SESSION_FIELD), metadata)
+            self.metrics.flush_latency.record(time.perf_counter() - flush_started)
+
+            if late:
+                self._schedule_late_flush()
+            if self._cancel_stale_check is None:
+                self._schedule_stale_check(self._stale_timeout)
+            self.metrics.parse_latency.record(time.perf_counter() - started)
+
+        except Exception as exc:
+            _LOGGER.error("Unexpected error handling Torque batch: %s", exc)
+            return False
+        return True
+
+    def _check_payload(self, data: dict[str, Any]) -> web.Response | None:
+        """Check the email address of an upload and keep it for diagnostics.
+
+        Args:
+            data: Request data dictionary
+
+        Returns:
+            Error response, None if the upload is accepted
+        """
+        # Validate email field presence
+        if SENSOR_EMAIL_FIELD not in data:
+            _LOGGER.warning("Missing email field in request")
+            return web.Response(status=400, text="Missing email field")
+
+        # Validate email matches configured email
+        received_email = data[SENSOR_EMAIL_FIELD]
+        if self.email and received_email != self.email:
+            _LOGGER.warning(
+                "Ignoring data from unmatched email: %s (expected: %s)",
+                received_email,
+                self.email,
+            )
+            return web.Response(status=403, text="Unauthorized email")
+
+        shard = self._get_shard()
+        shard.recent_payloads.append(data)
+        self._received = shard.last_active = time.monotonic()
+        if self._first_received is None:
+            self._first_received = self._received
+        return None
+
+    def _apply_values(
+        self,
+        data: dict[str, Any],
+        metadata: dict[str, str],
+        writes: Collection[str] | None = None,
+    ) -> bool:
+        """Apply the values of an accepted upload, setting its metadata aside.
+
+        Args:
+            data: Request data dictionary
+            metadata: Collects the name/unit metadata keys of the upload
+            writes: Value keys allowed to write sensor state, None for all
+
+        Returns:
+            True if the upload was buffered offline and uploaded late
+        """
+        names: dict[int, str] = {}
+        units: dict[int, str] = {}
+        sample_time = self._get_sample_time(data)
+        late = self._is_late(sample_time)
+
+        # Pick the throttle policy before any value of the upload is applied
+        if not late:
+            self.motion.update(data, sample_time)
+            if (session := data.get(SENSOR_SESSION_FIELD)) != self._session:
+                self._session = session
+                for sensor in self.sensors.values():
+                    sensor.async_set_session(session)
+            # Full-rate samples for live dashboards, bypassing throttling
+            if self.live.subscribers:
+                self.live.async_publish(
+                    self.config_entry.entry_id if self.config_entry else None,
+                    self.vehicle,
+                    sample_time,
+                    data,
+                    self._hidden_pids,
+                )
+        if self.archive is not None:
+            self.archive.async_set_session(
+                data.get(SENSOR_SESSION_FIELD), sample_time, late
+            )
+        if self.track is not None:
+            if late:
+                self.track.add_late(data.get(SENSOR_SESSION_FIELD), sample_time, data)
+            else:
+                self.track.async_set_session(
+                    data.get(SENSOR_SESSION_FIELD), sample_time
+                )
+                self.track.add(sample_time, data)
+
+        for key, value in data.items():
+            if key.startswith(SENSOR_METADATA_PREFIXES):
+                metadata[key] = value
+            else:
+                self._parse_sensor_data(
+                    key,
+                    value,
+                    names,
+                    units,
+                    sample_time=sample_time,
+                    late=late,
+                    write=writes is None or key in writes,
+                )
+        if self.archive is not None:
+            self.archive.async_end_payload(sample_time)
+        if not late and self._event_keys:
+            self._fire_payload_event(data, sample_time)
+
+        metrics = self.metrics
+        metrics.requests += 1
+        metrics.keys += len(data)
+        return late
+
+    async def _apply_metadata(
+        self, session: str | None, metadata: dict[str, str]
+    ) -> None:
+        """Parse the changed names and units and create the sensors they name.
+
+        Args:
+            session: Torque session identifier of the newest upload
+            metadata: Metadata keys and values of the uploads
+        """
+        names: dict[int, str] = {}
+        units: dict[int, str] = {}
+        changed = self._changed_metadata(session, metadata)
+        self.metrics.metadata_skipped += len(metadata) - len(changed)
+        for key, value in changed.items():
+            self._parse_sensor_data(key, value, names, units)
+        shard = self._get_shard()
+        shard.units.update(units)
+        await self._process_sensor_updates(names, shard.units)
+
+    @staticmethod
+    def _get_sample_time(data: dict[str, Any]) -> float:
+        """Return the sample time of a payload.
+
+        Args:
+            data: Request data dictionary
+
+        Returns:
+            Epoch timestamp from the payload's ``time`` field, or the current
+            time if it is missing or invalid
+        """
+        try:
+            return int(data[SENSOR_TIME_FIELD]) / 1000
+        except (KeyError, ValueError, TypeError):
+            return time.time()
+
+    def _changed_metadata(
+        self, session: str | None, metadata: dict[str, str]
+    ) -> dict[str, str]:
+        """Return the metadata keys that changed since the last upload.
+
+        Torque resends identical name/unit blocks with most uploads, so the
+        metadata subset is fingerprinted per session and skipped entirely
+        when it matches the previous one.
+
+        Args:
+            session: Torque session identifier from the payload
+            metadata: Metadata keys and values from the payload
+
+        Returns:
+            Dictionary of metadata keys whose values are new or changed
+        """
+        shard = self._get_shard()
+        if session != shard.session:
+            shard.session = session
+            shard.fingerprint = None
+            shard.metadata = {}
+            shard.units = {}
+
+        fingerprint = hash(frozenset(metadata.items()))
+        if fingerprint == shard.fingerprint:
+            return {}
+        shard.fingerprint = fingerprint
+
+        seen = shard.metadata
+        changed = {
+            key: value for key, value in metadata.items() if seen.get(key) != value
+        }
+        seen.update(changed)
+        return changed
+
     def _parse_sensor_data(
-        self, key: str, value: str, names: dict[int, str], units: dict[int, str]
+        self,
+        key: str,
+        value: str,
+        names: dict[int, str],
+        units: dict[int, str],
+        sample_time: float | None = None,
+        late: bool = False,
+        write: bool = True,
     ) -> None:
         """Parse individual sensor data fields.
 
@@ -255,6 +871,9 @@ class TorqueReceiveDataView(HomeAssistantView):
             value: Data field value
             names: Dictionary to store parsed names
             units: Dictionary to store parsed units
+            sample_time: Epoch timestamp the payload was sampled at
+            late: Whether the payload was buffered offline and uploaded late
+            write: Whether the value may write sensor state
         """
         # Parse sensor names
         if match := NAME_KEY.match(key):
@@ -281,25 +900,370 @@ class TorqueReceiveDataView(HomeAssistantView):
             pid = convert_pid(match.group(1))
             if pid is not None:
                 _LOGGER.debug("Parsed value: pid=%d, value=%s", pid, value)
+                if (
+                    self.archive is not None
+                    and sample_time is not None
+                    and pid not in self._hidden_pids
+                ):
+                    self.archive.add(pid, sample_time, value)
                 if pid in self.sensors:
+                    self._seen[pid] = self._received
+
+                if pid in self.sensors and late and sample_time is not None:
+                    self._backfill_value(pid, value, sample_time)
+                elif pid in self.sensors:
                     try:
-                        self.sensors[pid].async_on_update(value)
+                        result = self.sensors[pid].async_on_update(
+                            value, sample_time, write
+                        )
+                        self.metrics.updates[result] += 1
                     except Exception as exc:
                         _LOGGER.error("Error updating sensor for PID %d: %s", pid, exc)
+                elif pid not in self._hidden_pids and sample_time is not None:
+                    # Hold the value until the sensor name arrives
+                    self._get_shard().pending.put(pid, value, sample_time)
             else:
                 _LOGGER.warning("Skipping value for invalid PID: %s", match.group(1))
 
+    def _fire_payload_event(self, data: dict[str, Any], sample_time: float) -> None:
+        """Fire one event with the values of the opted-in PIDs of an upload.
+
+        Args:
+            data: Request data dictionary
+            sample_time: Epoch timestamp the upload was sampled at
+        """
+        if self.hass is None or (
+            self._last_event is not None
+            and self._received - self._last_event < self._event_interval
+        ):
+            return
+
+        values: dict[int, float] = {}
+        for key, pid in self._event_keys.items():
+            if (value := data.get(key)) is None:
+                continue
+            try:
+                values[pid] = float(value)
+            except (TypeError, ValueError):
+                continue
+        if not values:
+            return
+
+        self._last_event = self._received
+        self.hass.bus.async_fire(
+            EVENT_PAYLOAD,
+            {
+                "entry_id": self.config_entry.entry_id if self.config_entry else None,
+                "vehicle": self.vehicle,
+                "time": sample_time,
+                "values": values,
+            },
+        )
+
+    def _is_late(self, sample_time: float) -> bool:
+        """Return whether an upload was buffered offline and is uploaded late.
+
+        Lateness is judged against the vehicle's own clock, the newest
+        sample time seen advanced by the time since it arrived, so a phone
+        clock running behind does not make every upload late. Late uploads
+        that keep arriving as fast as they were sampled for a minute come
+        from a clock that was set back, not from a buffer, and re-anchor it.
+
+        Args:
+            sample_time: Epoch timestamp the upload was sampled at
+
+        Returns:
+            True if the upload is late
+        """
+        now = time.monotonic()
+        expected = self._newest_sample + now - self._newest_arrival
+        if sample_time >= expected - LATE_PAYLOAD_THRESHOLD:
+            self._late_streak = None
+            if sample_time >= expected:
+                self._newest_sample, self._newest_arrival = sample_time, now
+            return False
+
+        if self._late_streak is None:
+            self._late_streak = (sample_time, now)
+            return True
+        first_sample, first_arrival = self._late_streak
+        elapsed = now - first_arrival
+        if (
+            elapsed >= LATE_PAYLOAD_THRESHOLD
+            and sample_time - first_sample <= elapsed * LATE_RESYNC_RATE
+        ):
+            _LOGGER.info("Clock of %s is behind, following its uploads", self.vehicle)
+            self._newest_sample, self._newest_arrival = sample_time, now
+            self._late_streak = None
+            # Samples shown or kept so far are newer than the followed clock
+            self.history.clear()
+            for sensor in self.sensors.values():
+                sensor.async_reset_clock()
+            return False
+        return True
+
+    def _backfill_value(self, pid: int, value: str, sample_time: float) -> None:
+        """Queue a late sample for statistics and keep the newest for state.
+
+        Args:
+            pid: PID of the sample
+            value: Raw value string from Torque
+            sample_time: Epoch timestamp the value was sampled at
+        """
+        try:
+            self._backfill.add(pid, sample_time, float(value))
+        except (ValueError, TypeError):
+            return
+
+        newest = self._late_values.get(pid)
+        if newest is None or sample_time >= newest[1]:
+            self._late_values[pid] = (value, sample_time)
+
+    @callback
+    def _schedule_late_flush(self) -> None:
+        """Flush late samples once Torque stops uploading buffered payloads."""
+        if self.hass is None:
+            return
+        if self._cancel_late_flush is not None:
+            self._cancel_late_flush()
+        self._cancel_late_flush = async_call_later(
+            self.hass, LATE_FLUSH_DELAY, self._async_flush_late
+        )
+
+    @callback
+    def _async_flush_late(self, _now: Any = None) -> None:
+        """Apply the newest late values and import completed backfill hours."""
+        self._cancel_late_flush = None
+        started = time.perf_counter()
+
+        if self.archive is not None:
+            self.archive.async_flush_late()
+        if self.track is not None:
+            self.track.async_flush_late()
+
+        # Only the newest late sample of each PID goes to entity state
+        late_values, self._late_values = self._late_values, {}
+        for pid, (value, sample_time) in late_values.items():
+            if (sensor := self.sensors.get(pid)) is None:
+                continue
+            try:
+                result = sensor.async_on_update(value, sample_time)
+                self.metrics.updates[result] += 1
+            except Exception as exc:
+                _LOGGER.error("Error updating sensor for PID %d: %s", pid, exc)
+
+        if self.hass is None:
+            self.metrics.flush_latency.record(time.perf_counter() - started)
+            return
+
+        # Hours still open may not have been compiled by the recorder yet,
+        # importing them now would clash with its own statistics run
+        imported = async_import_hourly(
+            self.hass,
+            self.sensors,
+            self._backfill.pop_before(time.time() - LATE_PAYLOAD_THRESHOLD),
+        )
+        self.metrics.flush_latency.record(time.perf_counter() - started)
+        if imported:
+            _LOGGER.info(
+                "Backfilled %d hourly statistics from late Torque uploads for %s",
+                imported,
+                self.vehicle,
+            )
+        if len(self._backfill):
+            self._cancel_late_flush = async_call_later(
+                self.hass,
+                3600 - time.time() % 3600 + LATE_PAYLOAD_THRESHOLD,
+                self._async_flush_late,
+            )
+
+    @callback
+    def async_start_stale_check(self) -> None:
+        """Arm the staleness timer for the sensors restored at setup.
+
+        Restored sensors count as seen when they were restored, so they
+        become unavailable if the vehicle sends nothing after a restart.
+        """
+        if self._first_received is None:
+            self._first_received = time.monotonic()
+        if self._cancel_stale_check is None:
+            self._schedule_stale_check(self._stale_timeout)
+
+    @callback
+    def _schedule_stale_check(self, delay: float) -> None:
+        """Arm the vehicle's staleness timer.
+
+        Args:
+            delay: Seconds until the next check
+        """
+        if self.hass is None or self._stale_timeout <= 0:
+            return
+        self._cancel_stale_check = async_call_later(
+            self.hass, max(delay, STALE_CHECK_RESOLUTION), self._async_check_stale
+        )
+
+    @callback
+    def _async_check_stale(self, _now: Any = None) -> None:
+        """Mark sensors unavailable whose PID has been silent for too long.
+
+        A single timer per vehicle is re-armed for the next possible expiry,
+        so the cost does not grow with the number of sensors or uploads.
+        """
+        self._cancel_stale_check = None
+        if self._first_received is None:
+            return
+
+        now = time.monotonic()
+        cutoff = now - self._stale_timeout
+        next_expiry: float | None = None
+        stale: list[TorqueSensor] = []
+
+        for pid, sensor in self.sensors.items():
+            if not sensor.available:
+                continue
+            seen = self._seen.get(pid, self._first_received)
+            if seen <= cutoff:
+                stale.append(sensor)
+            elif next_expiry is None or seen < next_expiry:
+                next_expiry = seen
+
+        if stale:
+            _LOGGER.info(
+                "No data from %s for %d seconds, marking %d sensors unavailable",
+                self.vehicle,
+                self._stale_timeout,
+                len(stale),
+            )
+            for sensor in stale:
+                sensor.async_mark_unavailable()
+
+        if next_expiry is not None:
+            self._schedule_stale_check(next_expiry - cutoff)
+
+    def _get_shard(self) -> VehicleShard:
+        """Return the vehicle's ingest state, creating it when it is not resident.
+
+        Returns:
+            Shard of the vehicle, seeded from its compact state after an eviction
+        """
+        if (shard := self.shard) is None:
+            compact = None
+            if self.shards is not None and self.config_entry is not None:
+                compact = self.shards.async_pop(self.config_entry.entry_id)
+            shard = self.shard = VehicleShard(compact)
+            if self._cancel_eviction is None:
+                self._schedule_eviction(self._idle_eviction)
+        return shard
+
+    @callback
+    def _schedule_eviction(self, delay: float) -> None:
+        """Arm the vehicle's idle timer in fleet mode.
+
+        Args:
+            delay: Seconds until the next check
+        """
+        if self.hass is None or self._idle_eviction <= 0:
+            return
+        self._cancel_eviction = async_call_later(
+            self.hass, max(delay, STALE_CHECK_RESOLUTION), self._async_check_idle
+        )
+
+    @callback
+    def _async_check_idle(self, _now: Any = None) -> None:
+        """Evict the vehicle's shard once it has been idle for long enough.
+
+        Like the staleness timer, the check re-arms itself for the earliest
+        possible eviction instead of being reset by every upload.
+        """
+        self._cancel_eviction = None
+        if (shard := self.shard) is None:
+            return
+        idle = time.monotonic() - shard.last_active
+        # Pending late samples and staleness checks still need the state
+        if (
+            idle < self._idle_eviction
+            or self._cancel_late_flush is not None
+            or self._cancel_stale_check is not None
+        ):
+            self._schedule_eviction(self._idle_eviction - idle)
+            return
+        self.async_evict()
+
+    @callback
+    def async_evict(self) -> None:
+        """Drop the ingest state of the vehicle, keeping a compact summary.
+
+        Buffered archive samples are written, the GPS track is written and
+        released, and the recent samples of every PID are discarded. The
+        next upload starts a new shard from the stored summary.
+        """
+        if self._cancel_eviction is not None:
+            self._cancel_eviction()
+            self._cancel_eviction = None
+        if (shard := self.shard) is None:
+            return
+        if self.shards is not None and self.config_entry is not None:
+            self.shards.async_put(self.config_entry.entry_id, shard.as_compact())
+        self.shard = None
+        self.history.clear()
+        self._seen = {}
+        self._first_received = None
+        if self.archive is not None:
+            self.archive.async_flush()
+        if self.track is not None:
+            self.track.async_suspend()
+        _LOGGER.debug("Evicted the ingest state of idle vehicle %s", self.vehicle)
+
+    @callback
+    def async_add_fleet_metric_sensors(self) -> None:
+        """Add the integration-wide metric sensors to this vehicle's entry."""
+        self.fleet_metric_sensors = [
+            TorqueMetricSensor(description, None, FLEET_DEVICE_INFO)
+            for description in METRIC_SENSORS
+        ]
+        self.async_add_entities(self.fleet_metric_sensors)
+
+    @callback
+    def async_publish_metrics(self, _now: Any = None) -> None:
+        """Publish the performance counters to the diagnostic sensors."""
+        metrics = self.metrics
+        metrics.queue_depth = len(self._late_values)
+        if self.shard is not None:
+            metrics.queue_depth += len(self.shard.pending)
+        metrics.roll()
+
+        snapshot = metrics_snapshot([metrics])
+        for sensor in self.metric_sensors:
+            sensor.async_publish(snapshot)
+
+        if self.fleet_metric_sensors and self.hass is not None:
+            views = self.hass.data.get(DATA_VIEWS, {}).values()
+            snapshot = metrics_snapshot(view.metrics for view in views)
+            for sensor in self.fleet_metric_sensors:
+                sensor.async_publish(snapshot)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel timers when the config entry is unloaded."""
+        if self._cancel_late_flush is not None:
+            self._cancel_late_flush()
+            self._cancel_late_flush = None
+        if self._cancel_stale_check is not None:
+            self._cancel_stale_check()
+            self._cancel_stale_check = None
+        self.async_evict()
+
     async def _process_sensor_updates(
-        self, data: dict[str, Any], names: dict[int, str], units: dict[int, str]
+        self, names: dict[int, str], units: dict[int, str]
     ) -> None:
         """Process sensor updates and create new sensors if needed.
 
         Args:
-            data: Raw request data
             names: Parsed sensor names by PID
             units: Parsed sensor units by PID
         """
         new_entities: list[TorqueSensor] = []
+        pending_values = self._get_shard().pending
 
         for pid, name in names.items():
             if pid not in self.sensors:
@@ -321,7 +1285,15 @@ class TorqueReceiveDataView(HomeAssistantView):
                         pid=pid,
                         vehicle=self.vehicle,
                         options=self.config_entry.options if self.config_entry else {},
+                        scheduler=self.scheduler,
+                        motion=self.motion,
+                        history=self.history,
                     )
+                    sensor.async_set_session(self._session)
+
+                    # Apply a value that arrived before the sensor name did
+                    if (pending := pending_values.pop(pid)) is not None:
+                        sensor.set_initial_value(*pending)
 
                     self.sensors[pid] = sensor
                     new_entities.append(sensor)
@@ -338,6 +1310,7 @@ class TorqueReceiveDataView(HomeAssistantView):
 
         # Add new entities to Home Assistant
         if new_entities:
+            self.metrics.entities_created += len(new_entities)
             _LOGGER.info(
                 "Adding new Torque sensors: %s",
                 [sensor.name for sensor in new_entities],
@@ -346,6 +1319,43 @@ class TorqueReceiveDataView(HomeAssistantView):
         else:
             _LOGGER.debug("No new sensors to add")
 
+    @staticmethod
+    def _compile_rename_map(option: str | None) -> dict[int, str]:
+        """Parse the rename_map option.
+
+        Args:
+            option: Comma-separated ``pid:name`` pairs
+
+        Returns:
+            Custom name by PID
+        """
+        rename_map: dict[int, str] = {}
+        if not option:
+            return rename_map
+
+        for pair in option.split(","):
+            if ":" in pair:
+                key_str, value_str = pair.split(":", 1)
+                try:
+                    rename_map[int(key_str.strip())] = value_str.strip()
+                except ValueError:
+                    _LOGGER.warning("Ignoring invalid rename_map entry: %s", pair)
+        return rename_map
+
+    def compiled_options(self) -> dict[str, Any]:
+        """Return the options as used by the receiver.
+
+        Returns:
+            Parsed options
+        """
+        return {
+            "hidden_pids": sorted(self._hidden_pids),
+            "rename_map": self._rename_map,
+            "stale_timeout": self._stale_timeout,
+            "event_pids": sorted(self._event_keys.values()),
+            "event_interval": self._event_interval,
+        }
+
     def _should_hide_pid(self, pid: int) -> bool:
         """Check if a PID should be hidden based on options.
 
@@ -355,19 +1365,7 @@ class TorqueReceiveDataView(HomeAssistantView):
         Returns:
             True if PID should be hidden
         """
-        if not self.config_entry or not self.config_entry.options.get("hide_pids"):
-            return False
-
-        try:
-            hide_pids = [
-                int(x.strip())
-                for x in self.config_entry.options["hide_pids"].split(",")
-                if x.strip().isdigit()
-            ]
-            return pid in hide_pids
-        except Exception as exc:
-            _LOGGER.warning("Error parsing hide_pids option: %s", exc)
-            return False
+        return pid in self._hidden_pids
 
     def _get_custom_sensor_name(self, pid: int, default_name: str) -> str:
         """Get custom sensor name if configured.
@@ -379,24 +1377,22 @@ class TorqueReceiveDataView(HomeAssistantView):
         Returns:
             Custom name if configured, otherwise default name
         """
-        if not self.config_entry or not self.config_entry.options.get("rename_map"):
-            return default_name
+        return self._rename_map.get(pid, default_name)
 
-        try:
-            rename_map: dict[int, str] = {}
-            for pair in self.config_entry.options["rename_map"].split(","):
-                if ":" in pair:
-                    key_str, value_str = pair.split(":", 1)
-                    try:
-                        rename_map[int(key_str.strip())] = value_str.strip()
-                    except ValueError:
-                        continue
 
-            return rename_map.get(pid, default_name)
+@dataclass
+class TorqueSensorExtraStoredData(SensorExtraStoredData):
+    """Restored sensor data including the learned noise and percentiles."""
 
-        except Exception as exc:
-            _LOGGER.warning("Error parsing rename_map option: %s", exc)
-            return default_name
+    deadband: dict[str, Any] | None = None
+    percentiles: dict[str, Any] | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a dict representation of the stored data."""
+        data = super().as_dict()
+        data["deadband"] = self.deadband
+        data["percentiles"] = self.percentiles
+        return data
 
 
 class TorqueSensor(RestoreSensor, SensorEntity):
@@ -405,6 +1401,9 @@ class TorqueSensor(RestoreSensor, SensorEntity):
     # Constants for sensor behavior
     _attr_has_entity_name = True
     _attr_should_poll = False
+    # Percentiles change with every sample, recording them would add a row
+    # of attributes to the database for almost every state
+    _unrecorded_attributes = PERCENTILE_ATTRIBUTES
 
     def __init__(
         self,
@@ -413,6 +1412,9 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         pid: int,
         vehicle: str,
         options: dict[str, Any] | None = None,
+        scheduler: WriteScheduler | None = None,
+        motion: VehicleMotion | None = None,
+        history: VehicleHistory | None = None,
     ) -> None:
         """Initialize the Torque sensor.
 
@@ -422,13 +1424,21 @@ class TorqueSensor(RestoreSensor, SensorEntity):
             pid: PID identifier
             vehicle: Vehicle name
             options: Configuration options
+            scheduler: Integration-wide write budget, None to always write
+            motion: Motion state of the vehicle, None for the driving policy
+            history: Recent samples of the vehicle, None to keep none
         """
         self._attr_name = name
         self._pid = pid
         self._vehicle = vehicle
         self._last_update = 0.0
+        self._last_sample_time = 0.0
         self._last_reported_value: float | None = None
         self._options = options or {}
+        self._scheduler = scheduler
+        self._motion = motion
+        # Rings are allocated on the first sample, so idle vehicles hold none
+        self._history = history
         self._original_unit = unit
         self._non_numeric_warning_logged = False
 
@@ -438,9 +1448,40 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         # Set up sensor properties
         self._attr_unique_id = f"{DOMAIN}_{vehicle.lower()}_{pid}"
         self._attr_native_unit_of_measurement = unit  # Use raw unit from Torque
-        self._attr_device_class = None  # Don't guess device class to avoid issues
         self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_icon = self._determine_icon(name)
+
+        # Device class is only set for catalog PIDs reported in their
+        # canonical unit, so Home Assistant never converts a mislabeled value
+        info = lookup_pid(pid, name, unit)
+        self._attr_device_class = info.device_class
+        self._attr_icon = info.icon
+        self._significant_change = info.significant_change
+        self._deadband = (
+            AdaptiveDeadband(info.significant_change)
+            if self._options.get(CONF_ADAPTIVE_DEADBAND, DEFAULT_ADAPTIVE_DEADBAND)
+            else None
+        )
+        self._percentiles = (
+            PercentileTracker()
+            if pid in parse_pid_list(self._options.get(CONF_PERCENTILE_PIDS))
+            else None
+        )
+
+        # Values are rounded to the precision they are displayed with, so
+        # noise below the last shown digit never produces a state write
+        self._precision = parse_precision_map(
+            self._options.get(CONF_PRECISION_MAP)
+        ).get(pid, info.precision)
+        self._attr_suggested_display_precision = self._precision
+        self._written_state: tuple[Any, bool] | None = None
+
+        # Priority class from options, falling back to the catalog
+        if pid in parse_pid_list(self._options.get(CONF_CRITICAL_PIDS)):
+            self._priority = PRIORITY_CRITICAL
+        elif pid in parse_pid_list(self._options.get(CONF_BULK_PIDS)):
+            self._priority = PRIORITY_BULK
+        else:
+            self._priority = info.priority
 
         _LOGGER.debug(
             "TorqueSensor initialized: name=%s, pid=%d, unit=%s, unique_id=%s",
@@ -450,99 +1491,206 @@ class TorqueSensor(RestoreSensor, SensorEntity):
             self._attr_unique_id,
         )
 
-    def _determine_icon(self, name: str) -> str | None:
-        """Determine appropriate icon for the sensor.
+    def _get_significant_change_threshold(self) -> float:
+        """Get the significant change threshold for this sensor.
+
+        Returns:
+            Threshold value for significant changes
+        """
+        if self._deadband is not None:
+            return self._deadband.threshold
+        return self._significant_change
+
+    @callback
+    def async_on_update(
+        self, value: str, sample_time: float | None = None, write: bool = True
+    ) -> int:
+        """Update sensor value from Torque data with minimal processing.
 
         Args:
-            name: Sensor name
+            value: New sensor value as string from Torque (raw value)
+            sample_time: Epoch timestamp the value was sampled at, defaults to now
+            write: False to only record a sample that a newer one supersedes
 
         Returns:
-            Icon string or None for default
+            UPDATE_WRITTEN, UPDATE_THROTTLED or UPDATE_REJECTED
         """
-        if not name:
-            return None
+        now = time.time() if sample_time is None else sample_time
 
-        name_lower = name.lower()
+        try:
+            new_value = round(float(value), self._precision)
+            self._non_numeric_warning_logged = False
+        except (ValueError, TypeError):
+            if not self._non_numeric_warning_logged:
+                _LOGGER.warning("Non-numeric value for PID %d: %s", self._pid, value)
+                self._non_numeric_warning_logged = True
+            return UPDATE_REJECTED
 
-        # Temperature related
-        if any(temp in name_lower for temp in ["temp", "temperature"]):
-            if "coolant" in name_lower:
-                return "mdi:coolant-temperature"
-            elif "air" in name_lower or "intake" in name_lower:
-                return "mdi:thermometer"
-            else:
-                return "mdi:thermometer"
+        # Apply minimal validation - accept all valid numeric values
+        if not self._is_value_valid(new_value):
+            return UPDATE_REJECTED
+
+        # Samples older than the one already shown only matter for statistics
+        if now < self._last_sample_time:
+            return UPDATE_THROTTLED
+        self._last_sample_time = now
+
+        # Every in-order sample is kept, whether it is written or throttled
+        if self._history is not None:
+            self._history.append(self._pid, now, new_value)
+        if self._percentiles is not None:
+            self._percentiles.add(new_value, now)
+
+        if self._deadband is not None:
+            self._deadband.add(new_value)
+        if not write:
+            return UPDATE_THROTTLED
+
+        # Determine if we should update based on significance and time,
+        # always writing when the sensor comes back from being unavailable
+        should_update = not self._attr_available or self._should_update_value(
+            new_value, now
+        )
+
+        if not should_update:
+            return UPDATE_THROTTLED
+
+        # Under a write budget the value waits for its turn, while critical
+        # PIDs take a write left in the budget or go first on the next tick;
+        # queued values count as throttled until they are written
+        scheduler = self._scheduler
+        if scheduler is not None and scheduler.budget:
+            if self._priority == PRIORITY_CRITICAL:
+                if scheduler.async_write_now(self, new_value, now, self._last_update):
+                    return UPDATE_WRITTEN
+                return UPDATE_THROTTLED
+            significance = (
+                math.inf
+                if self._last_reported_value is None or not self._attr_available
+                else abs(new_value - self._last_reported_value)
+                / self._get_significant_change_threshold()
+            )
+            scheduler.submit(self, new_value, now, significance, self._last_update)
+            return UPDATE_THROTTLED
 
-        # Speed related
-        elif "speed" in name_lower:
-            return "mdi:speedometer"
+        if self.async_write_value(new_value, now):
+            return UPDATE_WRITTEN
+        return UPDATE_THROTTLED
 
-        # Engine related
-        elif any(eng in name_lower for eng in ["rpm", "engine"]):
-            return "mdi:engine"
+    @callback
+    def async_write_value(self, value: float, sample_time: float) -> bool:
+        """Write a value that passed throttling to the state machine.
 
-        # Fuel related
-        elif "fuel" in name_lower:
-            return "mdi:gas-station"
+        Args:
+            value: New sensor value
+            sample_time: Epoch timestamp the value was sampled at
 
-        # Voltage/electrical
-        elif any(elec in name_lower for elec in ["volt", "battery"]):
-            return "mdi:car-battery"
+        Returns:
+            True if the state was written, False if it was already shown
+        """
+        self._attr_available = True
+        self._attr_native_value = value
+        self._last_reported_value = value
+        self._last_update = sample_time
+        if not self._async_write_state_if_changed():
+            return False
 
-        return None
+        _LOGGER.debug("TorqueSensor '%s' updated: value=%.2f", self._attr_name, value)
+        return True
 
-    def _get_significant_change_threshold(self) -> float:
-        """Get the significant change threshold for this sensor.
+    @callback
+    def async_reset_clock(self) -> None:
+        """Accept older samples once the vehicle's clock has gone back."""
+        self._last_update = self._last_sample_time = 0.0
+
+    @callback
+    def async_mark_unavailable(self) -> None:
+        """Mark the sensor unavailable after its PID went silent."""
+        self._attr_available = False
+        self._async_write_state_if_changed()
+
+    @callback
+    def _async_write_state_if_changed(self) -> bool:
+        """Write the state unless the last write already showed it.
+
+        The state of a Torque sensor only depends on its value and
+        availability, so comparing those skips the state string rendering
+        and the state_changed event of a redundant write. Percentile
+        attributes are refreshed by the writes and never cause one.
 
         Returns:
-            Threshold value for significant changes
+            True if the state was written
         """
-        if not self._attr_name:
-            return SIGNIFICANT_CHANGE
+        written_state = (self._attr_native_value, self._attr_available)
+        if written_state == self._written_state:
+            return False
+        self._written_state = written_state
+        self.async_write_ha_state()
+        return True
 
-        name_lower = self._attr_name.lower()
+    @callback
+    def async_set_session(self, session: str | None) -> None:
+        """Start the session percentiles over when the Torque session changes.
+
+        Args:
+            session: Session id of the latest upload
+        """
+        if self._percentiles is not None:
+            self._percentiles.set_session(session)
 
-        # Check for sensor-specific thresholds
-        for keyword, threshold in SENSOR_SIGNIFICANT_CHANGES.items():
-            if keyword in name_lower:
-                return threshold
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the session and daily percentiles of the PID, if enabled."""
+        if self._percentiles is None:
+            return None
+        return self._percentiles.attributes(self._precision)
 
-        return SIGNIFICANT_CHANGE
+    @property
+    def _policy(self) -> ThrottlePolicy:
+        """Return the throttle policy of the vehicle's current motion state."""
+        return DEFAULT_POLICY if self._motion is None else self._motion.policy
 
-    @callback
-    def async_on_update(self, value: str) -> None:
-        """Update sensor value from Torque data with minimal processing.
+    def diagnostics(self, now: float) -> dict[str, Any]:
+        """Describe the sensor and its throttle state for diagnostics.
 
         Args:
-            value: New sensor value as string from Torque (raw value)
+            now: Current epoch timestamp
+
+        Returns:
+            Sensor details
         """
-        now = time.monotonic()
+        return {
+            "pid": self._pid,
+            "name": self._attr_name,
+            "unit": self._attr_native_unit_of_measurement,
+            "value": self._attr_native_value,
+            "available": self._attr_available,
+            "last_update": self._last_update or None,
+            "precision": self._precision,
+            "significant_change": self._get_significant_change_threshold(),
+            "noise": None if self._deadband is None else self._deadband.noise,
+            "percentiles": self.extra_state_attributes,
+            "priority": self._priority,
+            "throttled_for": max(
+                0.0, self._policy.min_interval - (now - self._last_update)
+            ),
+        }
 
+    def set_initial_value(self, value: str, sample_time: float) -> None:
+        """Seed the sensor with a buffered value before it is added.
+
+        Args:
+            value: Raw value string from Torque
+            sample_time: Epoch timestamp the value was sampled at
+        """
         try:
-            new_value = float(value)
-            self._non_numeric_warning_logged = False
+            new_value = round(float(value), self._precision)
         except (ValueError, TypeError):
-            if not self._non_numeric_warning_logged:
-                _LOGGER.warning("Non-numeric value for PID %d: %s", self._pid, value)
-                self._non_numeric_warning_logged = True
-            return
-
-        # Apply minimal validation - accept all valid numeric values
-        if not self._is_value_valid(new_value):
             return
 
-        # Determine if we should update based on significance and time
-        should_update = self._should_update_value(new_value, now)
-
-        if should_update:
-            self._attr_native_value = new_value
-            self._last_reported_value = new_value
-            self._last_update = now
-            self.async_write_ha_state()
-
-            _LOGGER.debug(
-                "TorqueSensor '%s' updated: value=%.2f", self._attr_name, new_value
-            )
+        self._attr_native_value = new_value
+        self._last_reported_value = new_value
+        self._last_update = self._last_sample_time = sample_time
 
     def _is_value_valid(self, new_value: float) -> bool:
         """Validate sensor value with minimal filtering.
@@ -562,7 +1710,7 @@ class TorqueSensor(RestoreSensor, SensorEntity):
 
         Args:
             new_value: New sensor value
-            current_time: Current time
+            current_time: Sample time of the new value
 
         Returns:
             True if value should be updated
@@ -573,7 +1721,8 @@ class TorqueSensor(RestoreSensor, SensorEntity):
 
         # Check for significant change using sensor-specific threshold
         threshold = self._get_significant_change_threshold()
-        is_significant_change = abs(new_value - self._last_reported_value) >= threshold
+        change = abs(new_value - self._last_reported_value)
+        is_significant_change = change >= threshold
 
         # Only accept updates if the change is significant
         # This prevents flip-flopping back to old values when rapid updates arrive
@@ -582,19 +1731,45 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         if not is_significant_change:
             return False
 
+        # Critical PIDs are written at once on a large change; smaller ones
+        # such as sensor jitter wait like those of any other PID
+        if (
+            self._priority == PRIORITY_CRITICAL
+            and change >= threshold * CRITICAL_CHANGE_FACTOR
+        ):
+            return True
+
+        # The vehicle's motion state widens interval and deadband at a standstill
+        policy = self._policy
+        if change < threshold * policy.deadband_scale:
+            return False
+
         # For significant changes, enforce minimum time interval to prevent spam
         time_since_last_update = current_time - self._last_update
-        return time_since_last_update >= MIN_UPDATE_INTERVAL
+        if time_since_last_update < policy.min_interval:
+            return False
+
+        # Bulk PIDs wait for their heartbeat unless the change is large
+        if self._priority == PRIORITY_BULK:
+            return (
+                time_since_last_update >= policy.bulk_heartbeat
+                or change >= threshold * BULK_CHANGE_FACTOR
+            )
+        return True
 
     async def async_added_to_hass(self) -> None:
         """Restore sensor state when added to Home Assistant."""
         await super().async_added_to_hass()
 
-        # Restore last known state
+        # Restore last known state unless a buffered value was already applied
         last_sensor_data = await self.async_get_last_sensor_data()
-        if last_sensor_data is not None and last_sensor_data.native_value is not None:
+        if self._last_reported_value is not None:
+            _LOGGER.debug("Keeping buffered value for %s", self._attr_name)
+        elif last_sensor_data is not None and last_sensor_data.native_value is not None:
             try:
-                restored_value = float(last_sensor_data.native_value)
+                restored_value = round(
+                    float(last_sensor_data.native_value), self._precision
+                )
                 if str(restored_value).lower() not in {
                     "none",
                     "unknown",
@@ -617,16 +1792,35 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         else:
             _LOGGER.debug("No previous value to restore for %s", self._attr_name)
 
-        self.async_write_ha_state()
+        # The noise estimate and percentiles only carry over while the unit
+        # is unchanged
+        if (self._deadband is not None or self._percentiles is not None) and (
+            last_extra_data := await self.async_get_last_extra_data()
+        ) is not None:
+            stored = last_extra_data.as_dict()
+            if (
+                stored.get("native_unit_of_measurement")
+                == self._attr_native_unit_of_measurement
+            ):
+                if self._deadband is not None:
+                    self._deadband.restore(stored.get("deadband"))
+                if self._percentiles is not None:
+                    self._percentiles.restore(stored.get("percentiles"), time.time())
+
+        self._async_write_state_if_changed()
 
     @property
-    def suggested_display_precision(self) -> int:
-        """Return suggested display precision for this sensor.
-
-        Returns:
-            Number of decimal places to display
-        """
-        return 2
+    def extra_restore_state_data(self) -> SensorExtraStoredData:
+        """Return sensor data to restore, with the learned noise and percentiles."""
+        data = super().extra_restore_state_data
+        if self._deadband is None and self._percentiles is None:
+            return data
+        return TorqueSensorExtraStoredData(
+            data.native_value,
+            data.native_unit_of_measurement,
+            None if self._deadband is None else self._deadband.as_dict(),
+            None if self._percentiles is None else self._percentiles.as_dict(),
+        )
 
     @property
     def device_info(self) -> dict[str, Any]:
@@ -635,27 +1829,7 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         Returns:
             Device information dictionary
         """
-        return {
-            "identifiers": {(DOMAIN, self._vehicle)},
-            "name": f"Torque {self._vehicle}",
-            "manufacturer": "Torque Pro",
-            "model": "OBD Vehicle Data",
-        }
-
-    def _pick_icon(
-        self, name: str, unit: str | None, device_class: str | None
-    ) -> str | None:
-        """Legacy method for icon selection - kept for compatibility.
-
-        Args:
-            name: Sensor name
-            unit: Unit of measurement
-            device_class: Device class
-
-        Returns:
-            Icon string or None
-        """
-        return self._determine_icon(name)
+        return vehicle_device_info(self._vehicle)
 
     def _guess_state_class(self, unit: str | None, name: str | None) -> str | None:
         """Legacy method for state class guessing - kept for compatibility.
@@ -669,46 +1843,42 @@ class TorqueSensor(RestoreSensor, SensorEntity):
         """
         return SensorStateClass.MEASUREMENT
 
-    def _pick_icon(
-        self, name: str | None, unit: str | None, device_class: str | None
-    ) -> str | None:
-        """Pick an appropriate icon for the sensor based on name and unit."""
-        if not name:
-            return None
-
-        name_lower = name.lower()
-
-        # Speed sensors
-        if "speed" in name_lower:
-            return "mdi:speedometer"
-
-        # Temperature sensors
-        if any(
-            word in name_lower for word in ["temp", "temperature", "coolant", "intake"]
-        ):
-            return "mdi:thermometer"
 
-        # Fuel related
-        if any(
-            word in name_lower for word in ["fuel", "gas", "consumption", "mpg", "gal"]
-        ):
-            return "mdi:gas-station"
+class TorqueMetricSensor(SensorEntity):
+    """Diagnostic sensor publishing one of the receiver's performance counters."""
 
-        # Engine/RPM
-        if any(word in name_lower for word in ["rpm", "engine"]):
-            return "mdi:engine"
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
 
-        # Voltage/Battery
-        if any(word in name_lower for word in ["volt", "battery"]):
-            return "mdi:car-battery"
+    def __init__(
+        self,
+        description: SensorEntityDescription,
+        vehicle: str | None,
+        device_info: dict[str, Any],
+    ) -> None:
+        """Initialize the metric sensor.
 
-        # Pressure
-        if "pressure" in name_lower:
-            return "mdi:gauge"
+        Args:
+            description: Description of the published counter
+            vehicle: Vehicle name, None for integration-wide counters
+            device_info: Device the sensor belongs to
+        """
+        self.entity_description = description
+        # Integration-wide counters leave the vehicle out, so no vehicle
+        # name can give the same unique id
+        scope = DOMAIN if vehicle is None else f"{DOMAIN}_{vehicle.lower()}"
+        self._attr_unique_id = f"{scope}_metrics_{description.key}"
+        self._attr_device_info = device_info
 
-        # Distance/Odometer
-        if any(word in name_lower for word in ["distance", "odometer", "trip"]):
-            return "mdi:map-marker-distance"
+    @callback
+    def async_publish(self, snapshot: dict[str, Any]) -> None:
+        """Publish a new value from a metrics snapshot.
 
-        # Default car icon
-        return "mdi:car"
+        Args:
+            snapshot: Published values by key
+        """
+        if self.hass is None:
+            return
+        self._attr_native_value = snapshot[self.entity_description.key]
+        self.async_write_ha_state()
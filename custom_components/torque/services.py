@@ -0,0 +1,237 @@
+"""Services for the Torque integration."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_END,
+    ATTR_ENTRY_ID,
+    ATTR_PATH,
+    ATTR_PID,
+    ATTR_POINTS,
+    ATTR_REQUESTS,
+    ATTR_SESSION,
+    ATTR_START,
+    DATA_PROFILER,
+    DATA_VIEWS,
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    MAX_QUERY_POINTS,
+    SERVICE_EXPORT_GPX,
+    SERVICE_IMPORT_LOG,
+    SERVICE_PROFILE,
+    SERVICE_QUERY,
+)
+from .importer import async_import_log
+from .profiler import IngestProfiler
+from .query import async_query
+
+if TYPE_CHECKING:
+    from .sensor import TorqueReceiveDataView
+
+_LOGGER = logging.getLogger(__name__)
+
+IMPORT_LOG_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_REQUESTS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SESSION): cv.string,
+        vol.Optional(ATTR_PID): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(ATTR_START): cv.datetime,
+        vol.Optional(ATTR_END): cv.datetime,
+        vol.Optional(ATTR_POINTS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_QUERY_POINTS)
+        ),
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+EXPORT_GPX_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SESSION): cv.string,
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+
+def _get_view(hass: HomeAssistant, call: ServiceCall) -> TorqueReceiveDataView:
+    """Return the receiver view for the config entry targeted by a service call.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call, optionally naming a config entry
+
+    Returns:
+        Receiver view of the targeted vehicle
+
+    Raises:
+        HomeAssistantError: If no single vehicle matches the call
+    """
+    views: dict[str, TorqueReceiveDataView] = hass.data.get(DATA_VIEWS, {})
+    if entry_id := call.data.get(ATTR_ENTRY_ID):
+        if entry_id not in views:
+            raise HomeAssistantError(f"No loaded Torque entry with id {entry_id}")
+        return views[entry_id]
+
+    if len(views) != 1:
+        raise HomeAssistantError(
+            f"{len(views)} Torque vehicles are loaded, specify {ATTR_ENTRY_ID}"
+        )
+    return next(iter(views.values()))
+
+
+async def _async_import_log(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Import a Torque trip log CSV file into long-term statistics.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with the file path
+    """
+    view = _get_view(hass, call)
+    path = call.data[ATTR_PATH]
+    if not hass.config.is_allowed_path(path):
+        raise HomeAssistantError(f"Access to {path} is not allowed")
+
+    try:
+        await async_import_log(hass, view.sensors, path)
+    except (OSError, ValueError) as exc:
+        raise HomeAssistantError(f"Could not import trip log {path}: {exc}") from exc
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Profile the upload handling of a vehicle for a while.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with the duration and optional request limit
+    """
+    view = _get_view(hass, call)
+    if DATA_PROFILER in hass.data:
+        raise HomeAssistantError("A Torque profile is already being recorded")
+
+    IngestProfiler(
+        hass, view, call.data[ATTR_DURATION], call.data.get(ATTR_REQUESTS)
+    ).async_start()
+
+
+async def _async_query(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Query the archived sessions of a vehicle.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call with the session and optional PID and range
+
+    Returns:
+        Downsampled PID samples, or a trip summary without a PID
+    """
+    view = _get_view(hass, call)
+    start = call.data.get(ATTR_START)
+    end = call.data.get(ATTR_END)
+    return await async_query(
+        hass,
+        view.vehicle,
+        session=call.data.get(ATTR_SESSION),
+        pid=call.data.get(ATTR_PID),
+        start=None if start is None else dt_util.as_timestamp(start),
+        end=None if end is None else dt_util.as_timestamp(end),
+        points=call.data.get(ATTR_POINTS),
+    )
+
+
+async def _async_export_gpx(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Write the GPS track of a vehicle's session to its GPX file.
+
+    Args:
+        hass: Home Assistant instance
+        call: Service call, optionally naming a session
+
+    Returns:
+        Session name, GPX file path and number of points
+
+    Raises:
+        HomeAssistantError: If GPS tracks are disabled or the session has none
+    """
+    view = _get_view(hass, call)
+    if view.track is None:
+        raise HomeAssistantError(f"GPS tracks are not enabled for {view.vehicle}")
+    return await view.track.async_export(call.data.get(ATTR_SESSION))
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Torque services.
+
+    Args:
+        hass: Home Assistant instance
+    """
+
+    async def async_import_log_service(call: ServiceCall) -> None:
+        await _async_import_log(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_LOG,
+        async_import_log_service,
+        schema=IMPORT_LOG_SCHEMA,
+    )
+
+    async def async_profile_service(call: ServiceCall) -> None:
+        await _async_profile(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile_service,
+        schema=PROFILE_SCHEMA,
+    )
+
+    async def async_query_service(call: ServiceCall) -> ServiceResponse:
+        return await _async_query(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        async_query_service,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_export_gpx_service(call: ServiceCall) -> ServiceResponse:
+        return await _async_export_gpx(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_GPX,
+        async_export_gpx_service,
+        schema=EXPORT_GPX_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    _LOGGER.debug("Torque services registered")
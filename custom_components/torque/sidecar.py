@@ -0,0 +1,399 @@
+"""Standalone ingest sidecar forwarding Torque uploads to Home Assistant in batches.
+
+Point the Torque app at the sidecar instead of at Home Assistant and run
+it next to Home Assistant with a long-lived access token of an admin user::
+
+    python3 custom_components/torque/sidecar.py --token <token>
+
+Uploads are validated and parsed here, retried uploads are dropped and the
+rest are collected per vehicle. Every few seconds the uploads of each
+vehicle are sent to Home Assistant as one ``torque/ingest`` websocket
+command, so its event loop handles a message per vehicle instead of an
+HTTP request per upload. The sidecar only needs aiohttp and never imports
+Home Assistant, so it can run in a virtual environment of its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, WSMsgType, web
+
+_LOGGER = logging.getLogger(__name__)
+
+# Mirrors const.py, which cannot be imported without Home Assistant
+API_PATH = "/api/torque"
+WS_TYPE_INGEST = "torque/ingest"
+EMAIL_FIELD = "eml"
+SESSION_FIELD = "session"
+TIME_FIELD = "time"
+VALUE_KEY = re.compile(r"k(\w+)")
+METADATA_PREFIXES = ("userFullName", "userShortName", "userUnit", "defaultUnit")
+
+DEFAULT_URL = "ws://127.0.0.1:8123/api/websocket"
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8124
+DEFAULT_INTERVAL = 5.0  # seconds between forwarded batches
+MAX_INTERVAL = 30.0  # below the integration's late upload threshold
+MAX_BATCH_ROWS = 500  # uploads per websocket message
+MAX_QUEUED_ROWS = 20_000  # uploads held per vehicle while Home Assistant is away
+DEDUPE_WINDOW = 256  # recent upload times remembered per vehicle
+RESPONSE_TIMEOUT = 30.0  # seconds
+
+
+def _is_number(value: str) -> bool:
+    """Return whether a value is numeric, as the integration requires."""
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+class VehicleBatcher:
+    """Uploads of one vehicle waiting to be forwarded.
+
+    Uploads are stored as rows of a table whose columns are the value keys
+    seen so far, so keys are sent once per batch. Metadata is sent only
+    when it changed, in full again for a new session or connection since
+    the integration forgets it then.
+    """
+
+    def __init__(self, email: str) -> None:
+        """Initialize without queued uploads.
+
+        Args:
+            email: Email address the vehicle's uploads carry
+        """
+        self.email = email
+        self.columns: dict[str, int] = {}
+        self.rows: list[list[str | None]] = []
+        self.metadata: dict[str, str] = {}
+        self.duplicates = 0
+        self.dropped = 0
+        # Dropped count when the batch in flight was taken
+        self._dropped_at_batch = 0
+        self._known_metadata: dict[str, str] = {}
+        self._session: str | None = None
+        self._recent: OrderedDict[tuple[str | None, str], None] = OrderedDict()
+
+    def add(self, data: dict[str, str]) -> bool:
+        """Parse an upload and queue its values.
+
+        Args:
+            data: Request data dictionary
+
+        Returns:
+            False if the upload repeats a recent one and was dropped
+        """
+        session = data.get(SESSION_FIELD)
+        if (sample_time := data.get(TIME_FIELD)) is not None:
+            # Torque resends an upload it got no answer for
+            key = (session, sample_time)
+            if key in self._recent:
+                self.duplicates += 1
+                return False
+            self._recent[key] = None
+            if len(self._recent) > DEDUPE_WINDOW:
+                self._recent.popitem(last=False)
+        if session != self._session:
+            self._session = session
+            self.resend_metadata()
+
+        columns = self.columns
+        row: list[str | None] = [None] * len(columns)
+        for key, value in data.items():
+            if key.startswith(METADATA_PREFIXES):
+                if self._known_metadata.get(key) != value:
+                    self._known_metadata[key] = value
+                    self.metadata[key] = value
+                continue
+            if key not in (SESSION_FIELD, TIME_FIELD) and not (
+                VALUE_KEY.fullmatch(key) and _is_number(value)
+            ):
+                continue
+            if (index := columns.get(key)) is None:
+                index = columns[key] = len(columns)
+                row.append(None)
+            row[index] = value
+
+        self.rows.append(row)
+        if len(self.rows) > MAX_QUEUED_ROWS:
+            del self.rows[0]
+            self.dropped += 1
+        return True
+
+    def resend_metadata(self) -> None:
+        """Send all known metadata with the next batch."""
+        self.metadata = dict(self._known_metadata)
+
+    def batch(self, limit: int = MAX_BATCH_ROWS) -> dict[str, Any] | None:
+        """Return the oldest queued uploads as an ingest command.
+
+        The uploads stay queued until commit is called, so a batch that
+        could not be delivered is sent again.
+
+        Args:
+            limit: Uploads per batch at most
+
+        Returns:
+            Command without its id, None if nothing is queued
+        """
+        if not self.rows:
+            return None
+        self._dropped_at_batch = self.dropped
+        return {
+            "type": WS_TYPE_INGEST,
+            EMAIL_FIELD: self.email,
+            "metadata": dict(self.metadata),
+            "keys": list(self.columns),
+            "rows": self.rows[:limit],
+        }
+
+    def commit(self, batch: dict[str, Any]) -> None:
+        """Drop the uploads of a delivered batch.
+
+        Uploads queued while the batch was sent may have pushed some of its
+        uploads out of a full queue already, only the rest are left to drop.
+
+        Args:
+            batch: Batch returned by batch
+        """
+        overflowed = self.dropped - self._dropped_at_batch
+        del self.rows[: max(0, len(batch["rows"]) - overflowed)]
+        # Metadata that changed again meanwhile is sent with the next batch
+        for key, value in batch["metadata"].items():
+            if self.metadata.get(key) == value:
+                del self.metadata[key]
+        if not self.rows:
+            # Columns of PIDs no longer sent would otherwise stay forever
+            self.columns = {}
+
+
+class LinkError(Exception):
+    """Home Assistant refused a command or the connection."""
+
+
+class HomeAssistantLink:
+    """Websocket connection to Home Assistant, opened on first use."""
+
+    def __init__(self, session: ClientSession, url: str, token: str) -> None:
+        """Initialize without connecting.
+
+        Args:
+            session: HTTP client session
+            url: Websocket API URL of Home Assistant
+            token: Long-lived access token
+        """
+        self.session = session
+        self.url = url
+        self.token = token
+        self.connected = False
+        self._ws: Any = None
+        self._next_id = 0
+
+    async def _async_connect(self) -> None:
+        """Connect and authenticate."""
+        self._ws = await self.session.ws_connect(self.url, heartbeat=30)
+        await self._async_receive()  # auth_required
+        await self._ws.send_json({"type": "auth", "access_token": self.token})
+        if (message := await self._async_receive())["type"] != "auth_ok":
+            await self.async_close()
+            raise LinkError(message.get("message", "Authentication failed"))
+        self.connected = True
+        _LOGGER.info("Connected to %s", self.url)
+
+    async def _async_receive(self) -> dict[str, Any]:
+        """Return the next JSON message."""
+        message = await self._ws.receive(timeout=RESPONSE_TIMEOUT)
+        if message.type != WSMsgType.TEXT:
+            raise LinkError(f"Connection closed ({message.type})")
+        return message.json()
+
+    async def async_send(self, command: dict[str, Any]) -> Any:
+        """Send a command and wait for its result.
+
+        Args:
+            command: Command without its id
+
+        Returns:
+            Result of the command
+
+        Raises:
+            LinkError: If the command failed
+        """
+        if self._ws is None or self._ws.closed:
+            self.connected = False
+            await self._async_connect()
+        self._next_id += 1
+        await self._ws.send_json({"id": self._next_id, **command})
+        while (message := await self._async_receive()).get("id") != self._next_id:
+            continue
+        if not message.get("success"):
+            raise LinkError(message.get("error", {}).get("message", "Command failed"))
+        return message.get("result")
+
+    async def async_close(self) -> None:
+        """Close the connection."""
+        if self._ws is not None:
+            await self._ws.close()
+        self._ws = None
+        self.connected = False
+
+
+class IngestSidecar:
+    """Receiver of Torque uploads forwarding them in batches."""
+
+    def __init__(
+        self,
+        link: HomeAssistantLink,
+        interval: float = DEFAULT_INTERVAL,
+        emails: set[str] | None = None,
+    ) -> None:
+        """Initialize the sidecar.
+
+        Args:
+            link: Connection to Home Assistant
+            interval: Seconds between forwarded batches
+            emails: Accepted email addresses, None to accept all
+        """
+        self.link = link
+        self.interval = interval
+        self.emails = emails
+        self.vehicles: dict[str, VehicleBatcher] = {}
+        self.app = web.Application()
+        self.app.router.add_get(API_PATH, self._async_handle)
+        self.app.router.add_post(API_PATH, self._async_handle)
+
+    async def _async_handle(self, request: web.Request) -> web.Response:
+        """Queue a Torque upload.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            HTTP response, as the integration would answer
+        """
+        if request.method == "POST":
+            data = {key: str(value) for key, value in (await request.post()).items()}
+        else:
+            data = dict(request.query)
+        if (email := data.get(EMAIL_FIELD)) is None:
+            return web.Response(status=400, text="Missing email field")
+        if self.emails is not None and email not in self.emails:
+            return web.Response(status=403, text="Unauthorized email")
+        if (vehicle := self.vehicles.get(email)) is None:
+            vehicle = self.vehicles[email] = VehicleBatcher(email)
+        vehicle.add(data)
+        return web.Response(text="OK")
+
+    async def async_flush(self) -> int:
+        """Forward the queued uploads of every vehicle.
+
+        Returns:
+            Number of uploads delivered
+        """
+        if not self.link.connected:
+            # The next connection may be to a restarted Home Assistant
+            for vehicle in self.vehicles.values():
+                vehicle.resend_metadata()
+        delivered = 0
+        for vehicle in self.vehicles.values():
+            while (batch := vehicle.batch()) is not None:
+                try:
+                    await self.link.async_send(batch)
+                except (ClientError, LinkError, OSError, TimeoutError) as exc:
+                    _LOGGER.warning(
+                        "Could not forward %d uploads of %s, will retry: %s",
+                        len(batch["rows"]),
+                        vehicle.email,
+                        exc,
+                    )
+                    await self.link.async_close()
+                    return delivered
+                vehicle.commit(batch)
+                delivered += len(batch["rows"])
+        return delivered
+
+    async def async_run(self) -> None:
+        """Forward queued uploads every interval until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                await self.async_flush()
+        finally:
+            await self.async_flush()
+            await self.link.async_close()
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    """Run the sidecar until it is interrupted."""
+    async with ClientSession() as session:
+        sidecar = IngestSidecar(
+            HomeAssistantLink(session, args.url, args.token),
+            args.interval,
+            set(args.email) if args.email else None,
+        )
+        runner = web.AppRunner(sidecar.app)
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.port).start()
+        _LOGGER.info("Receiving Torque uploads on %s:%d", args.host, args.port)
+        try:
+            await sidecar.async_run()
+        finally:
+            await runner.cleanup()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the command line and run the sidecar.
+
+    Args:
+        argv: Command line arguments, sys.argv if None
+
+    Returns:
+        Exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DEFAULT_URL, help="websocket API URL")
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("TORQUE_SIDECAR_TOKEN"),
+        help="long-lived access token (default: $TORQUE_SIDECAR_TOKEN)",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"seconds between batches, at most {MAX_INTERVAL:g}",
+    )
+    parser.add_argument(
+        "--email", action="append", help="accepted email address, repeatable"
+    )
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("an access token is required")
+    if not 0 < args.interval <= MAX_INTERVAL:
+        parser.error(f"--interval must be between 0 and {MAX_INTERVAL:g}")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_async_main(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Bounded-memory percentiles of every raw sample of a PID."""
+
+from __future__ import annotations
+
+import math
+import random
+from array import array
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import PERCENTILE_SKETCH_SIZE
+
+PERCENTILE_ATTRIBUTES = frozenset(
+    f"{scope}_{statistic}"
+    for scope in ("session", "day")
+    for statistic in ("p50", "p95", "max")
+)
+
+
+class KllSketch:
+    """KLL quantile sketch (Karnin, Lang and Liberty, FOCS 2016).
+
+    Samples enter the lowest of a stack of compactors. A full compactor is
+    sorted and every other sample moves up a level with twice the weight,
+    starting at a random one of the first two. Capacities shrink by 2/3 per
+    level below the top, so memory stays around 3 * k floats however many
+    samples are added, with a rank error of about 1.7 / k.
+    """
+
+    __slots__ = ("k", "count", "min", "max", "_levels", "_size", "_max_size")
+
+    def __init__(self, k: int = PERCENTILE_SKETCH_SIZE) -> None:
+        """Initialize an empty sketch.
+
+        Args:
+            k: Capacity of the top compactor, trading memory for accuracy
+        """
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: list[array[float]] = []
+        self._size = 0
+        self._max_size = 0
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        """Return the capacity of a compactor."""
+        depth = len(self._levels) - level - 1
+        return max(int(self.k * (2 / 3) ** depth), 2)
+
+    def _grow(self) -> None:
+        """Add a compactor on top of the stack."""
+        self._levels.append(array("d"))
+        self._update_max_size()
+
+    def _update_max_size(self) -> None:
+        """Recompute the number of samples held before compacting."""
+        self._max_size = sum(
+            self._capacity(level) for level in range(len(self._levels))
+        )
+
+    def add(self, value: float) -> None:
+        """Add a sample.
+
+        Args:
+            value: Sample value
+        """
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._levels[0].append(value)
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        """Compact full levels until the sketch is within its size again."""
+        for level, items in enumerate(self._levels):
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self._levels):
+                self._grow()
+            ordered = sorted(items)
+            # An odd sample out stays behind at its weight
+            odd = len(ordered) % 2
+            self._levels[level] = array("d", ordered[:odd])
+            self._levels[level + 1].extend(ordered[odd + random.getrandbits(1) :: 2])
+            self._size = sum(len(level_items) for level_items in self._levels)
+            if self._size < self._max_size:
+                break
+
+    def quantiles(self, fractions: tuple[float, ...]) -> list[float | None]:
+        """Return estimates of some quantiles.
+
+        Args:
+            fractions: Quantiles to estimate, between 0 and 1, ascending
+
+        Returns:
+            Estimate of every quantile, None while the sketch is empty
+        """
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = sorted(
+            (value, 1 << level)
+            for level, items in enumerate(self._levels)
+            for value in items
+        )
+        total = sum(weight for _, weight in weighted)
+        estimates: list[float | None] = []
+        rank = 0
+        index = 0
+        for fraction in fractions:
+            target = fraction * total
+            while index < len(weighted) - 1 and rank + weighted[index][1] < target:
+                rank += weighted[index][1]
+                index += 1
+            estimates.append(weighted[index][0])
+        return estimates
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the sketch for storage."""
+        return {
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "levels": [items.tolist() for items in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> KllSketch | None:
+        """Rebuild a sketch stored by as_dict.
+
+        Args:
+            data: Stored sketch
+
+        Returns:
+            Rebuilt sketch, None when missing or malformed
+        """
+        if not data:
+            return None
+        sketch = cls()
+        try:
+            sketch.count = int(data["count"])
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+            levels = [array("d", map(float, items)) for items in data["levels"]]
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not levels:
+            return None
+        sketch._levels = levels
+        sketch._size = sum(len(items) for items in levels)
+        sketch._update_max_size()
+        return sketch
+
+
+def _local_day(timestamp: float) -> tuple[float, float]:
+    """Return the start and end of the local day holding a timestamp."""
+    start = dt_util.start_of_local_day(
+        dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+    )
+    return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+
+class PercentileTracker:
+    """Percentiles of a PID over the current Torque session and local day."""
+
+    __slots__ = ("session_id", "session", "day", "_day_start", "_day_end")
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        self.session_id: str | None = None
+        self.session = KllSketch()
+        self.day = KllSketch()
+        self._day_start = -math.inf
+        self._day_end = -math.inf
+
+    def set_session(self, session_id: str | None) -> None:
+        """Start the session sketch over when the Torque session changes.
+
+        Args:
+            session_id: Session id of the latest upload
+        """
+        if session_id != self.session_id:
+            self.session_id = session_id
+            self.session = KllSketch()
+
+    def add(self, value: float, sample_time: float) -> None:
+        """Add a sample to the session and day sketches.
+
+        Args:
+            value: Sample value
+            sample_time: Epoch timestamp the sample was taken at
+        """
+        if not self._day_start <= sample_time < self._day_end:
+            self._day_start, self._day_end = _local_day(sample_time)
+            self.day = KllSketch()
+        self.session.add(value)
+        self.day.add(value)
+
+    def attributes(self, precision: int) -> dict[str, float | None]:
+        """Return the p50, p95 and maximum of the session and the day.
+
+        Args:
+            precision: Decimal places the estimates are rounded to
+
+        Returns:
+            State attributes
+        """
+        attributes: dict[str, float | None] = {}
+        for scope, sketch in (("session", self.session), ("day", self.day)):
+            p50, p95 = sketch.quantiles((0.5, 0.95))
+            attributes[f"{scope}_p50"] = None if p50 is None else round(p50, precision)
+            attributes[f"{scope}_p95"] = None if p95 is None else round(p95, precision)
+            attributes[f"{scope}_max"] = sketch.max if sketch.count else None
+        return attributes
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the sketches for storage."""
+        return {
+            "session_id": self.session_id,
+            "session": self.session.as_dict(),
+            "day_start": self._day_start if self.day.count else None,
+            "day": self.day.as_dict(),
+        }
+
+    def restore(self, data: dict[str, Any] | None, now: float) -> None:
+        """Restore sketches stored by as_dict that are still current.
+
+        The session sketch is kept unless another session already started,
+        the day sketch only on the day it was stored.
+
+        Args:
+            data: Stored sketches, ignored when missing or malformed
+            now: Current epoch timestamp
+        """
+        if not data:
+            return
+        session_id = data.get("session_id")
+        if (
+            self.session_id in (None, session_id)
+            and not self.session.count
+            and (session := KllSketch.from_dict(data.get("session"))) is not None
+        ):
+            self.session_id = session_id
+            self.session = session
+        day_start, day_end = _local_day(now)
+        if (
+            data.get("day_start") == day_start
+            and not self.day.count
+            and (day := KllSketch.from_dict(data.get("day"))) is not None
+        ):
+            self._day_start, self._day_end = day_start, day_end
+            self.day = day
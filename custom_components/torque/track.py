@@ -0,0 +1,542 @@
+"""GPS track of each Torque session, simplified and written as GPX.
+
+Fixes are kept in flat typed arrays and simplified with the
+Douglas-Peucker algorithm a window at a time while the session runs, so
+a long drive only keeps the points that shape its route. When the
+session ends the track is written to a GPX file with altitude and speed
+per point.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+from array import array
+from collections.abc import Sequence
+from typing import Any
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .archive import session_name
+from .const import (
+    TRACK_ALTITUDE_KEY,
+    TRACK_DIRECTORY,
+    TRACK_LATITUDE_KEY,
+    TRACK_LONGITUDE_KEY,
+    TRACK_SPEED_KEY,
+    TRACK_WINDOW,
+)
+from .query import list_sessions
+
+_LOGGER = logging.getLogger(__name__)
+
+GPX_SUFFIX = ".gpx"
+GPX_NAMESPACE = "http://www.topografix.com/GPX/1/1"
+TPX_NAMESPACE = "http://www.garmin.com/xmlschemas/TrackPointExtension/v2"
+
+# time, latitude, longitude, altitude (m) and speed (m/s) of every fix
+FIELDS = 5
+TrackPoint = tuple[float, float, float, float, float]
+
+EARTH_RADIUS = 6_371_000.0  # metres
+
+
+def simplify(fixes: Sequence[float], tolerance: float) -> list[int]:
+    """Return the indexes of the fixes kept by Douglas-Peucker.
+
+    Positions are projected to metres around the first fix, which is
+    accurate enough over the few kilometres a window spans.
+
+    Args:
+        fixes: FIELDS floats per fix, in time order
+        tolerance: Metres a dropped fix may be from the simplified track,
+            0 to keep every fix
+
+    Returns:
+        Indexes of the kept fixes, always including the first and last one
+    """
+    count = len(fixes) // FIELDS
+    if count < 3 or tolerance <= 0:
+        return list(range(count))
+
+    lat_scale = math.radians(EARTH_RADIUS)
+    lon_scale = lat_scale * math.cos(math.radians(fixes[1]))
+    xs = [longitude * lon_scale for longitude in fixes[2::FIELDS]]
+    ys = [latitude * lat_scale for latitude in fixes[1::FIELDS]]
+    limit = tolerance * tolerance
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    # Iterative rather than recursive, a window can hold a long straight road
+    segments = [(0, count - 1)]
+    while segments:
+        first, last = segments.pop()
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length = dx * dx + dy * dy
+        worst, worst_distance = 0, limit
+        for index in range(first + 1, last):
+            px, py = xs[index] - ax, ys[index] - ay
+            if length:
+                # Distance to the segment, not the line, so loops survive
+                along = min(max((px * dx + py * dy) / length, 0.0), 1.0)
+                px -= along * dx
+                py -= along * dy
+            distance = px * px + py * py
+            if distance > worst_distance:
+                worst, worst_distance = index, distance
+        if worst:
+            keep[worst] = True
+            segments.append((first, worst))
+            segments.append((worst, last))
+    return [index for index, kept in enumerate(keep) if kept]
+
+
+def _select(fixes: array[float], indexes: Sequence[int]) -> array[float]:
+    """Return the fixes at some indexes.
+
+    Args:
+        fixes: FIELDS floats per fix
+        indexes: Indexes of the fixes to return
+
+    Returns:
+        Selected fixes, FIELDS floats each
+    """
+    selected = array("d")
+    for index in indexes:
+        selected.extend(fixes[index * FIELDS : (index + 1) * FIELDS])
+    return selected
+
+
+class TrackSimplifier:
+    """Simplify a GPS track as it is received, window by window.
+
+    Fixes collect in a window of TRACK_WINDOW fixes. A full window is
+    simplified and its kept fixes are moved to the track, except for the
+    last one, which starts the next window so the track stays connected.
+    """
+
+    __slots__ = ("tolerance", "window", "fixes", "_kept", "_pending")
+
+    def __init__(self, tolerance: float, window: int = TRACK_WINDOW) -> None:
+        """Initialize an empty track.
+
+        Args:
+            tolerance: Metres a dropped fix may be from the simplified track
+            window: Fixes simplified together
+        """
+        self.tolerance = tolerance
+        self.window = window
+        self.fixes = 0
+        self._kept = array("d")
+        self._pending = array("d")
+
+    def add(
+        self,
+        sample_time: float,
+        latitude: float,
+        longitude: float,
+        altitude: float = math.nan,
+        speed: float = math.nan,
+    ) -> bool:
+        """Add a fix unless it repeats or predates the previous one.
+
+        Args:
+            sample_time: Epoch timestamp of the fix
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+            altitude: Altitude in metres, NaN if unknown
+            speed: Speed in metres per second, NaN if unknown
+
+        Returns:
+            Whether the fix was added
+        """
+        pending = self._pending
+        if pending and (
+            sample_time <= pending[-FIELDS]
+            or (latitude == pending[1 - FIELDS] and longitude == pending[2 - FIELDS])
+        ):
+            return False
+        pending.extend((sample_time, latitude, longitude, altitude, speed))
+        self.fixes += 1
+        if len(pending) >= self.window * FIELDS:
+            kept = simplify(pending, self.tolerance)
+            self._kept.extend(_select(pending, kept[:-1]))
+            self._pending = pending[-FIELDS:]
+        return True
+
+    def points(self) -> list[TrackPoint]:
+        """Return the simplified track so far, leaving the open window as is.
+
+        Returns:
+            (time, latitude, longitude, altitude, speed) of every kept fix
+        """
+        pending = self._pending
+        fixes = self._kept + _select(pending, simplify(pending, self.tolerance))
+        return [
+            (fixes[i], fixes[i + 1], fixes[i + 2], fixes[i + 3], fixes[i + 4])
+            for i in range(0, len(fixes), FIELDS)
+        ]
+
+
+def _format_time(timestamp: float) -> str:
+    """Return an epoch timestamp as a GPX UTC time."""
+    return (
+        dt_util.utc_from_timestamp(timestamp)
+        .isoformat(timespec="milliseconds")
+        .replace("+00:00", "Z")
+    )
+
+
+def write_gpx(path: str, name: str, points: Sequence[TrackPoint]) -> None:
+    """Write a track to a GPX 1.1 file, replacing it atomically.
+
+    Args:
+        path: GPX file
+        name: Track name
+        points: (time, latitude, longitude, altitude, speed) of every point
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as gpx:
+        gpx.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<gpx version="1.1" creator="Home Assistant Torque" '
+            f'xmlns="{GPX_NAMESPACE}" xmlns:gpxtpx="{TPX_NAMESPACE}">\n'
+            f"<metadata><name>{escape(name)}</name></metadata>\n"
+            f"<trk><name>{escape(name)}</name><trkseg>\n"
+        )
+        for sample_time, latitude, longitude, altitude, speed in points:
+            point = f'<trkpt lat="{latitude:.7f}" lon="{longitude:.7f}">'
+            if not math.isnan(altitude):
+                point += f"<ele>{altitude:.1f}</ele>"
+            point += f"<time>{_format_time(sample_time)}</time>"
+            if not math.isnan(speed):
+                point += (
+                    "<extensions><gpxtpx:TrackPointExtension>"
+                    f"<gpxtpx:speed>{speed:.2f}</gpxtpx:speed>"
+                    "</gpxtpx:TrackPointExtension></extensions>"
+                )
+            gpx.write(f"{point}</trkpt>\n")
+        gpx.write("</trkseg></trk>\n</gpx>\n")
+    os.replace(temporary, path)
+
+
+def read_gpx(path: str) -> list[TrackPoint]:
+    """Read the points of a GPX file written by write_gpx.
+
+    Args:
+        path: GPX file
+
+    Returns:
+        (time, latitude, longitude, altitude, speed) of every point, none if
+        the file is missing or unreadable
+    """
+    points: list[TrackPoint] = []
+    try:
+        for _, element in ElementTree.iterparse(path):
+            if element.tag != f"{{{GPX_NAMESPACE}}}trkpt":
+                continue
+            altitude = element.findtext(f"{{{GPX_NAMESPACE}}}ele")
+            speed = element.findtext(f".//{{{TPX_NAMESPACE}}}speed")
+            timestamp = dt_util.parse_datetime(
+                element.findtext(f"{{{GPX_NAMESPACE}}}time") or ""
+            )
+            if timestamp is None:
+                continue
+            points.append(
+                (
+                    timestamp.timestamp(),
+                    float(element.attrib["lat"]),
+                    float(element.attrib["lon"]),
+                    math.nan if altitude is None else float(altitude),
+                    math.nan if speed is None else float(speed),
+                )
+            )
+            element.clear()
+    except FileNotFoundError:
+        return []
+    except (OSError, ElementTree.ParseError, KeyError, ValueError) as exc:
+        _LOGGER.warning("Could not read GPS track %s: %s", path, exc)
+        return []
+    return points
+
+
+def _optional_float(value: Any) -> float:
+    """Return a raw Torque value as float, NaN if missing or invalid."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _parse_fix(data: dict[str, Any]) -> tuple[float, float, float, float] | None:
+    """Return the GPS fix of an upload.
+
+    Args:
+        data: Request data dictionary
+
+    Returns:
+        Latitude, longitude, altitude and speed in metres per second, None if
+        the upload has no valid fix
+    """
+    try:
+        latitude = float(data[TRACK_LATITUDE_KEY])
+        longitude = float(data[TRACK_LONGITUDE_KEY])
+    except (KeyError, TypeError, ValueError):
+        return None
+    # Torque reports 0, 0 until the phone has a fix
+    if (latitude == 0 and longitude == 0) or not (
+        -90 <= latitude <= 90 and -180 <= longitude <= 180
+    ):
+        return None
+    return (
+        latitude,
+        longitude,
+        _optional_float(data.get(TRACK_ALTITUDE_KEY)),
+        _optional_float(data.get(TRACK_SPEED_KEY)) / 3.6,
+    )
+
+
+def merge_points(*tracks: Sequence[TrackPoint]) -> list[TrackPoint]:
+    """Merge tracks of one session into one in time order.
+
+    Args:
+        tracks: Points of each track
+
+    Returns:
+        Points of all tracks, one per time
+    """
+    return sorted({point[0]: point for track in tracks for point in track}.values())
+
+
+class VehicleTrack:
+    """GPS track of a vehicle's current session, written as GPX when it ends.
+
+    A session continued after a restart starts from the GPX file written
+    before it, so its fixes are kept. Fixes of late uploads, buffered
+    offline by Torque, are collected per session and merged into its file
+    when that is written, without changing the current session.
+    """
+
+    def __init__(self, hass: HomeAssistant, vehicle: str, tolerance: float) -> None:
+        """Initialize the track of a vehicle.
+
+        Args:
+            hass: Home Assistant instance
+            vehicle: Vehicle name, used for the track directory
+            tolerance: Metres a dropped fix may be from the simplified track
+        """
+        self.hass = hass
+        self.vehicle = vehicle
+        self.tolerance = tolerance
+        self.directory = hass.config.path(TRACK_DIRECTORY, slugify(vehicle))
+        self.name: str | None = None
+        self.path: str | None = None
+        self.files_written = 0
+        self.simplifier = TrackSimplifier(tolerance)
+        self._session: str | None = None
+        # Fixes of late uploads by session name
+        self._late: dict[str, TrackSimplifier] = {}
+        self._resumed: asyncio.Future[list[TrackPoint]] | None = None
+        self._write: asyncio.Future[int | None] | None = None
+
+    @callback
+    def async_set_session(self, session: str | None, sample_time: float) -> None:
+        """Write the track and start a new one when the Torque session changes.
+
+        Args:
+            session: Session id of the upload
+            sample_time: Epoch timestamp the upload was sampled at
+        """
+        if self.path is not None and session == self._session:
+            return
+        self.async_finish()
+        if self.name is not None:
+            self._late.pop(self.name, None)
+        self._session = session
+        self.name = session_name(session, sample_time)
+        self.path = os.path.join(self.directory, f"{self.name}{GPX_SUFFIX}")
+        self.simplifier = TrackSimplifier(self.tolerance)
+        self._resumed = self.hass.async_create_background_task(
+            self._async_resume(self._write, self.path), "torque track resume"
+        )
+
+    async def _async_resume(
+        self, previous: asyncio.Future[int | None] | None, path: str
+    ) -> list[TrackPoint]:
+        """Read the points already written for a session.
+
+        Args:
+            previous: Pending write, which may be of the same file
+            path: GPX file
+
+        Returns:
+            Points of the file, empty if there is none
+        """
+        if previous is not None:
+            await previous
+        return await self.hass.async_add_executor_job(read_gpx, path)
+
+    @callback
+    def add(self, sample_time: float, data: dict[str, Any]) -> None:
+        """Add the GPS fix of an upload, if it has one.
+
+        Args:
+            sample_time: Epoch timestamp the upload was sampled at
+            data: Request data dictionary
+        """
+        if (fix := _parse_fix(data)) is not None:
+            self.simplifier.add(sample_time, *fix)
+
+    @callback
+    def add_late(
+        self, session: str | None, sample_time: float, data: dict[str, Any]
+    ) -> None:
+        """Keep the GPS fix of a late upload for its session's file.
+
+        Args:
+            session: Session id of the upload
+            sample_time: Epoch timestamp the upload was sampled at
+            data: Request data dictionary
+        """
+        if (fix := _parse_fix(data)) is None:
+            return
+        name = self.name if self.path is not None and session == self._session else None
+        if name is None:
+            name = session_name(session, sample_time)
+        if (simplifier := self._late.get(name)) is None:
+            simplifier = self._late[name] = TrackSimplifier(self.tolerance)
+        simplifier.add(sample_time, *fix)
+
+    @callback
+    def async_finish(self) -> None:
+        """Write the track of the current session in the background.
+
+        Late fixes of the session are merged in, and kept until the session
+        ends since every write replaces the file.
+        """
+        if self.path is None or self.name is None:
+            return
+        late = self._late.get(self.name)
+        if not self.simplifier.fixes and late is None:
+            return
+        self._write = self.hass.async_create_background_task(
+            self._async_write(
+                self._write,
+                self._resumed,
+                self.path,
+                self.name,
+                merge_points(self.simplifier.points(), late.points() if late else []),
+            ),
+            "torque track write",
+        )
+
+    @callback
+    def async_flush_late(self) -> None:
+        """Merge the late fixes of past sessions into their GPX files."""
+        current = self.name if self.path is not None else None
+        for name in [name for name in self._late if name != current]:
+            path = os.path.join(self.directory, f"{name}{GPX_SUFFIX}")
+            resumed = self.hass.async_create_background_task(
+                self._async_resume(self._write, path), "torque track resume"
+            )
+            self._write = self.hass.async_create_background_task(
+                self._async_write(
+                    self._write, resumed, path, name, self._late.pop(name).points()
+                ),
+                "torque track write",
+            )
+
+    @callback
+    def async_suspend(self) -> None:
+        """Write the track and release its fixes while the vehicle is idle.
+
+        The next upload resumes the session from the written file.
+        """
+        self.async_finish()
+        if self.name is not None:
+            self._late.pop(self.name, None)
+        self.path = None
+        self.simplifier = TrackSimplifier(self.tolerance)
+        self._resumed = None
+        self.async_flush_late()
+
+    async def _async_write(
+        self,
+        previous: asyncio.Future[int | None] | None,
+        resumed: asyncio.Future[list[TrackPoint]] | None,
+        path: str,
+        name: str,
+        points: list[TrackPoint],
+    ) -> int | None:
+        """Write a track once the previous write is done.
+
+        Args:
+            previous: Previous write
+            resumed: Points written for the session before a restart
+            path: GPX file
+            name: Track name
+            points: Simplified track of the session
+
+        Returns:
+            Number of points written, None if the file could not be written
+        """
+        if previous is not None:
+            await previous
+        if resumed is not None:
+            points = merge_points(await resumed, points)
+        try:
+            await self.hass.async_add_executor_job(write_gpx, path, name, points)
+        except OSError as exc:
+            _LOGGER.error("Failed to write GPS track %s: %s", path, exc)
+            return None
+        self.files_written += 1
+        return len(points)
+
+    async def async_export(self, session: str | None = None) -> dict[str, Any]:
+        """Write the current track now or look up the GPX file of a session.
+
+        Args:
+            session: Session name, the current or most recent one if None
+
+        Returns:
+            Session name, GPX file path and number of points
+
+        Raises:
+            HomeAssistantError: If the session has no track
+        """
+        if session in (None, self.name) and self.simplifier.fixes:
+            self.async_finish()
+            if self._write is None or (points := await self._write) is None:
+                raise HomeAssistantError(f"Could not write GPS track {self.path}")
+            return {"session": self.name, "path": self.path, "points": points}
+
+        if session is None:
+            sessions = await self.hass.async_add_executor_job(
+                list_sessions, self.directory, GPX_SUFFIX
+            )
+            if not sessions:
+                raise HomeAssistantError(f"No GPS track recorded for {self.vehicle}")
+            session = sessions[-1]
+        path = os.path.join(self.directory, f"{session}{GPX_SUFFIX}")
+        if os.path.dirname(os.path.normpath(path)) != os.path.normpath(self.directory):
+            raise HomeAssistantError(f"Invalid session {session}")
+        if not await self.hass.async_add_executor_job(os.path.isfile, path):
+            raise HomeAssistantError(f"No GPS track for session {session}")
+        points = await self.hass.async_add_executor_job(read_gpx, path)
+        return {"session": session, "path": path, "points": len(points)}
+
+    async def async_close(self, *_: Any) -> None:
+        """Write the current track and wait for pending writes."""
+        self.async_finish()
+        self.async_flush_late()
+        if self._write is not None:
+            await self._write
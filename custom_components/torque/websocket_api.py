@@ -0,0 +1,417 @@
+"""Websocket API serving live and recent samples received from Torque."""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import time
+from collections import deque
+from collections.abc import Collection
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.json import json_dumps
+
+from .const import (
+    ATTR_ENTRY_ID,
+    DATA_LIVE,
+    DATA_VIEWS,
+    LIVE_BUFFER_SIZE,
+    LIVE_SEND_INTERVAL,
+    MAX_QUERY_POINTS,
+    SENSOR_EMAIL_FIELD,
+    SENSOR_VALUE_KEY,
+    WS_TYPE_HISTORY,
+    WS_TYPE_INGEST,
+    WS_TYPE_QUERY,
+    WS_TYPE_SUBSCRIBE_LIVE,
+)
+from .query import async_query
+
+_LOGGER = logging.getLogger(__name__)
+
+VALUE_KEY = re.compile(SENSOR_VALUE_KEY)
+
+
+def encode_batch(
+    entry_id: str | None,
+    vehicle: str,
+    sample_time: float,
+    data: dict[str, Any],
+    hidden_pids: Collection[int],
+) -> str | None:
+    """Encode the numeric values of an upload as a JSON batch.
+
+    Args:
+        entry_id: Config entry of the vehicle
+        vehicle: Vehicle name
+        sample_time: Epoch timestamp the upload was sampled at
+        data: Request data dictionary
+        hidden_pids: PIDs left out of the batch
+
+    Returns:
+        JSON object with ``[pid, value]`` samples, or None if there are none
+    """
+    samples: list[tuple[int, float]] = []
+    for key, value in data.items():
+        if (match := VALUE_KEY.fullmatch(key)) is None:
+            continue
+        try:
+            pid = int(match.group(1), 16)
+            number = float(value)
+        except (TypeError, ValueError):
+            continue
+        if pid not in hidden_pids:
+            samples.append((pid, number))
+    if not samples:
+        return None
+    return json_dumps(
+        {
+            "entry_id": entry_id,
+            "vehicle": vehicle,
+            "time": sample_time,
+            "samples": samples,
+        }
+    )
+
+
+class LiveSubscriber:
+    """Websocket subscription with a bounded queue of encoded batches.
+
+    Queued batches are sent together every LIVE_SEND_INTERVAL, so a client
+    gets a few messages per second whatever the upload rate. When a client
+    falls behind, the oldest batches are dropped and the next message says
+    how many were lost.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        entry_id: str | None,
+    ) -> None:
+        """Initialize the subscription.
+
+        Args:
+            hass: Home Assistant instance
+            connection: Websocket connection of the client
+            msg_id: Id of the subscribe message, used for every event
+            entry_id: Only stream this vehicle, None for all vehicles
+        """
+        self.hass = hass
+        self.connection = connection
+        self.msg_id = msg_id
+        self.entry_id = entry_id
+        self.queue: deque[str] = deque(maxlen=LIVE_BUFFER_SIZE)
+        self.dropped = 0
+        self._cancel_send: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_push(self, batch: str) -> None:
+        """Queue an encoded batch, dropping the oldest one when full.
+
+        Args:
+            batch: Batch encoded by encode_batch
+        """
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(batch)
+        if self._cancel_send is None:
+            self._cancel_send = async_call_later(
+                self.hass, LIVE_SEND_INTERVAL, self._async_send
+            )
+
+    @callback
+    def _async_send(self, _now: Any = None) -> None:
+        """Send the queued batches as one event message."""
+        self._cancel_send = None
+        if not self.queue:
+            return
+        batches = ",".join(self.queue)
+        self.queue.clear()
+        # Batches are already JSON, so the message is assembled as a string
+        # and each batch is encoded once whatever the number of subscribers
+        self.connection.send_message(
+            f'{{"id":{self.msg_id},"type":"event","event":'
+            f'{{"dropped":{self.dropped},"batches":[{batches}]}}}}'
+        )
+        self.dropped = 0
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop sending, discarding queued batches."""
+        if self._cancel_send is not None:
+            self._cancel_send()
+            self._cancel_send = None
+        self.queue.clear()
+
+
+class LiveStream:
+    """Subscribers to the live stream of all vehicles."""
+
+    def __init__(self) -> None:
+        """Initialize without subscribers."""
+        self.subscribers: set[LiveSubscriber] = set()
+
+    @callback
+    def async_subscribe(self, subscriber: LiveSubscriber) -> CALLBACK_TYPE:
+        """Add a subscriber.
+
+        Args:
+            subscriber: Subscription to add
+
+        Returns:
+            Callback removing the subscription
+        """
+        self.subscribers.add(subscriber)
+
+        @callback
+        def _async_unsubscribe() -> None:
+            self.subscribers.discard(subscriber)
+            subscriber.async_cancel()
+
+        return _async_unsubscribe
+
+    @callback
+    def async_publish(
+        self,
+        entry_id: str | None,
+        vehicle: str,
+        sample_time: float,
+        data: dict[str, Any],
+        hidden_pids: Collection[int],
+    ) -> None:
+        """Encode an upload once and queue it for every matching subscriber.
+
+        Callers check ``subscribers`` first, so uploads cost nothing while
+        no client is subscribed.
+
+        Args:
+            entry_id: Config entry of the vehicle
+            vehicle: Vehicle name
+            sample_time: Epoch timestamp the upload was sampled at
+            data: Request data dictionary
+            hidden_pids: PIDs left out of the stream
+        """
+        subscribers = [
+            subscriber
+            for subscriber in self.subscribers
+            if subscriber.entry_id is None or subscriber.entry_id == entry_id
+        ]
+        if not subscribers:
+            return
+        batch = encode_batch(entry_id, vehicle, sample_time, data, hidden_pids)
+        if batch is None:
+            return
+        for subscriber in subscribers:
+            subscriber.async_push(batch)
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration.
+
+    Args:
+        hass: Home Assistant instance
+    """
+    hass.data.setdefault(DATA_LIVE, LiveStream())
+    websocket_api.async_register_command(hass, websocket_subscribe_live)
+    websocket_api.async_register_command(hass, websocket_history)
+    websocket_api.async_register_command(hass, websocket_query)
+    websocket_api.async_register_command(hass, websocket_ingest)
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE_LIVE,
+        vol.Optional(ATTR_ENTRY_ID): str,
+    }
+)
+@callback
+def websocket_subscribe_live(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream every sample received from one or all vehicles.
+
+    Args:
+        hass: Home Assistant instance
+        connection: Websocket connection of the client
+        msg: Subscribe message, optionally naming a config entry
+    """
+    entry_id = msg.get(ATTR_ENTRY_ID)
+    if entry_id is not None and entry_id not in hass.data.get(DATA_VIEWS, {}):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"No Torque entry {entry_id}"
+        )
+        return
+
+    live: LiveStream = hass.data[DATA_LIVE]
+    subscriber = LiveSubscriber(hass, connection, msg["id"], entry_id)
+    connection.subscriptions[msg["id"]] = live.async_subscribe(subscriber)
+    connection.send_result(msg["id"])
+    _LOGGER.debug("Live stream subscribed for %s", entry_id or "all vehicles")
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_HISTORY,
+        vol.Required(ATTR_ENTRY_ID): str,
+        vol.Required("pid"): vol.All(int, vol.Range(min=0)),
+        vol.Optional("seconds"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("buckets"): vol.All(int, vol.Range(min=1, max=10000)),
+    }
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the recent samples of a PID from memory.
+
+    Args:
+        hass: Home Assistant instance
+        connection: Websocket connection of the client
+        msg: Request naming the config entry and PID, optionally limiting the
+            window and asking for min/max buckets
+    """
+    view = hass.data.get(DATA_VIEWS, {}).get(msg[ATTR_ENTRY_ID])
+    if view is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"No Torque entry {msg[ATTR_ENTRY_ID]}",
+        )
+        return
+
+    ring = view.history.rings.get(msg["pid"])
+    since = time.time() - msg["seconds"] if "seconds" in msg else -math.inf
+    result: dict[str, Any] = {"pid": msg["pid"]}
+    if "buckets" in msg:
+        result["buckets"] = (
+            ring.downsample(msg["buckets"], since) if ring is not None else []
+        )
+    else:
+        result["samples"] = ring.samples(since) if ring is not None else []
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_QUERY,
+        vol.Required(ATTR_ENTRY_ID): str,
+        vol.Optional("session"): str,
+        vol.Optional("pid"): vol.All(int, vol.Range(min=0)),
+        vol.Optional("start"): vol.Coerce(float),
+        vol.Optional("end"): vol.Coerce(float),
+        vol.Optional("points"): vol.All(int, vol.Range(min=1, max=MAX_QUERY_POINTS)),
+    }
+)
+@websocket_api.async_response
+async def websocket_query(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Query the archived sessions of a vehicle.
+
+    Args:
+        hass: Home Assistant instance
+        connection: Websocket connection of the client
+        msg: Request naming the config entry, optionally a session, a PID,
+            an epoch time range and the number of points
+    """
+    view = hass.data.get(DATA_VIEWS, {}).get(msg[ATTR_ENTRY_ID])
+    if view is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"No Torque entry {msg[ATTR_ENTRY_ID]}",
+        )
+        return
+
+    try:
+        result = await async_query(
+            hass,
+            view.vehicle,
+            session=msg.get("session"),
+            pid=msg.get("pid"),
+            start=msg.get("start"),
+            end=msg.get("end"),
+            points=msg.get("points"),
+        )
+    except HomeAssistantError as exc:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, str(exc))
+        return
+    connection.send_result(msg["id"], result)
+
+
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_INGEST,
+        vol.Required(SENSOR_EMAIL_FIELD): str,
+        vol.Optional(ATTR_ENTRY_ID): str,
+        vol.Optional("metadata", default={}): {str: str},
+        vol.Required("keys"): [str],
+        vol.Required("rows"): [list],
+    }
+)
+@websocket_api.async_response
+async def websocket_ingest(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Apply a batch of uploads forwarded by the ingest sidecar.
+
+    Each row holds the values of one upload in the order of ``keys``, None
+    where the upload had no value. The metadata is applied with the first
+    upload.
+
+    Args:
+        hass: Home Assistant instance
+        connection: Websocket connection of the sidecar
+        msg: Batch naming the email address and optionally the config entry
+    """
+    views = hass.data.get(DATA_VIEWS, {})
+    email = msg[SENSOR_EMAIL_FIELD]
+    if ATTR_ENTRY_ID in msg:
+        matches = [views[msg[ATTR_ENTRY_ID]]] if msg[ATTR_ENTRY_ID] in views else []
+    else:
+        matches = [view for view in views.values() if view.email == email]
+    if len(matches) != 1:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"{len(matches)} Torque vehicles match the batch of {email}",
+        )
+        return
+
+    keys = msg["keys"]
+    payloads: list[dict[str, Any]] = []
+    for row in msg["rows"]:
+        data = {SENSOR_EMAIL_FIELD: email}
+        for key, value in zip(keys, row, strict=False):
+            if value is not None:
+                data[key] = str(value)
+        payloads.append(data)
+    if payloads:
+        payloads[0].update(msg["metadata"])
+
+    statuses = await matches[0].async_handle_batch(payloads)
+    accepted = statuses.count(200)
+    connection.send_result(
+        msg["id"], {"accepted": accepted, "rejected": len(statuses) - accepted}
+    )
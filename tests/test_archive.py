@@ -0,0 +1,144 @@
+"""Test the session archive."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import struct
+from array import array
+from unittest.mock import Mock, patch
+
+from custom_components.torque.archive import (
+    SessionArchive,
+    append_block,
+    decode_column,
+    encode_column,
+    read_index,
+    read_range,
+)
+
+START = 1_700_000_000.0
+
+
+def _columns(offset: float, pids: int = 3, seconds: int = 300):
+    columns = {}
+    for pid in range(pids):
+        times = array("d", (START + offset + second for second in range(seconds)))
+        values = array(
+            "d", (20.0 + pid + (second // 30) * 0.5 for second in range(seconds))
+        )
+        columns[pid] = (times, values)
+    return columns
+
+
+def test_column_roundtrip():
+    """Test times and values come back bit for bit."""
+    times_ms = [0, 1000, 2001, 2999, 2999, 60000, -5, 10**12]
+    values = array("d", [1.5, 1.5, -0.0, 1e-300, float("inf"), 3.25, 0.1, 12345.678])
+
+    decoded_times, decoded_values = decode_column(
+        encode_column(times_ms, values), len(times_ms)
+    )
+
+    assert decoded_times == times_ms
+    assert decoded_values.tobytes() == values.tobytes()
+
+
+def test_compression(tmp_path):
+    """Test slowly changing 1 Hz samples take a few bytes each."""
+    path = str(tmp_path / "car" / "session.tqa")
+
+    size = append_block(path, _columns(0, pids=200))
+
+    assert size == os.path.getsize(path)
+    assert size / (200 * 300) < 2
+
+
+def test_read_range_uses_index(tmp_path):
+    """Test a time range is read from the overlapping blocks only."""
+    path = str(tmp_path / "session.tqa")
+    append_block(path, _columns(0))
+    append_block(path, _columns(300))
+
+    samples = read_range(path, START + 310, START + 312, pids={1})
+
+    assert list(samples) == [1]
+    assert samples[1] == [
+        (START + 310, 21.0),
+        (START + 311, 21.0),
+        (START + 312, 21.0),
+    ]
+
+
+def test_index_rebuilt_from_block_headers(tmp_path):
+    """Test the index is recovered when its file is missing."""
+    path = str(tmp_path / "session.tqa")
+    append_block(path, _columns(0))
+    append_block(path, _columns(300))
+    index = read_index(path)
+
+    os.remove(f"{path}.idx")
+
+    assert read_index(path) == index
+    assert len(index) == 2
+
+
+async def test_failed_write_does_not_stop_later_ones(tmp_path):
+    """Test a block that cannot be written only loses its own samples."""
+    hass = Mock()
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+
+    async def run(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run
+    hass.async_create_background_task = lambda coro, _name: asyncio.ensure_future(coro)
+    archive = SessionArchive(hass, "Car")
+    archive.async_set_session("1", START)
+
+    # Too large for a column header, so never buffered
+    archive.add(0x123456789ABC, START, "1.0")
+    assert not archive._blocks
+
+    with patch(
+        "custom_components.torque.archive.append_block",
+        side_effect=[struct.error("bad block"), 10],
+    ):
+        archive.add(12, START, "800")
+        archive.async_flush()
+        archive.add(12, START + 1, "900")
+        await archive.async_close()
+
+    assert archive.blocks_written == 1
+
+
+async def test_late_samples_go_to_their_session(tmp_path):
+    """Test late uploads neither switch nor cut the current session's block."""
+    hass = Mock()
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+
+    async def run(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run
+    hass.async_create_background_task = lambda coro, _name: asyncio.ensure_future(coro)
+    archive = SessionArchive(hass, "Car")
+
+    for second in range(3):
+        archive.async_set_session("2", START + 3600 + second)
+        archive.add(12, START + 3600 + second, "900")
+        archive.async_end_payload(START + 3600 + second)
+        archive.async_set_session("1", START + second, late=True)
+        archive.add(12, START + second, "800")
+        archive.async_end_payload(START + second)
+
+    current = archive.path
+    assert current == os.path.join(archive.directory, "2.tqa")
+    archive.async_flush_late()
+    assert list(archive._blocks) == [current]
+    await archive.async_close()
+
+    assert archive.blocks_written == 2
+    late = read_range(os.path.join(archive.directory, "1.tqa"), 0, 2 * START)
+    assert late == {12: [(START + second, 800.0) for second in range(3)]}
+    assert len(read_index(current)) == 1
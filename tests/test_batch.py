@@ -0,0 +1,166 @@
+"""Test the batch ingest endpoint."""
+
+from __future__ import annotations
+
+import json
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from custom_components.torque.batch import TorqueBatchView, parse_batch
+from custom_components.torque.const import DATA_VIEWS
+from custom_components.torque.history import VehicleHistory
+from custom_components.torque.sensor import TorqueReceiveDataView
+
+EMAIL = "test@example.com"
+
+
+def _add_entities(sensors):
+    for sensor in sensors:
+        sensor.async_write_ha_state = Mock()
+
+
+def _view(email: str = EMAIL) -> TorqueReceiveDataView:
+    return TorqueReceiveDataView(
+        email=email,
+        vehicle="Test Car",
+        sensors={},
+        async_add_entities=Mock(side_effect=_add_entities),
+        config_entry=None,
+        history=VehicleHistory(600),
+    )
+
+
+def _upload(second: float, rpm: int, email: str = EMAIL) -> dict[str, str]:
+    return {
+        "eml": email,
+        "session": "1",
+        "time": str(int(second * 1000)),
+        "userFullName0c": "Engine RPM",
+        "userUnit0c": "rpm",
+        "k0c": str(rpm),
+    }
+
+
+def _request(body: str, **query: str) -> Mock:
+    request = Mock()
+    request.read = AsyncMock(return_value=body.encode())
+    request.query = query
+    return request
+
+
+def test_parse_batch_json_and_ndjson():
+    """Test both body formats give the same uploads."""
+    uploads = [{"eml": EMAIL, "k0c": 800}, {"eml": EMAIL, "k0c": "900", "v": None}]
+    expected = [{"eml": EMAIL, "k0c": "800"}, {"eml": EMAIL, "k0c": "900"}]
+
+    assert parse_batch(json.dumps(uploads)) == expected
+    assert parse_batch("\n".join(map(json.dumps, uploads)) + "\n") == expected
+    assert parse_batch('[{"eml": "x"}, 5]') == [{"eml": "x"}, None]
+    assert parse_batch("") == []
+    with pytest.raises(ValueError):
+        parse_batch("[{")
+
+
+async def test_batch_writes_newest_value_once():
+    """Test a batch records every sample but writes state once per sensor."""
+    view = _view()
+    now = time.time()
+    await view._handle_data(_upload(now, 700))
+    sensor = view.sensors[12]
+    sensor.async_write_ha_state.reset_mock()
+
+    # Past the minimum interval after the value the sensor was created with
+    statuses = await view.async_handle_batch(
+        [_upload(now + 20 + second, 800 + 100 * second) for second in range(10)]
+    )
+
+    assert statuses == [200] * 10
+    assert sensor._attr_native_value == 1700
+    assert sensor.async_write_ha_state.call_count == 1
+    assert len(view.history.rings[12].samples()) == 10
+    assert view.metrics.requests == 11
+
+
+async def test_batch_creates_sensors_once():
+    """Test sensors named in a batch are created in one metadata pass."""
+    view = _view()
+    now = time.time() - 20
+
+    statuses = await view.async_handle_batch(
+        [_upload(now + second, 800 + second) for second in range(5)]
+    )
+
+    assert statuses == [200] * 5
+    view.async_add_entities.assert_called_once()
+    assert view.sensors[12]._attr_native_value == 804
+
+
+async def test_batch_reports_rejected_uploads():
+    """Test uploads failing validation get their own status."""
+    view = _view()
+    now = time.time() - 20
+    missing = _upload(now, 800)
+    del missing["eml"]
+
+    statuses = await view.async_handle_batch(
+        [missing, _upload(now + 1, 900, email="other@example.com"), _upload(now, 1)]
+    )
+
+    assert statuses == [400, 403, 200]
+    assert view.sensors[12]._attr_native_value == 1
+
+
+async def test_batch_view_routes_by_email():
+    """Test uploads are routed to the vehicle configured with their email."""
+    first, second = _view(), _view("other@example.com")
+    hass = Mock()
+    hass.data = {DATA_VIEWS: {"one": first, "two": second}}
+    now = time.time() - 20
+    body = "\n".join(
+        json.dumps(upload)
+        for upload in (
+            _upload(now, 800),
+            _upload(now, 900, email="other@example.com"),
+            _upload(now, 1000, email="nobody@example.com"),
+            [],
+        )
+    )
+
+    response = await TorqueBatchView(hass).post(_request(body))
+
+    assert json.loads(response.body) == {
+        "accepted": 2,
+        "rejected": 2,
+        "results": [200, 200, 404, 400],
+    }
+    assert first.sensors[12]._attr_native_value == 800
+    assert second.sensors[12]._attr_native_value == 900
+    assert first.metrics.bytes_received == len(body.encode()) // 4
+
+
+async def test_batch_view_entry_id_and_shared_email():
+    """Test vehicles sharing an email address are told apart by entry_id."""
+    first, second = _view(), _view()
+    hass = Mock()
+    hass.data = {DATA_VIEWS: {"one": first, "two": second}}
+    body = json.dumps([_upload(time.time() - 20, 800)])
+
+    response = await TorqueBatchView(hass).post(_request(body))
+    assert json.loads(response.body)["results"] == [409]
+
+    response = await TorqueBatchView(hass).post(_request(body, entry_id="two"))
+    assert json.loads(response.body)["results"] == [200]
+    assert 12 in second.sensors
+    assert 12 not in first.sensors
+
+    response = await TorqueBatchView(hass).post(_request(body, entry_id="three"))
+    assert json.loads(response.body)["results"] == [404]
+
+
+async def test_batch_view_rejects_invalid_body():
+    """Test a body that is not JSON is refused as a whole."""
+    response = await TorqueBatchView(Mock()).post(_request("eml=x&k0c=1"))
+
+    assert response.status == 400
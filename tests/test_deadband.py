@@ -0,0 +1,51 @@
+"""Test the adaptive deadband."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.torque.deadband import AdaptiveDeadband
+
+
+def _learn(deadband: AdaptiveDeadband, values: list[float]) -> AdaptiveDeadband:
+    for value in values:
+        deadband.add(value)
+    return deadband
+
+
+def test_static_threshold_until_warmed_up():
+    """Test the static threshold applies until enough deltas were seen."""
+    deadband = _learn(AdaptiveDeadband(0.1), [0.45, 0.46] * 5)
+
+    assert deadband.samples == 9
+    assert deadband.threshold == 0.1
+
+
+def test_threshold_follows_noise():
+    """Test the deadband is a multiple of the typical sample-to-sample change."""
+    deadband = _learn(AdaptiveDeadband(0.1), [0.40, 0.42] * 20)
+
+    assert deadband.noise == pytest.approx(0.02)
+    assert deadband.threshold == pytest.approx(0.06)
+
+
+def test_threshold_is_clamped():
+    """Test frozen and erratic PIDs stay within range of the static threshold."""
+    frozen = _learn(AdaptiveDeadband(1.0), [5.0] * 30)
+    erratic = _learn(AdaptiveDeadband(1.0), [0.0, 100.0] * 15)
+
+    assert frozen.threshold == pytest.approx(0.1)
+    assert erratic.threshold == pytest.approx(10.0)
+
+
+def test_restore_estimate():
+    """Test a stored estimate is restored and malformed data is ignored."""
+    learned = _learn(AdaptiveDeadband(0.1), [0.40, 0.42] * 20)
+    restored = AdaptiveDeadband(0.1)
+    restored.restore(learned.as_dict())
+
+    assert restored.threshold == learned.threshold
+
+    restored.restore({"noise": "bad"})
+    restored.restore(None)
+    assert restored.noise == learned.noise
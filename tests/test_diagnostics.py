@@ -0,0 +1,104 @@
+"""Test the Torque diagnostics."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, Mock
+
+from custom_components.torque.const import DATA_VIEWS, DIAGNOSTICS_PAYLOAD_BYTES
+from custom_components.torque.diagnostics import (
+    REDACTED,
+    PayloadRing,
+    async_get_config_entry_diagnostics,
+)
+from custom_components.torque.sensor import TorqueReceiveDataView, TorqueSensor
+
+
+def test_payload_ring_is_bounded_and_redacted():
+    """Test only the last uploads are kept, without the email."""
+    ring = PayloadRing(2)
+
+    for index in range(5):
+        ring.append({"eml": "test@example.com", "k29": str(index)}, now=index)
+
+    assert len(ring) == 2
+    assert ring.as_list() == [
+        {"received": 3, "truncated": False, "data": {"eml": REDACTED, "k29": "3"}},
+        {"received": 4, "truncated": False, "data": {"eml": REDACTED, "k29": "4"}},
+    ]
+
+
+def test_payload_ring_redacts_location():
+    """Test GPS position and device id are not disclosed."""
+    ring = PayloadRing(1)
+
+    ring.append({"id": "abc", "kff1006": "50.1", "kff1005": "8.7", "kd": "42"})
+
+    assert ring.as_list()[0]["data"] == {
+        "id": REDACTED,
+        "kff1006": REDACTED,
+        "kff1005": REDACTED,
+        "kd": "42",
+    }
+
+
+def test_payload_ring_truncates_large_uploads():
+    """Test oversized uploads are capped."""
+    ring = PayloadRing(1)
+
+    ring.append({"k29": "1" * 10 * DIAGNOSTICS_PAYLOAD_BYTES})
+
+    assert ring.as_list()[0]["truncated"] is True
+    assert len(ring._payloads[0][1]) == DIAGNOSTICS_PAYLOAD_BYTES
+
+
+async def test_config_entry_diagnostics():
+    """Test the diagnostics of a loaded vehicle."""
+    config_entry = Mock()
+    config_entry.entry_id = "test_entry_id"
+    config_entry.data = {"email": "test@example.com", "name": "Test Car"}
+    config_entry.options = {"hide_pids": "43, 42", "rename_map": "41:Load"}
+
+    view = TorqueReceiveDataView(
+        email="test@example.com",
+        vehicle="Test Car",
+        sensors={},
+        async_add_entities=AsyncMock(),
+        config_entry=config_entry,
+    )
+    sensor = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+    sensor.async_write_ha_state = Mock()
+    view.sensors[41] = sensor
+    await view._handle_data({"eml": "test@example.com", "k29": "45.5"})
+    await view._handle_data({"eml": "other@example.com", "k29": "50"})
+
+    hass = Mock()
+    hass.data = {DATA_VIEWS: {"test_entry_id": view}}
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["entry"]["data"] == {"email": REDACTED, "name": "Test Car"}
+    assert diagnostics["options"]["hidden_pids"] == [42, 43]
+    assert diagnostics["options"]["rename_map"] == {41: "Load"}
+    assert diagnostics["counters"]["requests"] == 1
+    assert diagnostics["counters"]["values_written"] == 1
+    assert diagnostics["timings"]["parse"]["count"] == 1
+    assert diagnostics["sensors"][0]["pid"] == 41
+    assert diagnostics["sensors"][0]["value"] == 45.5
+    assert diagnostics["sensors"][0]["throttled_for"] > 0
+    # Uploads of other senders are not kept
+    assert [payload["data"] for payload in diagnostics["recent_payloads"]] == [
+        {"eml": REDACTED, "k29": "45.5"}
+    ]
+
+
+async def test_config_entry_diagnostics_not_loaded():
+    """Test the diagnostics of an entry whose platform is not set up."""
+    config_entry = Mock()
+    config_entry.entry_id = "test_entry_id"
+    config_entry.data = {"email": "test@example.com"}
+    config_entry.options = {}
+
+    hass = Mock()
+    hass.data = {}
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics == {"entry": {"data": {"email": REDACTED}, "options": {}}}
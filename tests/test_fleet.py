@@ -0,0 +1,128 @@
+"""Test fleet mode: per-vehicle shards and idle eviction."""
+
+from __future__ import annotations
+
+import tracemalloc
+from unittest.mock import Mock, patch
+
+from custom_components.torque.const import CONF_IDLE_EVICTION
+from custom_components.torque.fleet import ShardStore, VehicleShard
+from custom_components.torque.history import VehicleHistory
+from custom_components.torque.sensor import TorqueReceiveDataView
+
+CONFIGURED = 1000
+ACTIVE = 50
+UPLOADS = 60
+# Sensors, history rings and ingest state of an active vehicle
+MAX_KIB_PER_ACTIVE = 256
+PIDS = ("0c", "0d", "05", "10", "2f")
+
+
+def _add_entities(sensors):
+    for sensor in sensors:
+        sensor.async_write_ha_state = Mock()
+
+
+def _view(index: int, shards: ShardStore | None = None) -> TorqueReceiveDataView:
+    entry = Mock(entry_id=f"entry{index}", options={CONF_IDLE_EVICTION: 300})
+    return TorqueReceiveDataView(
+        email="test@example.com",
+        vehicle=f"Car {index}",
+        sensors={},
+        async_add_entities=Mock(side_effect=_add_entities),
+        config_entry=entry,
+        history=VehicleHistory(600),
+        shards=shards,
+    )
+
+
+def _upload(second: int) -> dict[str, str]:
+    data = {"eml": "test@example.com", "session": "1760720540354"}
+    for pid in PIDS:
+        data[f"userFullName{pid}"] = f"PID {pid}"
+        data[f"userUnit{pid}"] = "%"
+        data[f"k{pid}"] = str(second + int(pid, 16))
+    return data
+
+
+def test_shard_compact_roundtrip():
+    """Test an evicted shard keeps its session and units only."""
+    shard = VehicleShard()
+    shard.session = "1760720540354"
+    shard.fingerprint = 1234
+    shard.units = {12: "rpm", 13: "km/h"}
+
+    restored = VehicleShard(shard.as_compact())
+
+    assert restored.session == "1760720540354"
+    assert restored.units == {12: "rpm", 13: "km/h"}
+    assert restored.fingerprint is None
+    assert VehicleShard({"units": "broken"}).units == {}
+
+
+def test_shard_store_pop_and_put():
+    """Test compact states are taken once and saved on every change."""
+    with patch("custom_components.torque.fleet.Store") as store:
+        shards = ShardStore(Mock())
+    shards.async_put("entry1", {"session": "1", "units": {}})
+
+    assert len(shards) == 1
+    assert shards.async_pop("entry1") == {"session": "1", "units": {}}
+    assert shards.async_pop("entry1") is None
+    assert store.return_value.async_delay_save.call_count == 2
+
+
+async def test_evicted_vehicle_resumes_from_compact_state():
+    """Test an evicted vehicle is picked up again by its next upload."""
+    with patch("custom_components.torque.fleet.Store"):
+        shards = ShardStore(Mock())
+    view = _view(0, shards)
+    await view._handle_data(_upload(0))
+    await view._handle_data(_upload(1))
+    assert view.history.rings
+
+    view.async_evict()
+
+    assert view.shard is None
+    assert not view.history.rings
+    assert len(shards) == 1
+
+    data = _upload(2)
+    for pid in PIDS:
+        del data[f"userUnit{pid}"]
+    await view._handle_data(data)
+
+    assert view.shard is not None
+    assert view.shard.units[12] == "%"
+    assert len(shards) == 0
+    assert view.history.rings[12].samples()[-1][1] == 14.0
+
+
+async def test_fleet_memory_follows_active_vehicles():
+    """Benchmark 1,000 configured vehicles of which 50 upload."""
+    with patch("custom_components.torque.fleet.Store"):
+        shards = ShardStore(Mock())
+    tracemalloc.start()
+    try:
+        views = [_view(index, shards) for index in range(CONFIGURED)]
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        for second in range(UPLOADS):
+            for view in views[:ACTIVE]:
+                await view._handle_data(_upload(second))
+        active = tracemalloc.get_traced_memory()[0]
+        resident = sum(view.shard is not None for view in views)
+        with_history = sum(bool(view.history.rings) for view in views)
+
+        for view in views[:ACTIVE]:
+            view.async_evict()
+        evicted = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert (active - baseline) / ACTIVE / 1024 < MAX_KIB_PER_ACTIVE
+    assert resident == with_history == ACTIVE
+    assert all(view.shard is None and not view.history.rings for view in views)
+    assert len(shards) == ACTIVE
+    # Idle vehicles never allocated ingest state or history
+    assert evicted - baseline < (active - baseline) / 2
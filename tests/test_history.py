@@ -0,0 +1,48 @@
+"""Test the in-memory sample history."""
+
+from __future__ import annotations
+
+from custom_components.torque.history import SampleRing, VehicleHistory
+from custom_components.torque.sensor import TorqueSensor
+
+
+def test_ring_keeps_newest_samples_in_order():
+    """Test a full ring overwrites its oldest samples."""
+    ring = SampleRing(3)
+    for second in range(5):
+        ring.append(float(second), second * 10.0)
+
+    assert len(ring) == 3
+    assert ring.samples() == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert ring.samples(since=3.0) == [(3.0, 30.0), (4.0, 40.0)]
+
+
+def test_downsample_min_max():
+    """Test buckets hold the extremes of their samples."""
+    ring = SampleRing(10)
+    for second, value in enumerate((1.0, 5.0, 3.0, 2.0, 8.0, 4.0)):
+        ring.append(float(second), value)
+
+    assert ring.downsample(2) == [(0.0, 1.0, 5.0), (2.5, 2.0, 8.0)]
+    assert ring.downsample(100, since=5.0) == [(5.0, 4.0, 4.0)]
+    assert SampleRing(4).downsample(10) == []
+
+
+def test_history_disabled():
+    """Test a capacity of 0 keeps no rings."""
+    assert VehicleHistory(0).ring(12) is None
+
+
+def test_sensor_records_throttled_samples():
+    """Test samples are kept whether or not they reach the state machine."""
+    history = VehicleHistory(10)
+    sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {}, history=history)
+    sensor.hass = None
+    sensor.async_write_ha_state = lambda: None
+
+    sensor.async_on_update("1000", 100.0)
+    sensor.async_on_update("1010", 101.0)
+    sensor.async_on_update("n/a", 102.0)
+    sensor.async_on_update("990", 99.0)
+
+    assert history.rings[12].samples() == [(100.0, 1000.0), (101.0, 1010.0)]
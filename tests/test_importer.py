@@ -0,0 +1,100 @@
+"""Test the Torque trip log importer."""
+
+from __future__ import annotations
+
+from datetime import timezone
+
+import pytest
+
+from custom_components.torque.importer import (
+    HourlyAggregator,
+    TripLogReader,
+    match_log_columns,
+    parse_log_header,
+    parse_log_time,
+)
+from custom_components.torque.sensor import TorqueSensor
+
+TRIP_LOG = """GPS Time, Device Time, Longitude, Engine RPM(rpm),Engine Coolant Temperature(°C)
+x,18-Oct-2025 10:59:58.000,1.0,800,80
+x,18-Oct-2025 10:59:59.000,1.0,1000,-
+x,18-Oct-2025 11:00:01.000,1.0,2000,82
+x,18-Oct-2025 11:30:00.000,1.0,3000,84
+"""
+
+
+def test_parse_log_header():
+    """Test column headers are split into name and unit."""
+    assert parse_log_header(" Engine RPM(rpm)") == ("Engine RPM", "rpm")
+    assert parse_log_header("Fuel Level (From Engine ECU)(%)") == (
+        "Fuel Level (From Engine ECU)",
+        "%",
+    )
+    assert parse_log_header(" Device Time") == ("Device Time", None)
+
+
+def test_parse_log_time():
+    """Test device and epoch timestamps are parsed."""
+    assert parse_log_time("01-Jan-2025 00:00:00.500", timezone.utc) == 1735689600.5
+    assert parse_log_time("1735689600500", timezone.utc) == 1735689600.5
+    assert parse_log_time("not a time", timezone.utc) is None
+
+
+def test_hourly_aggregator():
+    """Test samples are aggregated per hour and key."""
+    aggregator = HourlyAggregator()
+    aggregator.add(12, 3600.0, 1000.0)
+    aggregator.add(12, 3700.0, 3000.0)
+    aggregator.add(12, 7300.0, 500.0)
+
+    assert aggregator.pop_before(7200.0) == {12: [(3600.0, 2000.0, 1000.0, 3000.0)]}
+    assert len(aggregator) == 1
+    assert aggregator.pop_before() == {12: [(7200.0, 500.0, 500.0, 500.0)]}
+
+
+def test_trip_log_reader_streams_chunks(tmp_path):
+    """Test the reader emits hours as soon as they are complete."""
+    path = tmp_path / "trackLog.csv"
+    path.write_text(TRIP_LOG, encoding="utf-8")
+    reader = TripLogReader(str(path), timezone.utc)
+
+    columns = reader.open()
+    assert columns[3] == ("Engine RPM", "rpm")
+    reader.select({3: 12, 4: 5})
+
+    hourly, done = reader.read_chunk(max_rows=3)
+    assert done is False
+    assert hourly[12] == [(1760781600.0, 900.0, 800.0, 1000.0)]
+    assert hourly[5] == [(1760781600.0, 80.0, 80.0, 80.0)]
+
+    hourly, done = reader.read_chunk(max_rows=3)
+    assert done is True
+    assert hourly[12] == [(1760785200.0, 2500.0, 2000.0, 3000.0)]
+    reader.close()
+
+
+def test_match_log_columns():
+    """Test columns are matched to sensors by name and unit."""
+    sensors = {
+        12: TorqueSensor("Engine RPM", "rpm", 12, "Test", {}),
+        5: TorqueSensor("Engine Coolant Temperature", "°F", 5, "Test", {}),
+    }
+    columns = [
+        ("Device Time", None),
+        ("engine rpm", "rpm"),
+        ("Engine Coolant Temperature", "°C"),
+    ]
+
+    assert match_log_columns(columns, sensors) == {1: 12}
+
+
+def test_trip_log_reader_closes_file_without_time_column(tmp_path):
+    """Test the file is closed when its header cannot be imported."""
+    path = tmp_path / "trackLog.csv"
+    path.write_text("Engine RPM(rpm)\n800\n", encoding="utf-8")
+    reader = TripLogReader(str(path), timezone.utc)
+
+    with pytest.raises(ValueError):
+        reader.open()
+
+    assert reader._file is None
@@ -1,7 +1,7 @@
 """Test the Torque integration setup."""
 from __future__ import annotations
 
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -11,7 +11,7 @@ from custom_components.torque import (
     async_setup_entry,
     async_unload_entry,
 )
-from custom_components.torque.const import DOMAIN
+from custom_components.torque.const import DATA_METRICS_OWNER, DATA_VIEWS, DOMAIN
 
 
 async def test_async_setup(hass: HomeAssistant) -> None:
@@ -53,6 +53,25 @@ async def test_async_unload_entry(hass: HomeAssistant, mock_config_entry: Config
         assert mock_unload.called
 
 
+async def test_unload_hands_fleet_metrics_to_next_entry(
+    hass: HomeAssistant, mock_config_entry: ConfigEntry
+) -> None:
+    """Test the integration-wide metric sensors move to a loaded entry."""
+    hass.data[DOMAIN] = {mock_config_entry.entry_id: mock_config_entry.data}
+    other = Mock()
+    hass.data[DATA_VIEWS] = {mock_config_entry.entry_id: Mock(), "other": other}
+    hass.data[DATA_METRICS_OWNER] = mock_config_entry.entry_id
+
+    with patch(
+        "homeassistant.config_entries.ConfigEntries.async_unload_platforms",
+        return_value=True,
+    ):
+        assert await async_unload_entry(hass, mock_config_entry)
+
+    assert hass.data[DATA_METRICS_OWNER] == "other"
+    other.async_add_fleet_metric_sensors.assert_called_once()
+
+
 async def test_async_unload_entry_failed(hass: HomeAssistant, mock_config_entry: ConfigEntry) -> None:
     """Test failed unloading of config entry."""
     hass.data[DOMAIN] = {mock_config_entry.entry_id: mock_config_entry.data}
@@ -0,0 +1,81 @@
+"""Test the Torque performance counters."""
+
+from __future__ import annotations
+
+from custom_components.torque.const import UPDATE_THROTTLED, UPDATE_WRITTEN
+from custom_components.torque.metrics import (
+    LatencyHistogram,
+    TorqueMetrics,
+    metrics_snapshot,
+    render_metrics,
+)
+
+
+def test_latency_histogram_percentiles():
+    """Test percentiles are resolved to power-of-two bucket bounds."""
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(0.0001)  # 100 us
+    for _ in range(10):
+        histogram.record(0.01)  # 10 ms
+
+    assert histogram.count == 100
+    assert histogram.percentile(0.5) == 0.128
+    assert histogram.percentile(0.95) == 16.384
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_latency_histogram_is_bounded():
+    """Test very slow requests land in the last bucket."""
+    histogram = LatencyHistogram()
+    histogram.record(3600.0)
+
+    assert len(histogram.counts) == len(LatencyHistogram().counts)
+    assert histogram.counts[-1] == 1
+
+
+def test_snapshot_combines_vehicles():
+    """Test snapshots sum counters and merge latency across vehicles."""
+    first = TorqueMetrics()
+    second = TorqueMetrics()
+    for metrics, requests in ((first, 30), (second, 90)):
+        metrics.requests += requests
+        metrics.keys += requests * 20
+        metrics.updates[UPDATE_WRITTEN] += requests
+        metrics.updates[UPDATE_THROTTLED] += 1
+        metrics.parse_latency.record(0.001)
+        metrics.roll(now=metrics._rolled_at + 60)
+
+    snapshot = metrics_snapshot([first, second])
+
+    assert snapshot["request_rate"] == 2.0
+    assert snapshot["keys_per_payload"] == 20.0
+    assert snapshot["values_accepted"] == 120
+    assert snapshot["values_throttled"] == 2
+    assert snapshot["parse_latency_p50"] == 1.024
+
+
+def test_render_metrics_exposition():
+    """Test counters are rendered per vehicle in the text exposition format."""
+    metrics = TorqueMetrics()
+    metrics.requests = 3
+    metrics.bytes_received = 512
+    metrics.updates[UPDATE_WRITTEN] = 7
+    metrics.parse_latency.record(0.0001)
+    metrics.roll()
+    metrics.parse_latency.record(0.0001)
+
+    body = render_metrics([('My "Car"', metrics, 4)])
+
+    assert "# TYPE torque_requests_total counter" in body
+    assert "# TYPE torque_parse_duration_seconds histogram" in body
+    assert 'torque_requests_total{vehicle="My \\"Car\\""} 3' in body
+    assert 'torque_received_bytes_total{vehicle="My \\"Car\\""} 512' in body
+    assert 'torque_values_written_total{vehicle="My \\"Car\\""} 7' in body
+    assert 'torque_entities{vehicle="My \\"Car\\""} 4' in body
+    # Rolled and current windows are both counted
+    assert (
+        'torque_parse_duration_seconds_bucket{vehicle="My \\"Car\\"",le="+Inf"} 2'
+        in body
+    )
+    assert body.endswith("\n")
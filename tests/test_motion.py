@@ -0,0 +1,56 @@
+"""Test the vehicle motion state."""
+
+from __future__ import annotations
+
+from custom_components.torque.motion import (
+    MOTION_POLICIES,
+    VehicleMotion,
+    classify_motion,
+)
+
+
+def test_classify_motion():
+    """Test speed and RPM values map to a motion state."""
+    assert classify_motion({"kd": "42", "kc": "1800"}) == "driving"
+    assert classify_motion({"kd": "0", "kff1001": "12.5"}) == "driving"
+    assert classify_motion({"kd": "0", "kc": "750"}) == "idling"
+    assert classify_motion({"kd": "0", "kc": "0"}) == "parked"
+    assert classify_motion({"kd": "-", "kc": "0"}) == "parked"
+    assert classify_motion({"k5": "90"}) is None
+
+
+def test_more_active_state_applies_at_once():
+    """Test a departing vehicle switches to the driving policy immediately."""
+    motion = VehicleMotion()
+    motion.update({"kd": "0", "kc": "0"}, 0.0)
+    motion.update({"kd": "0", "kc": "0"}, 60.0)
+    assert motion.state == "parked"
+
+    assert motion.update({"kd": "20"}, 61.0) is True
+    assert motion.state == "driving"
+    assert motion.policy is MOTION_POLICIES["driving"]
+
+
+def test_calmer_state_waits_to_settle():
+    """Test a short stop keeps the driving policy."""
+    motion = VehicleMotion()
+
+    assert motion.update({"kd": "0", "kc": "800"}, 0.0) is False
+    assert motion.update({"kd": "0", "kc": "800"}, 30.0) is False
+    assert motion.update({"kd": "15", "kc": "1500"}, 40.0) is False
+    assert motion.update({"kd": "0", "kc": "800"}, 50.0) is False
+    assert motion.state == "driving"
+
+    assert motion.update({"kd": "0", "kc": "800"}, 110.0) is True
+    assert motion.state == "idling"
+    assert motion.policy is MOTION_POLICIES["idling"]
+
+
+def test_upload_without_motion_keys_keeps_state():
+    """Test uploads without speed or RPM leave the state untouched."""
+    motion = VehicleMotion()
+    motion.update({"kd": "0", "kc": "0"}, 0.0)
+
+    assert motion.update({"k5": "90"}, 100.0) is False
+    assert motion.update({"kd": "0", "kc": "0"}, 100.0) is True
+    assert motion.state == "parked"
@@ -0,0 +1,40 @@
+"""Test the pending value buffer."""
+
+from __future__ import annotations
+
+from custom_components.torque.pending import PendingValueBuffer
+
+
+def test_keeps_latest_value_per_pid():
+    """Test only the latest value for a PID is kept."""
+    buffer = PendingValueBuffer(max_size=4, ttl=60)
+
+    buffer.put(41, "10.0", 1000.0, now=0.0)
+    buffer.put(41, "12.5", 1001.0, now=1.0)
+
+    assert len(buffer) == 1
+    assert buffer.pop(41, now=2.0) == ("12.5", 1001.0)
+    assert buffer.pop(41, now=2.0) is None
+
+
+def test_size_is_bounded():
+    """Test random PIDs cannot grow the buffer past its size."""
+    buffer = PendingValueBuffer(max_size=4, ttl=60)
+
+    for pid in range(100):
+        buffer.put(pid, "1.0", 1000.0, now=float(pid) / 100)
+
+    assert len(buffer) == 4
+    assert buffer.pop(0) is None
+    assert buffer.pop(99, now=1.0) == ("1.0", 1000.0)
+
+
+def test_expired_values_are_evicted():
+    """Test values older than the TTL are discarded."""
+    buffer = PendingValueBuffer(max_size=4, ttl=60)
+
+    buffer.put(41, "10.0", 1000.0, now=0.0)
+    buffer.put(42, "20.0", 1000.0, now=100.0)
+
+    assert len(buffer) == 1
+    assert buffer.pop(42, now=200.0) is None
@@ -0,0 +1,55 @@
+"""Test the PID catalog."""
+
+from __future__ import annotations
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from custom_components.torque.pids import PID_CATALOG, guess_pid_info, lookup_pid
+
+
+def test_catalog_pid_in_canonical_unit():
+    """Test catalog PIDs resolve regardless of the sensor name."""
+    info = lookup_pid(0x05, "Temp. liquide de refroidissement", "°C")
+
+    assert info is PID_CATALOG[0x05]
+    assert info.device_class == SensorDeviceClass.TEMPERATURE
+    assert info.icon == "mdi:coolant-temperature"
+    assert info.significant_change == 0.5
+    assert info.precision == 0
+
+
+def test_torque_extended_pid():
+    """Test Torque's own ff1xxx PIDs are in the catalog."""
+    info = lookup_pid(0xFF1001, "Speed (GPS)", "km/h")
+
+    assert info.device_class == SensorDeviceClass.SPEED
+    assert info.icon == "mdi:speedometer"
+
+
+def test_catalog_pid_in_other_unit_falls_back_to_name():
+    """Test a PID reported in a user-selected unit gets no device class."""
+    info = lookup_pid(0x0D, "Vehicle Speed", "mph")
+
+    assert info.device_class is None
+    assert info.icon == "mdi:speedometer"
+    assert info.significant_change == 1.0
+    assert info.precision == 2
+
+
+def test_guess_from_name_keywords():
+    """Test name keywords resolve icon and threshold outside the catalog."""
+    ford = guess_pid_info("[FORD]Transmission Temp", "°F")
+    assert ford.icon == "mdi:thermometer"
+    assert ford.significant_change == 0.5
+
+    voltage = guess_pid_info("Battery Voltage", "V")
+    assert voltage.icon == "mdi:car-battery"
+    assert voltage.significant_change == 0.1
+
+    boost = guess_pid_info("Boost Pressure", "psi")
+    assert boost.icon is None
+    assert boost.significant_change == 1.0
+
+    unknown = guess_pid_info(None, None)
+    assert unknown.icon is None
+    assert unknown.significant_change == 0.1
@@ -0,0 +1,69 @@
+"""Test the on-demand ingest profiler."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+from unittest.mock import Mock
+
+from custom_components.torque.profiler import IngestProfiler, summarize_stats
+from custom_components.torque.sensor import TorqueReceiveDataView
+
+
+def _busy() -> int:
+    return sum(range(10_000))
+
+
+def test_summarize_stats_lists_slowest_functions():
+    """Test the summary lists functions by own time with their location."""
+    profile = cProfile.Profile()
+    profile.enable()
+    _busy()
+    profile.disable()
+
+    summary = summarize_stats(pstats.Stats(profile), top=3)
+
+    assert 0 < len(summary) <= 3
+    assert any("_busy (test_profiler.py:" in line for line in summary)
+    assert all(line.endswith(" calls") for line in summary)
+
+
+def test_profiler_stops_after_request_limit():
+    """Test the profiler asks to finish once the request limit is reached."""
+    profiler = IngestProfiler(Mock(), Mock(), duration=60, max_requests=2)
+
+    profiler.enable()
+    assert profiler.disable() is False
+    profiler.enable()
+    assert profiler.disable() is True
+    assert profiler.requests == 2
+
+
+def test_profiler_without_request_limit():
+    """Test the profiler only stops on its timer without a request limit."""
+    profiler = IngestProfiler(Mock(), Mock(), duration=60)
+
+    for _ in range(5):
+        profiler.enable()
+        assert profiler.disable() is False
+
+
+async def test_rejected_uploads_are_not_profiled():
+    """Test only uploads that pass the email check are profiled and counted."""
+    view = TorqueReceiveDataView(
+        email="test@example.com",
+        vehicle="Test Car",
+        sensors={},
+        async_add_entities=Mock(),
+        config_entry=None,
+    )
+    view.profiler = profiler = Mock()
+    profiler.disable.return_value = False
+
+    await view._handle_data({"eml": "other@example.com", "k29": "1"})
+    await view.async_handle_batch(
+        [{"eml": "other@example.com"}, {"eml": "test@example.com", "k29": "1"}]
+    )
+
+    profiler.enable.assert_called_once()
+    profiler.disable.assert_called_once_with(1)
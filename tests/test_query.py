@@ -0,0 +1,116 @@
+"""Test queries over archived sessions."""
+
+from __future__ import annotations
+
+import os
+from array import array
+
+import pytest
+
+from custom_components.torque.archive import append_block, read_range
+from custom_components.torque.history import downsample
+from custom_components.torque.query import (
+    QueryCache,
+    list_sessions,
+    query_pid,
+    trip_summary,
+)
+
+START = 1_700_000_000.0
+
+
+def _write_session(path: str, blocks: int = 3, seconds: int = 300) -> None:
+    for block in range(blocks):
+        offset = block * seconds
+        times = array("d", (START + offset + second for second in range(seconds)))
+        speeds = array("d", (float(second % 100) for second in range(seconds)))
+        rpms = array("d", [800.0 + block] * seconds)
+        append_block(path, {13: (times, speeds), 12: (times, rpms)})
+
+
+def test_trip_summary(tmp_path):
+    """Test a session is summarized across all blocks."""
+    path = str(tmp_path / "trip.tqa")
+    _write_session(path)
+
+    summary = trip_summary(path)
+
+    assert summary["start"] == START
+    assert summary["end"] == START + 899
+    assert summary["duration"] == 899
+    assert summary["blocks"] == 3
+    assert summary["samples"] == 1800
+    speed, rpm = summary["pids"][1], summary["pids"][0]
+    assert (rpm["pid"], rpm["min"], rpm["max"]) == (12, 800.0, 802.0)
+    assert rpm["mean"] == pytest.approx(801.0)
+    assert (speed["pid"], speed["samples"], speed["min"], speed["max"]) == (
+        13,
+        900,
+        0.0,
+        99.0,
+    )
+
+
+def test_query_pid_range(tmp_path):
+    """Test a PID query only reads the requested range and downsamples it."""
+    path = str(tmp_path / "trip.tqa")
+    _write_session(path)
+
+    result = query_pid(path, 12, START + 250, START + 349, 10)
+
+    assert result["pid"] == 12
+    assert result["samples"] == 100
+    assert len(result["points"]) == 10
+    assert result["points"][0][1:] == (800.0, 800.0)
+    assert result["points"][-1][1:] == (801.0, 801.0)
+
+
+def test_query_pid_matches_downsampled_range(tmp_path):
+    """Test streaming gives the buckets of downsampling the decoded range."""
+    path = str(tmp_path / "trip.tqa")
+    _write_session(path)
+
+    result = query_pid(path, 13, START, START + 899, 7)
+    samples = read_range(path, START, START + 899, {13})[13]
+
+    assert result["samples"] == len(samples) == 900
+    assert result["points"] == downsample(samples, 7)
+
+
+def test_query_pid_missing(tmp_path):
+    """Test a PID that was never archived returns no samples."""
+    path = str(tmp_path / "trip.tqa")
+    _write_session(path, blocks=1)
+
+    assert query_pid(path, 99, START, START + 300, 10) == {
+        "pid": 99,
+        "samples": 0,
+        "points": [],
+    }
+
+
+def test_list_sessions(tmp_path):
+    """Test sessions are listed oldest first and other files are ignored."""
+    for mtime, name in ((200, "b"), (100, "a")):
+        path = tmp_path / f"{name}.tqa"
+        path.write_bytes(b"")
+        os.utime(path, (mtime, mtime))
+    (tmp_path / "a.tqa.idx").write_bytes(b"")
+
+    assert list_sessions(str(tmp_path)) == ["a", "b"]
+    assert list_sessions(str(tmp_path / "missing")) == []
+
+
+def test_query_cache_evicts_least_recently_used():
+    """Test the cache keeps the most recently used results."""
+    cache = QueryCache(2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.put("c", {"value": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+    assert (cache.hits, cache.misses) == (3, 1)
@@ -0,0 +1,115 @@
+"""Test the integration-wide write budget."""
+
+from __future__ import annotations
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from custom_components.torque.const import UPDATE_THROTTLED, UPDATE_WRITTEN
+from custom_components.torque.scheduler import WriteScheduler
+from custom_components.torque.sensor import TorqueSensor
+
+
+@pytest.fixture
+def scheduler():
+    """Return a scheduler whose tick is driven by the test."""
+    with patch("custom_components.torque.scheduler.async_track_time_interval") as track:
+        scheduler = WriteScheduler(Mock())
+        scheduler.async_set_budget("entry", 1.0)
+        assert track.called
+        yield scheduler
+
+
+def _sensor(scheduler, name, unit, pid):
+    sensor = TorqueSensor(name, unit, pid, "Test Car", {}, scheduler=scheduler)
+    sensor.hass = Mock()
+    sensor.async_write_ha_state = Mock()
+    return sensor
+
+
+def test_no_budget_writes_immediately():
+    """Test sensors write directly while no budget is set."""
+    scheduler = WriteScheduler(Mock())
+    sensor = _sensor(scheduler, "Engine RPM", "rpm", 12)
+
+    assert sensor.async_on_update("1000") == UPDATE_WRITTEN
+    assert len(scheduler) == 0
+
+
+def test_budget_writes_most_significant_first(scheduler):
+    """Test each tick spends the budget on the largest relative change."""
+    rpm = _sensor(scheduler, "Engine RPM", "rpm", 12)
+    intake = _sensor(scheduler, "Intake Air Temperature", "°C", 15)
+    for sensor, value in ((rpm, 1000.0), (intake, 80.0)):
+        sensor.async_write_value(value, 0.0)
+        sensor.async_write_ha_state.reset_mock()
+
+    # 60 rpm is 1.2 deadbands, 5 °C is 10 deadbands
+    assert rpm.async_on_update("1060", 100.0) == UPDATE_THROTTLED
+    assert intake.async_on_update("85", 100.0) == UPDATE_THROTTLED
+    assert len(scheduler) == 2
+
+    scheduler._async_tick()
+    assert intake.native_value == 85.0
+    assert rpm.native_value == 1000.0
+    assert not rpm.async_write_ha_state.called
+
+    scheduler._async_tick()
+    assert rpm.native_value == 1060.0
+    assert scheduler.written == 2
+
+
+def test_budget_coalesces_to_latest_value(scheduler):
+    """Test only the newest queued value of a sensor is written."""
+    rpm = _sensor(scheduler, "Engine RPM", "rpm", 12)
+    rpm.async_write_value(1000.0, 0.0)
+
+    rpm.async_on_update("1100", 100.0)
+    rpm.async_on_update("1200", 101.0)
+    scheduler._async_tick()
+
+    assert rpm.native_value == 1200.0
+    assert scheduler.coalesced == 1
+    assert len(scheduler) == 0
+
+
+def test_critical_pid_spends_budget(scheduler):
+    """Test critical PIDs write at once only while the budget allows."""
+    voltage = _sensor(scheduler, "Control module voltage", "V", 0x42)
+    rpm = _sensor(scheduler, "Engine RPM", "rpm", 12)
+    rpm.async_write_value(1000.0, 0.0)
+    scheduler._async_tick()
+
+    assert voltage.async_on_update("12.4", 100.0) == UPDATE_WRITTEN
+    assert len(scheduler) == 0
+
+    # The budget of this tick is spent, so the next value waits for a tick
+    # but is written ahead of the other queued values
+    assert rpm.async_on_update("3000", 100.0) == UPDATE_THROTTLED
+    assert voltage.async_on_update("11.6", 101.0) == UPDATE_THROTTLED
+    scheduler._async_tick()
+
+    assert voltage.native_value == 11.6
+    assert rpm.native_value == 1000.0
+    assert scheduler.written == 2
+
+
+def test_removing_budget_releases_queue(scheduler):
+    """Test queued values are written once no budget applies."""
+    rpm = _sensor(scheduler, "Engine RPM", "rpm", 12)
+    rpm.async_on_update("1000", 100.0)
+
+    scheduler.async_remove_entry("entry")
+
+    assert scheduler.budget == 0
+    assert rpm.native_value == 1000.0
+    assert len(scheduler) == 0
+
+
+def test_lowest_budget_applies(scheduler):
+    """Test the lowest non-zero budget of all entries is used."""
+    scheduler.async_set_budget("other", 0.5)
+    scheduler.async_set_budget("unlimited", 0)
+
+    assert scheduler.budget == 0.5
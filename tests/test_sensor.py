@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import time
 from unittest.mock import AsyncMock, Mock, patch
+from urllib.parse import urlencode
 
 import pytest
 
 from custom_components.torque.const import DOMAIN
+from custom_components.torque.motion import VehicleMotion
 from custom_components.torque.sensor import (
+    METRIC_SENSORS,
+    TorqueMetricSensor,
     TorqueReceiveDataView,
     TorqueSensor,
     async_setup_entry,
@@ -154,15 +159,13 @@ class TestTorqueSensor:
         This tests the specific issue from PR #21 where sensor values would
         update and then flip-flop back to previous values.
         """
-        import time
-
         # RPM sensor should use 50.0 threshold
         sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {})
         sensor.async_write_ha_state = Mock()
 
         # Simulate the flip-flop scenario from the issue:
         # Time 0: Initial value 1001
-        start_time = time.monotonic()
+        start_time = time.time()
         sensor.async_on_update("1001")
         assert sensor._attr_native_value == 1001.0
 
@@ -193,13 +196,11 @@ class TestTorqueSensor:
 
     def test_rpm_sensor_accepts_significant_changes_only(self):
         """Test that RPM sensor only accepts changes >= 50 RPM threshold."""
-        import time
-
         sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {})
         sensor.async_write_ha_state = Mock()
 
         # Initial value
-        start_time = time.monotonic()
+        start_time = time.time()
         sensor.async_on_update("1000")
         assert sensor._attr_native_value == 1000.0
 
@@ -220,6 +221,137 @@ class TestTorqueSensor:
         sensor.async_on_update("1050")  # +50 RPM, at threshold
         assert sensor._attr_native_value == 1050.0
 
+    def test_critical_pid_skips_update_interval(self):
+        """Test critical PIDs are written at once on a large change only."""
+        sensor = TorqueSensor("Control module voltage", "V", 0x42, "Test", {})
+        sensor._last_reported_value = 12.6
+        sensor._last_update = 100.0
+
+        assert sensor._priority == "critical"
+        assert sensor._should_update_value(12.55, 101.0) is False
+        assert sensor._should_update_value(12.4, 101.0) is False
+        assert sensor._should_update_value(11.8, 101.0) is True
+        assert sensor._should_update_value(12.4, 116.0) is True
+
+    def test_bulk_pid_waits_for_heartbeat(self):
+        """Test bulk PIDs are only written on a heartbeat or a large change."""
+        sensor = TorqueSensor("Ambient air temp", "°C", 0x46, "Test", {})
+        sensor._last_reported_value = 20.0
+        sensor._last_update = 0.0
+
+        assert sensor._priority == "bulk"
+        assert sensor._should_update_value(21.0, 60.0) is False
+        assert sensor._should_update_value(26.0, 60.0) is True
+        assert sensor._should_update_value(21.0, 300.0) is True
+
+    def test_priority_from_options(self):
+        """Test options override the catalog priority class."""
+        options = {"critical_pids": "12", "bulk_pids": "5"}
+
+        rpm = TorqueSensor("Engine RPM", "rpm", 12, "Test", options)
+        coolant = TorqueSensor("Coolant Temperature", "°C", 5, "Test", options)
+        speed = TorqueSensor("Vehicle Speed", "km/h", 13, "Test", options)
+
+        assert rpm._priority == "critical"
+        assert coolant._priority == "bulk"
+        assert speed._priority == "normal"
+
+    def test_values_rounded_to_precision(self):
+        """Test values are quantized to the PID's precision on arrival."""
+        latitude = TorqueSensor("GPS Latitude", "°", 0xFF1006, "Test", {})
+        voltage = TorqueSensor(
+            "O2 Sensor Voltage", "V", 0x14, "Test", {"precision_map": "20:3,x:1"}
+        )
+        unknown = TorqueSensor("Unknown Sensor", "unit", 99, "Test", {})
+        for sensor in (latitude, voltage, unknown):
+            sensor.async_write_ha_state = Mock()
+
+        latitude.async_on_update("-77.92161114513874")
+        voltage.async_on_update("0.42516")
+        unknown.async_on_update("-77.92161114513874")
+
+        assert latitude.native_value == -77.921611
+        assert voltage.native_value == 0.425
+        assert voltage.suggested_display_precision == 3
+        assert unknown.native_value == -77.92
+
+    def test_unchanged_state_not_written(self):
+        """Test writes that would not change the shown state are skipped."""
+        sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {})
+        sensor.async_write_ha_state = Mock()
+
+        assert sensor.async_write_value(1000.0, 0.0) is True
+        assert sensor.async_write_value(1000.0, 20.0) is False
+        assert sensor._last_update == 20.0
+        sensor.async_mark_unavailable()
+        sensor.async_mark_unavailable()
+        assert sensor.async_write_value(1000.0, 40.0) is True
+
+        assert sensor.async_write_ha_state.call_count == 3
+
+    def test_adaptive_deadband_option(self):
+        """Test the learned noise replaces the static threshold when enabled."""
+        sensor = TorqueSensor(
+            "O2 Sensor Voltage", "V", 0x14, "Test", {"adaptive_deadband": True}
+        )
+        for value in (0.40, 0.42) * 20:
+            sensor._deadband.add(value)
+
+        assert sensor._get_significant_change_threshold() == pytest.approx(0.06)
+
+        static = TorqueSensor("O2 Sensor Voltage", "V", 0x14, "Test", {})
+        assert static._get_significant_change_threshold() == 0.1
+
+    def test_percentiles_from_every_sample(self):
+        """Test percentile attributes cover throttled samples too."""
+        sensor = TorqueSensor(
+            "Engine RPM", "rpm", 12, "Test", {"percentile_pids": "12"}
+        )
+        sensor.async_write_ha_state = Mock()
+        start = 1_700_000_000.0
+        for second in range(100):
+            sensor.async_on_update(str(1000 + second), start + second)
+
+        attributes = sensor.extra_state_attributes
+        assert sensor.async_write_ha_state.call_count < 10
+        assert attributes["session_p50"] == 1049
+        assert attributes["session_p95"] == 1094
+        assert attributes["session_max"] == 1099
+        assert attributes["day_max"] == 1099
+
+        sensor.async_set_session("next")
+        assert sensor.extra_state_attributes["session_p50"] is None
+        assert sensor.extra_state_attributes["day_p50"] == 1049
+
+        plain = TorqueSensor("Engine RPM", "rpm", 12, "Test", {})
+        assert plain.extra_state_attributes is None
+
+    def test_parked_policy_widens_throttle(self):
+        """Test a parked vehicle writes less often and needs larger changes."""
+        motion = VehicleMotion()
+        sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {}, motion=motion)
+        sensor._last_reported_value = 1000.0
+        sensor._last_update = 0.0
+        assert sensor._should_update_value(1100.0, 20.0) is True
+
+        motion.update({"kd": "0", "kc": "0"}, 0.0)
+        motion.update({"kd": "0", "kc": "0"}, 60.0)
+        assert motion.state == "parked"
+        assert sensor._should_update_value(1100.0, 20.0) is False
+        assert sensor._should_update_value(1100.0, 300.0) is False
+        assert sensor._should_update_value(1200.0, 300.0) is True
+
+
+def test_fleet_metric_unique_id_is_not_a_vehicle_scope():
+    """Test integration-wide metrics cannot collide with a vehicle's."""
+    description = METRIC_SENSORS[0]
+
+    fleet = TorqueMetricSensor(description, None, {})
+    vehicle = TorqueMetricSensor(description, "Fleet", {})
+
+    assert fleet.unique_id == f"{DOMAIN}_metrics_{description.key}"
+    assert vehicle.unique_id == f"{DOMAIN}_fleet_metrics_{description.key}"
+
 
 class TestTorqueReceiveDataView:
     """Test TorqueReceiveDataView class."""
@@ -246,10 +378,12 @@ class TestTorqueReceiveDataView:
             "userUnit29": "%",
             "k29": "45.5",
         }
+        request.query_string = urlencode(request.query)
 
         response = await view.get(request)
         assert response.text == "OK"
         assert response.status == 200
+        assert view.metrics.bytes_received == len(request.query_string)
 
     async def test_post_request(self, view):
         """Test handling POST request."""
@@ -309,6 +443,234 @@ class TestTorqueReceiveDataView:
         assert names[41] == "Engine Load"
         assert units[41] == "%"
 
+    async def test_unchanged_metadata_is_skipped(self, view):
+        """Test repeated name/unit blocks are not parsed again."""
+        data = {
+            "eml": "test@example.com",
+            "session": "1760720540354",
+            "userFullName29": "Engine Load",
+            "userUnit29": "%",
+        }
+        await view._handle_data(dict(data))
+
+        with patch.object(
+            view, "_parse_sensor_data", wraps=view._parse_sensor_data
+        ) as mock_parse:
+            await view._handle_data(dict(data))
+
+        parsed_keys = [call.args[0] for call in mock_parse.call_args_list]
+        assert "userFullName29" not in parsed_keys
+        assert "userUnit29" not in parsed_keys
+
+    async def test_changed_metadata_only_parses_changed_keys(self, view):
+        """Test only the metadata keys that changed are parsed."""
+        data = {
+            "eml": "test@example.com",
+            "session": "1760720540354",
+            "userFullName29": "Engine Load",
+            "userUnit29": "%",
+        }
+        await view._handle_data(dict(data))
+
+        data["userFullName2a"] = "Coolant Temp"
+        with patch.object(
+            view, "_parse_sensor_data", wraps=view._parse_sensor_data
+        ) as mock_parse:
+            await view._handle_data(dict(data))
+
+        parsed_keys = [call.args[0] for call in mock_parse.call_args_list]
+        assert parsed_keys == ["eml", "session", "userFullName2a"]
+        assert 42 in view.sensors
+
+    def test_changed_metadata_resets_on_new_session(self, view):
+        """Test a new Torque session forces metadata to be parsed again."""
+        metadata = {"userFullName29": "Engine Load"}
+
+        assert view._changed_metadata("1", metadata) == metadata
+        assert view._changed_metadata("1", metadata) == {}
+        assert view._changed_metadata("2", metadata) == metadata
+
+    async def test_value_before_name_is_applied_on_creation(self, view):
+        """Test a value received before its sensor name is not lost."""
+        await view._handle_data({"eml": "test@example.com", "k29": "45.5"})
+        assert 41 not in view.sensors
+
+        await view._handle_data(
+            {"eml": "test@example.com", "userFullName29": "Engine Load"}
+        )
+
+        assert view.sensors[41]._attr_native_value == 45.5
+        assert len(view.shard.pending) == 0
+
+    async def test_hidden_pid_values_are_not_buffered(self, view):
+        """Test values of hidden PIDs do not take pending buffer slots."""
+        view._hidden_pids = {41}
+
+        await view._handle_data({"eml": "test@example.com", "k29": "45.5"})
+
+        assert len(view.shard.pending) == 0
+
+    def test_initial_value_keeps_sample_time(self):
+        """Test a buffered value counts as written at its sample time."""
+        sensor = TorqueSensor("Engine RPM", "rpm", 12, "Test", {})
+
+        sensor.set_initial_value("800", 1000.0)
+
+        assert sensor._attr_native_value == 800.0
+        assert sensor._last_update == 1000.0
+
+    async def test_late_payload_only_newest_value_reaches_state(self, view):
+        """Test late payloads are backfilled and only the newest is shown."""
+        sensor = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        sensor.async_write_ha_state = Mock()
+        view.sensors[41] = sensor
+        sent = int((time.time() - 3600) * 1000)
+
+        for offset, value in ((0, "10.0"), (20000, "20.0"), (40000, "30.0")):
+            await view._handle_data(
+                {"eml": "test@example.com", "time": str(sent + offset), "k29": value}
+            )
+
+        # Late samples do not touch the entity until they are flushed
+        assert sensor._attr_native_value is None
+        assert len(view._backfill) >= 1
+
+        view._async_flush_late()
+
+        assert sensor._attr_native_value == 30.0
+        assert sensor._last_update == (sent + 40000) / 1000
+        assert sensor.async_write_ha_state.call_count == 1
+
+    async def test_clock_behind_is_followed(self, view):
+        """Test a phone clock running behind only delays live state a minute."""
+        sensor = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        sensor.async_write_ha_state = Mock()
+        view.sensors[41] = sensor
+        behind = time.time() - 600
+
+        def upload(sample_time: float, value: str) -> dict[str, str]:
+            return {
+                "eml": "test@example.com",
+                "time": str(int(sample_time * 1000)),
+                "k29": value,
+            }
+
+        await view._handle_data(upload(behind, "10.0"))
+        assert sensor._attr_native_value is None
+
+        # A minute of uploads arriving at the rate they were sampled
+        view._late_streak = (behind, time.monotonic() - 61)
+        await view._handle_data(upload(behind + 61, "20.0"))
+        await view._handle_data(upload(behind + 62, "30.0"))
+
+        assert sensor._attr_native_value == 20.0
+        assert not view._is_late(behind + 63)
+        # Uploads buffered before then are still late
+        assert view._is_late(behind - 3600)
+
+    async def test_clock_set_back_keeps_updating(self, view):
+        """Test a sensor shown on the correct clock follows one set back."""
+        sensor = TorqueSensor(
+            "Engine Load", "%", 41, "Test Car", {}, history=view.history
+        )
+        sensor.async_write_ha_state = Mock()
+        view.sensors[41] = sensor
+        now = time.time()
+        behind = now - 600
+
+        def upload(sample_time: float, value: str) -> dict[str, str]:
+            return {
+                "eml": "test@example.com",
+                "time": str(int(sample_time * 1000)),
+                "k29": value,
+            }
+
+        await view._handle_data(upload(now, "10.0"))
+        assert sensor._attr_native_value == 10.0
+
+        # The phone clock goes back ten minutes and is followed a minute later
+        await view._handle_data(upload(behind, "20.0"))
+        view._late_streak = (behind, time.monotonic() - 61)
+        await view._handle_data(upload(behind + 61, "30.0"))
+        await view._handle_data(upload(behind + 82, "40.0"))
+
+        assert sensor._attr_native_value == 40.0
+        assert [value for _, value in view.history.rings[41].samples()] == [
+            30.0,
+            40.0,
+        ]
+
+    async def test_live_payload_throttles_on_sample_time(self, view):
+        """Test throttling uses the payload's sample time."""
+        sensor = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        sensor.async_write_ha_state = Mock()
+        view.sensors[41] = sensor
+        sent = int(time.time() * 1000)
+
+        await view._handle_data(
+            {"eml": "test@example.com", "time": str(sent - 20000), "k29": "10.0"}
+        )
+        await view._handle_data(
+            {"eml": "test@example.com", "time": str(sent), "k29": "20.0"}
+        )
+
+        assert sensor._attr_native_value == 20.0
+        assert sensor.async_write_ha_state.call_count == 2
+
+    def test_silent_pids_become_unavailable(self, view):
+        """Test silent PIDs are marked unavailable and restored on new data."""
+        live = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        silent = TorqueSensor("Coolant Temp", "°C", 5, "Test Car", {})
+        for sensor in (live, silent):
+            sensor.async_write_ha_state = Mock()
+        view.sensors.update({41: live, 5: silent})
+        now = time.monotonic()
+        view._first_received = now - 400
+        view._seen = {41: now, 5: now - 400}
+
+        view._async_check_stale()
+
+        assert live.available is True
+        assert silent.available is False
+        silent.async_write_ha_state.assert_called_once()
+
+        silent.async_on_update("90.0")
+        assert silent.available is True
+        assert silent._attr_native_value == 90.0
+
+    def test_restored_sensors_expire_without_uploads(self, view):
+        """Test sensors restored at setup go stale when no upload arrives."""
+        restored = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        restored.async_write_ha_state = Mock()
+        view.sensors[41] = restored
+        view.hass = Mock()
+
+        with patch("custom_components.torque.sensor.async_call_later") as call_later:
+            view.async_start_stale_check()
+        call_later.assert_called_once()
+        assert view._cancel_stale_check is not None
+
+        view._first_received -= view._stale_timeout
+        view._async_check_stale()
+
+        assert restored.available is False
+
+    async def test_handle_data_updates_metrics(self, view):
+        """Test the hot path updates the performance counters."""
+        sensor = TorqueSensor("Engine Load", "%", 41, "Test Car", {})
+        sensor.async_write_ha_state = Mock()
+        view.sensors[41] = sensor
+
+        await view._handle_data({"eml": "test@example.com", "k29": "45.5"})
+        await view._handle_data({"eml": "test@example.com", "k29": "45.6"})
+        await view._handle_data({"eml": "test@example.com", "k29": "n/a"})
+
+        metrics = view.metrics
+        assert metrics.requests == 3
+        assert metrics.keys == 6
+        assert metrics.updates == [1, 1, 1]
+        assert metrics.parse_latency.count == 3
+
     def test_should_hide_pid_no_config(self, view):
         """Test PID hiding with no configuration."""
         assert view._should_hide_pid(41) is False
@@ -350,6 +712,39 @@ class TestTorqueReceiveDataView:
         assert view._get_custom_sensor_name(41, "Engine Load") == "Custom Engine Load"
         assert view._get_custom_sensor_name(43, "Other Sensor") == "Other Sensor"
 
+    def test_payload_event_rate_limited(self):
+        """Test one event carries the opted-in PIDs, at most once per interval."""
+        config_entry = Mock()
+        config_entry.entry_id = "entry"
+        config_entry.options = {"event_pids": "12,5,255", "event_interval": 10}
+        hass = Mock()
+        view = TorqueReceiveDataView(
+            email="test@example.com",
+            vehicle="Test Car",
+            sensors={},
+            async_add_entities=AsyncMock(),
+            config_entry=config_entry,
+            hass=hass,
+        )
+        data = {"eml": "test@example.com", "kc": "1800", "k5": "-", "kd": "40"}
+
+        view._received = 100.0
+        view._fire_payload_event(data, 1.0)
+        view._received = 105.0
+        view._fire_payload_event(data, 6.0)
+        view._received = 110.0
+        view._fire_payload_event({"eml": "test@example.com", "kd": "40"}, 11.0)
+
+        hass.bus.async_fire.assert_called_once_with(
+            "torque_payload",
+            {
+                "entry_id": "entry",
+                "vehicle": "Test Car",
+                "time": 1.0,
+                "values": {12: 1800.0},
+            },
+        )
+
 
 async def test_async_setup_entry(hass, mock_config_entry, mock_add_entities):
     """Test setting up the sensor platform."""
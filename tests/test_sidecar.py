@@ -0,0 +1,180 @@
+"""Test the ingest sidecar and the integration's bulk entry point."""
+
+from __future__ import annotations
+
+import inspect
+from unittest.mock import Mock, patch
+
+from aiohttp import ClientSession, WSMsgType, web
+from aiohttp.test_utils import TestClient, TestServer
+
+from custom_components.torque.const import DATA_VIEWS
+from custom_components.torque.sensor import TorqueReceiveDataView
+from custom_components.torque.sidecar import (
+    HomeAssistantLink,
+    IngestSidecar,
+    VehicleBatcher,
+)
+from custom_components.torque.websocket_api import websocket_ingest
+
+EMAIL = "test@example.com"
+TOKEN = "token"
+
+
+def _upload(time: int, **values: str) -> dict[str, str]:
+    return {"eml": EMAIL, "session": "1", "time": str(time), **values}
+
+
+def test_batcher_drops_retries_and_non_numeric_values():
+    """Test repeated uploads and values the integration rejects are dropped."""
+    batcher = VehicleBatcher(EMAIL)
+
+    assert batcher.add(_upload(1000, k29="45.5", kc="-", v="9", id="x"))
+    assert not batcher.add(_upload(1000, k29="45.5"))
+    assert batcher.add(_upload(2000, kc="800"))
+
+    batch = batcher.batch()
+    assert batch["keys"] == ["session", "time", "k29", "kc"]
+    assert batch["rows"] == [["1", "1000", "45.5"], ["1", "2000", None, "800"]]
+    assert batcher.duplicates == 1
+
+
+def test_batcher_sends_changed_metadata():
+    """Test metadata is sent when it changes and in full for a new session."""
+    batcher = VehicleBatcher(EMAIL)
+    batcher.add(_upload(1000, userFullName29="Engine Load", userUnit29="%"))
+    batcher.commit(batcher.batch())
+
+    batcher.add(_upload(2000, userFullName29="Engine Load", userUnit29="%"))
+    assert batcher.batch()["metadata"] == {}
+
+    batcher.add(_upload(3000, userFullName29="Load", userUnit29="%"))
+    assert batcher.batch()["metadata"] == {"userFullName29": "Load"}
+    batcher.commit(batcher.batch())
+
+    batcher.add({**_upload(4000), "session": "2"})
+    assert batcher.batch()["metadata"] == {
+        "userFullName29": "Load",
+        "userUnit29": "%",
+    }
+
+
+def test_batcher_keeps_uploads_queued_during_send():
+    """Test uploads arriving while a batch is sent are kept for the next one."""
+    batcher = VehicleBatcher(EMAIL)
+    batcher.add(_upload(1000, k29="1"))
+    batch = batcher.batch()
+    batcher.add(_upload(2000, k29="2", userFullName29="Engine Load"))
+
+    batcher.commit(batch)
+
+    assert batcher.batch()["rows"] == [["1", "2000", "2"]]
+    assert batcher.metadata == {"userFullName29": "Engine Load"}
+
+
+def test_batcher_overflow_during_send_keeps_unsent_uploads():
+    """Test uploads pushed out of a full queue meanwhile are not dropped twice."""
+    batcher = VehicleBatcher(EMAIL)
+    for time in range(4):
+        batcher.add(_upload(time, k29=str(time)))
+    batch = batcher.batch(limit=2)
+
+    with patch("custom_components.torque.sidecar.MAX_QUEUED_ROWS", 4):
+        batcher.add(_upload(4, k29="4"))
+
+    batcher.commit(batch)
+
+    assert [row[2] for row in batcher.batch()["rows"]] == ["2", "3", "4"]
+
+
+def _stand_in(received: list[dict]) -> web.Application:
+    """Return a stand-in for the websocket API of Home Assistant."""
+
+    async def websocket(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"type": "auth_required"})
+        if (await ws.receive_json())["access_token"] != TOKEN:
+            await ws.send_json({"type": "auth_invalid", "message": "Invalid"})
+            await ws.close()
+            return ws
+        await ws.send_json({"type": "auth_ok"})
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                break
+            command = message.json()
+            received.append(command)
+            await ws.send_json(
+                {
+                    "id": command["id"],
+                    "type": "result",
+                    "success": True,
+                    "result": {"accepted": len(command["rows"]), "rejected": 0},
+                }
+            )
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/api/websocket", websocket)
+    return app
+
+
+async def test_sidecar_forwards_to_stand_in(socket_enabled):
+    """Test uploads are forwarded per vehicle and kept while the link is down."""
+    received: list[dict] = []
+    home_assistant = TestServer(_stand_in(received))
+    await home_assistant.start_server()
+    async with ClientSession() as session:
+        link = HomeAssistantLink(
+            session, str(home_assistant.make_url("/api/websocket")), TOKEN
+        )
+        sidecar = IngestSidecar(link, emails={EMAIL})
+        async with TestClient(TestServer(sidecar.app)) as client:
+            for time in (1000, 1000, 2000):
+                response = await client.get("/api/torque", params=_upload(time, kc="8"))
+                assert await response.text() == "OK"
+            response = await client.get("/api/torque", params={"eml": "other"})
+            assert response.status == 403
+
+            assert await sidecar.async_flush() == 2
+            assert received[0]["type"] == "torque/ingest"
+            assert received[0]["eml"] == EMAIL
+            assert len(received[0]["rows"]) == 2
+
+            # Home Assistant restarts
+            await link.async_close()
+            await home_assistant.close()
+            await client.get("/api/torque", params=_upload(3000, kc="9"))
+            assert await sidecar.async_flush() == 0
+            assert len(sidecar.vehicles[EMAIL].rows) == 1
+
+
+async def test_ingest_applies_rows_in_order():
+    """Test the bulk entry point applies every forwarded upload."""
+    view = TorqueReceiveDataView(
+        email=EMAIL,
+        vehicle="Test Car",
+        sensors={},
+        async_add_entities=Mock(),
+        config_entry=None,
+    )
+    hass = Mock()
+    hass.data = {DATA_VIEWS: {"entry": view}}
+    connection = Mock()
+    handler = inspect.unwrap(websocket_ingest)
+
+    await handler(
+        hass,
+        connection,
+        {
+            "id": 5,
+            "eml": EMAIL,
+            "metadata": {"userFullName29": "Engine Load", "userUnit29": "%"},
+            "keys": ["session", "k29"],
+            "rows": [["1", "45.5"], ["1", None]],
+        },
+    )
+
+    assert view.sensors[41]._attr_native_value == 45.5
+    assert view.metrics.requests == 2
+    connection.send_result.assert_called_once_with(5, {"accepted": 2, "rejected": 0})
@@ -0,0 +1,98 @@
+"""Test the percentile sketches."""
+
+from __future__ import annotations
+
+import random
+
+from custom_components.torque.sketch import KllSketch, PercentileTracker
+
+START = 1_700_000_000.0
+
+
+def test_sketch_exact_while_small():
+    """Test a sketch below its capacity returns exact quantiles."""
+    sketch = KllSketch()
+    for value in range(1, 101):
+        sketch.add(float(value))
+
+    assert sketch.quantiles((0.0, 0.5, 0.95, 1.0)) == [1.0, 50.0, 95.0, 100.0]
+    assert (sketch.count, sketch.min, sketch.max) == (100, 1.0, 100.0)
+
+
+def test_sketch_bounded_and_accurate():
+    """Test memory stays bounded and quantiles stay within the rank error."""
+    generator = random.Random(1)
+    values = [generator.gauss(90.0, 5.0) for _ in range(200_000)]
+    sketch = KllSketch()
+    for value in values:
+        sketch.add(value)
+
+    ordered = sorted(values)
+    for fraction, estimate in zip(
+        (0.5, 0.95, 0.99), sketch.quantiles((0.5, 0.95, 0.99)), strict=True
+    ):
+        rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+        assert abs(rank - fraction) < 0.02
+    assert sum(len(level) for level in sketch._levels) < 3 * sketch.k
+    assert sketch.max == max(values)
+
+
+def test_sketch_empty():
+    """Test an empty sketch has no quantiles."""
+    assert KllSketch().quantiles((0.5,)) == [None]
+
+
+def test_sketch_roundtrip():
+    """Test a stored sketch is rebuilt with the same estimates."""
+    sketch = KllSketch()
+    for value in range(5000):
+        sketch.add(float(value % 700))
+
+    restored = KllSketch.from_dict(sketch.as_dict())
+
+    assert restored is not None
+    assert restored.quantiles((0.5, 0.95)) == sketch.quantiles((0.5, 0.95))
+    assert (restored.count, restored.max) == (5000, 699.0)
+    assert KllSketch.from_dict({"count": "x"}) is None
+    assert KllSketch.from_dict(KllSketch().as_dict()) is None
+
+
+def test_tracker_day_rolls_over():
+    """Test the day sketch starts over at midnight, the session one does not."""
+    tracker = PercentileTracker()
+    tracker.set_session("a")
+    tracker.add(10.0, START)
+    tracker.add(30.0, START + 86400)
+
+    attributes = tracker.attributes(0)
+
+    assert attributes["session_max"] == 30.0
+    assert attributes["day_max"] == 30.0
+    assert attributes["day_p50"] == 30.0
+    assert attributes["session_p50"] == 10.0
+
+
+def test_tracker_restore():
+    """Test sketches are restored only for the same session and day."""
+    tracker = PercentileTracker()
+    tracker.set_session("a")
+    tracker.add(42.0, START)
+    stored = tracker.as_dict()
+
+    same = PercentileTracker()
+    same.restore(stored, START + 60)
+    assert same.session_id == "a"
+    assert same.attributes(0)["session_max"] == 42.0
+    assert same.attributes(0)["day_max"] == 42.0
+
+    later = PercentileTracker()
+    later.set_session("b")
+    later.restore(stored, START + 86400)
+    assert later.attributes(0) == {
+        "session_p50": None,
+        "session_p95": None,
+        "session_max": None,
+        "day_p50": None,
+        "day_p95": None,
+        "day_max": None,
+    }
@@ -0,0 +1,142 @@
+"""Test the GPS track simplification and GPX files."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from array import array
+from unittest.mock import Mock
+
+from custom_components.torque.track import (
+    TrackSimplifier,
+    VehicleTrack,
+    read_gpx,
+    simplify,
+    write_gpx,
+)
+
+START = 1_700_000_000.0
+METRE = 1 / 111_195  # degrees of latitude
+
+
+def _fixes(points):
+    fixes = array("d")
+    for index, (latitude, longitude) in enumerate(points):
+        fixes.extend((START + index, latitude, longitude, math.nan, math.nan))
+    return fixes
+
+
+def test_simplify_straight_line():
+    """Test a straight road keeps only its ends."""
+    fixes = _fixes((50 + i * 10 * METRE, 8.0) for i in range(100))
+
+    assert simplify(fixes, 5.0) == [0, 99]
+
+
+def test_simplify_keeps_turns():
+    """Test a corner is kept and jitter within the tolerance is dropped."""
+    points = [(50 + i * 10 * METRE, 8.0 + (i % 2) * 2 * METRE) for i in range(11)]
+    points += [(points[-1][0], 8.0 + i * 15 * METRE) for i in range(1, 11)]
+
+    assert simplify(_fixes(points), 5.0) == [0, 10, 20]
+    assert simplify(_fixes(points), 0) == list(range(21))
+
+
+def test_simplify_keeps_loops():
+    """Test a track returning to its start keeps its far end."""
+    out = [(50 + i * 10 * METRE, 8.0) for i in range(10)]
+    fixes = _fixes(out + out[-2::-1])
+
+    assert simplify(fixes, 5.0) == [0, 9, 18]
+
+
+def test_simplifier_windows():
+    """Test windows join up and their result matches a single pass."""
+    simplifier = TrackSimplifier(5.0, window=16)
+    for i in range(100):
+        turn = i // 25 % 2
+        assert simplifier.add(
+            START + i, 50 + i * 10 * METRE, 8.0 + turn * i * 10 * METRE, 120.0, 10.0
+        )
+
+    points = simplifier.points()
+
+    assert simplifier.fixes == 100
+    assert points[0][0] == START
+    assert points[-1][0] == START + 99
+    assert len(points) < 20
+    assert [point[0] for point in points] == sorted(point[0] for point in points)
+    assert points[0][3:] == (120.0, 10.0)
+
+
+def test_simplifier_skips_repeats():
+    """Test repeated and out of order fixes are dropped."""
+    simplifier = TrackSimplifier(5.0)
+
+    assert simplifier.add(START, 50.0, 8.0)
+    assert not simplifier.add(START + 1, 50.0, 8.0)
+    assert not simplifier.add(START - 1, 50.1, 8.0)
+    assert simplifier.add(START + 2, 50.1, 8.0)
+    assert simplifier.fixes == 2
+
+
+def test_gpx_roundtrip(tmp_path):
+    """Test a written GPX file reads back the same points."""
+    path = str(tmp_path / "tracks" / "trip.gpx")
+    points = [
+        (START, 50.1234567, 8.7654321, 112.5, 13.89),
+        (START + 1.5, 50.1235, 8.7655, math.nan, math.nan),
+    ]
+
+    write_gpx(path, "Trip <1>", points)
+    read = read_gpx(path)
+
+    assert len(read) == 2
+    assert read[0] == (START, 50.1234567, 8.7654321, 112.5, 13.89)
+    assert read[1][:3] == (START + 1.5, 50.1235, 8.7655)
+    assert math.isnan(read[1][3]) and math.isnan(read[1][4])
+    with open(path, encoding="utf-8") as gpx:
+        assert "<name>Trip &lt;1&gt;</name>" in gpx.read()
+
+
+def test_read_gpx_missing(tmp_path):
+    """Test a missing or broken file has no points."""
+    broken = tmp_path / "broken.gpx"
+    broken.write_text("<gpx><trk>")
+
+    assert read_gpx(str(tmp_path / "missing.gpx")) == []
+    assert read_gpx(str(broken)) == []
+
+
+async def test_late_fixes_go_to_their_session(tmp_path):
+    """Test late uploads are merged into their session's file."""
+    hass = Mock()
+    hass.config.path = lambda *parts: str(tmp_path.joinpath(*parts))
+
+    async def run(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = run
+    hass.async_create_background_task = lambda coro, _name: asyncio.ensure_future(coro)
+    track = VehicleTrack(hass, "Car", 0)
+
+    def upload(second: float) -> dict[str, str]:
+        return {"kff1006": str(50 + second * METRE), "kff1005": "8.7"}
+
+    for second in range(3):
+        track.async_set_session("2", START + 3600 + second)
+        track.add(START + 3600 + second, upload(3600 + second))
+        track.add_late("1", START + second, upload(second))
+    # A late fix of the current session predating its live fixes
+    track.add_late("2", START + 3599, upload(3599))
+
+    assert track.name == "2"
+    assert track.files_written == 0
+    track.async_flush_late()
+    await track.async_close()
+
+    late = read_gpx(os.path.join(track.directory, "1.gpx"))
+    assert [point[0] for point in late] == [START, START + 1, START + 2]
+    current = read_gpx(os.path.join(track.directory, "2.gpx"))
+    assert [point[0] - START for point in current] == [3599, 3600, 3601, 3602]
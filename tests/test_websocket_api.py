@@ -0,0 +1,146 @@
+"""Test the websocket live stream."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from homeassistant.exceptions import Unauthorized
+
+from custom_components.torque.const import LIVE_BUFFER_SIZE
+from custom_components.torque.sensor import TorqueReceiveDataView
+from custom_components.torque.websocket_api import (
+    LiveStream,
+    LiveSubscriber,
+    encode_batch,
+    websocket_history,
+    websocket_query,
+    websocket_subscribe_live,
+)
+
+
+@pytest.fixture
+def call_later():
+    """Patch the send timer so tests trigger sends themselves."""
+    with patch("custom_components.torque.websocket_api.async_call_later") as call_later:
+        yield call_later
+
+
+def _subscribe(live: LiveStream, msg_id: int, entry_id: str | None = None):
+    subscriber = LiveSubscriber(Mock(), Mock(), msg_id, entry_id)
+    return subscriber, live.async_subscribe(subscriber)
+
+
+def _sent(subscriber: LiveSubscriber) -> dict:
+    return json.loads(subscriber.connection.send_message.call_args[0][0])
+
+
+def test_encode_batch_numeric_values_only():
+    """Test only numeric, visible PID values end up in a batch."""
+    data = {"eml": "a@b.c", "k29": "45.5", "kc": "n/a", "k5": "90", "kff1001": "52"}
+
+    batch = json.loads(encode_batch("entry", "Car", 1.5, data, {5}))
+
+    assert batch == {
+        "entry_id": "entry",
+        "vehicle": "Car",
+        "time": 1.5,
+        "samples": [[41, 45.5], [0xFF1001, 52.0]],
+    }
+    assert encode_batch("entry", "Car", 1.5, {"eml": "a@b.c"}, ()) is None
+
+
+def test_batch_shared_and_filtered_by_entry(call_later):
+    """Test a batch is encoded once and only queued for matching subscribers."""
+    live = LiveStream()
+    everything, _ = _subscribe(live, 1)
+    this_car, _ = _subscribe(live, 2, "entry")
+    other_car, _ = _subscribe(live, 3, "other")
+
+    with patch(
+        "custom_components.torque.websocket_api.encode_batch", return_value="{}"
+    ) as encode:
+        live.async_publish("entry", "Car", 1.0, {"k29": "1"}, ())
+
+    assert encode.call_count == 1
+    assert everything.queue[0] is this_car.queue[0]
+    assert not other_car.queue
+
+
+def test_queued_batches_sent_together(call_later):
+    """Test queued batches go out in one event message."""
+    live = LiveStream()
+    subscriber, _ = _subscribe(live, 7)
+
+    live.async_publish("entry", "Car", 1.0, {"k29": "1"}, ())
+    live.async_publish("entry", "Car", 2.0, {"k29": "2"}, ())
+    assert call_later.call_count == 1
+    subscriber._async_send()
+
+    message = _sent(subscriber)
+    assert message["id"] == 7
+    assert message["type"] == "event"
+    assert message["event"]["dropped"] == 0
+    assert [batch["time"] for batch in message["event"]["batches"]] == [1.0, 2.0]
+
+
+def test_slow_subscriber_drops_oldest(call_later):
+    """Test a full queue drops the oldest batches and reports the loss."""
+    live = LiveStream()
+    subscriber, _ = _subscribe(live, 1)
+
+    for sample_time in range(LIVE_BUFFER_SIZE + 5):
+        live.async_publish("entry", "Car", float(sample_time), {"k29": "1"}, ())
+    subscriber._async_send()
+
+    event = _sent(subscriber)["event"]
+    assert event["dropped"] == 5
+    assert len(event["batches"]) == LIVE_BUFFER_SIZE
+    assert event["batches"][0]["time"] == 5.0
+
+
+def test_unsubscribe_cancels_send(call_later):
+    """Test unsubscribing stops pending sends."""
+    live = LiveStream()
+    subscriber, unsubscribe = _subscribe(live, 1)
+    live.async_publish("entry", "Car", 1.0, {"k29": "1"}, ())
+
+    unsubscribe()
+
+    assert not live.subscribers
+    assert call_later.return_value.called
+    assert not subscriber.queue
+
+
+async def test_view_publishes_only_with_subscribers():
+    """Test uploads are only handed to the stream while someone subscribed."""
+    live = LiveStream()
+    view = TorqueReceiveDataView(
+        email="test@example.com",
+        vehicle="Test Car",
+        sensors={},
+        async_add_entities=AsyncMock(),
+        live=live,
+    )
+
+    with patch.object(live, "async_publish") as publish:
+        await view._handle_data({"eml": "test@example.com", "k29": "45.5"})
+        assert not publish.called
+
+        live.subscribers.add(Mock())
+        await view._handle_data({"eml": "test@example.com", "k29": "45.6"})
+        assert publish.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "command", [websocket_subscribe_live, websocket_history, websocket_query]
+)
+def test_sample_commands_require_admin(command):
+    """Test raw samples and archives are not served to other users."""
+    connection = Mock()
+    connection.user.is_admin = False
+
+    with pytest.raises(Unauthorized):
+        command(Mock(), connection, {"id": 1, "entry_id": "entry", "pid": 12})
+    connection.send_result.assert_not_called()